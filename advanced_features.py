@@ -10,22 +10,86 @@ Advanced Features Module
 4. 漏洞挖掘 - 智能漏洞发现引擎
 """
 
+import asyncio
 import base64
+import binascii
 import hashlib
 import json
+import logging
+import mmap
 import os
 import re
+import string
+import sys
+import tempfile
 import time
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _create_session() -> requests.Session:
+    """创建共享的keep-alive连接池会话"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=100,
+        pool_maxsize=100,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'hexstrike/6.2'
+    return session
+
+
+# 所有同步HTTP辅助方法复用同一会话，避免每次请求重新握手
+_SESSION = _create_session()
 
 
 # ============================================================================
 # 1. 渗透测试链 - 全自动化工作流
 # ============================================================================
 
+# 视为Web服务的服务名
+_WEB_SERVICES = frozenset(('http', 'https', 'http-proxy', 'https-alt'))
+
+
+@dataclass
+class Task:
+    """DAG节点 - 原子步骤及其依赖"""
+    id: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+
+
 class PentestChain:
     """渗透测试链 - 自动化完整渗透测试流程"""
     
@@ -38,36 +102,134 @@ class PentestChain:
         'reporting'        # 报告
     ]
     
+    MAX_WORKERS = 4
+    
+    # 扫描目标位掩码
+    OBJ_QUICK = 0b01
+    OBJ_COMPREHENSIVE = 0b11
+    OBJECTIVE_BITS = {
+        'quick': OBJ_QUICK,
+        'comprehensive': OBJ_COMPREHENSIVE
+    }
+    
+    # 阶段完成后允许继续的目标掩码（快速扫描只到枚举阶段）
+    PHASE_MASK = {
+        'reconnaissance': 0b11,
+        'scanning': 0b11,
+        'enumeration': 0b10,
+        'exploitation': 0b10,
+        'post_exploitation': 0b11,
+        'reporting': 0b11
+    }
+    
     def __init__(self, target: str, objective: str = 'comprehensive'):
         self.target = target
         self.objective = objective
+        self.objective_bits = self.OBJECTIVE_BITS.get(objective, self.OBJ_COMPREHENSIVE)
         self.results = {}
         self.current_phase = 0
-        
+        self.tasks = self._build_graph()
+        
+    def _build_graph(self) -> Dict[str, Task]:
+        """构建任务DAG
+        
+        子步骤为原子节点，阶段名节点作为屏障汇总 self.results[phase]。
+        每个阶段的入口节点依赖上一阶段的屏障，以便 _should_continue
+        在下一阶段开始前终止整条链。
+        """
+        tasks = [
+            # 侦察 - 三个独立节点并行
+            Task('recon.subdomains', lambda out: self._run_subfinder()),
+            Task('recon.tech_stack', lambda out: self._detect_technology()),
+            Task('recon.osint', lambda out: self._gather_osint()),
+            Task('reconnaissance', self._phase_reconnaissance,
+                 ('recon.subdomains', 'recon.tech_stack', 'recon.osint')),
+            
+            # 扫描 - 端口 -> 服务 -> Web
+            Task('scan.open_ports', lambda out: self._run_port_scan(), ('reconnaissance',)),
+            Task('scan.services', lambda out: self._detect_services(out['scan.open_ports']),
+                 ('scan.open_ports',)),
+            Task('scan.web_findings',
+                 lambda out: (self._scan_web_services()
+                              if self._has_web_service(out['scan.services']) else None),
+                 ('scan.services',)),
+            Task('scanning', self._phase_scanning,
+                 ('scan.open_ports', 'scan.services', 'scan.web_findings')),
+            
+            # 枚举 - 三个独立节点并行
+            Task('enum.directories', lambda out: self._enumerate_directories(), ('scanning',)),
+            Task('enum.parameters', lambda out: self._discover_parameters(), ('scanning',)),
+            Task('enum.api_endpoints', lambda out: self._discover_api_endpoints(), ('scanning',)),
+            Task('enumeration', self._phase_enumeration,
+                 ('enum.directories', 'enum.parameters', 'enum.api_endpoints')),
+            
+            # 利用 / 后渗透 / 报告
+            Task('exploit.vulnerabilities', lambda out: self._scan_vulnerabilities(),
+                 ('enumeration',)),
+            Task('exploitation', self._phase_exploitation, ('exploit.vulnerabilities',)),
+            Task('post_exploitation', self._phase_post_exploitation, ('exploitation',)),
+            Task('reporting', self._phase_reporting, ('post_exploitation',)),
+        ]
+        return {task.id: task for task in tasks}
+    
     def execute(self) -> Dict[str, Any]:
         """执行完整渗透测试链"""
-        print(f"🚀 Starting Penetration Test Chain: {self.target}")
-        print(f"🎯 Objective: {self.objective}")
-        print("=" * 60)
-        
-        for phase in self.PHASES:
-            print(f"\n📍 Phase: {phase.upper()}")
-            print("-" * 60)
+        logger.info("🚀 Starting Penetration Test Chain: %s (objective: %s)", self.target, self.objective)
+        return asyncio.run(self._execute_async())
+    
+    async def _execute_async(self) -> Dict[str, Any]:
+        """在事件循环上调度DAG
+        
+        每个节点是一个asyncio任务，等待其依赖完成后运行；协程函数直接await，
+        同步辅助方法交给线程池。某阶段 _should_continue 返回False时，
+        取消所有尚未完成的节点。
+        """
+        loop = asyncio.get_running_loop()
+        outputs: Dict[str, Any] = {}
+        pending: Dict[str, asyncio.Task] = {}
+        
+        def stop():
+            current = asyncio.current_task()
+            for node in pending.values():
+                if node is not current and not node.done():
+                    node.cancel()
+        
+        async def run(task: Task):
+            if task.deps:
+                deps = [pending[dep] for dep in task.deps]
+                await asyncio.wait(deps)
+                for dep in deps:
+                    dep.result()  # 依赖失败时向下游传播异常
             
-            phase_method = getattr(self, f'_phase_{phase}')
-            phase_result = phase_method()
+            if asyncio.iscoroutinefunction(task.func):
+                result = await task.func(outputs)
+            else:
+                result = await loop.run_in_executor(executor, task.func, outputs)
+            outputs[task.id] = result
             
-            self.results[phase] = phase_result
-            print(f"✅ Phase {phase} completed")
+            if task.id in self.PHASES:
+                self.results[task.id] = result
+                self.current_phase = self.PHASES.index(task.id) + 1
+                logger.info("✅ Phase %s completed", task.id)
+                
+                # 根据结果决定是否继续
+                if not self._should_continue(task.id, result):
+                    logger.warning("⚠️  Stopping at phase: %s", task.id)
+                    stop()
+        
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            for tid, task in self.tasks.items():
+                pending[tid] = asyncio.create_task(run(task))
             
-            # 根据结果决定是否继续
-            if not self._should_continue(phase, phase_result):
-                print(f"⚠️  Stopping at phase: {phase}")
-                break
+            done = await asyncio.gather(*pending.values(), return_exceptions=True)
+        
+        for result in done:
+            if isinstance(result, Exception):
+                raise result
         
         return self.results
     
-    def _phase_reconnaissance(self) -> Dict[str, Any]:
+    def _phase_reconnaissance(self, out: Dict[str, Any]) -> Dict[str, Any]:
         """阶段1: 侦察"""
         results = {
             'phase': 'reconnaissance',
@@ -75,25 +237,21 @@ class PentestChain:
         }
         
         # 1. 子域名枚举
-        print("  🔍 Subdomain enumeration...")
-        subdomains = self._run_subfinder()
+        subdomains = out['recon.subdomains']
         results['subdomains'] = subdomains
         results['findings'].append(f"Found {len(subdomains)} subdomains")
         
         # 2. 技术栈识别
-        print("  🔍 Technology detection...")
-        tech_stack = self._detect_technology()
+        tech_stack = out['recon.tech_stack']
         results['tech_stack'] = tech_stack
         results['findings'].append(f"Identified technologies: {', '.join(tech_stack)}")
         
         # 3. OSINT信息收集
-        print("  🔍 OSINT gathering...")
-        osint_data = self._gather_osint()
-        results['osint'] = osint_data
+        results['osint'] = out['recon.osint']
         
         return results
     
-    def _phase_scanning(self) -> Dict[str, Any]:
+    def _phase_scanning(self, out: Dict[str, Any]) -> Dict[str, Any]:
         """阶段2: 扫描"""
         results = {
             'phase': 'scanning',
@@ -101,25 +259,20 @@ class PentestChain:
         }
         
         # 1. 端口扫描
-        print("  🔍 Port scanning...")
-        open_ports = self._run_port_scan()
+        open_ports = out['scan.open_ports']
         results['open_ports'] = open_ports
         results['findings'].append(f"Found {len(open_ports)} open ports")
         
         # 2. 服务探测
-        print("  🔍 Service detection...")
-        services = self._detect_services(open_ports)
-        results['services'] = services
+        results['services'] = out['scan.services']
         
         # 3. Web服务扫描
-        if self._has_web_service(services):
-            print("  🔍 Web service scanning...")
-            web_findings = self._scan_web_services()
-            results['web_findings'] = web_findings
+        if out['scan.web_findings'] is not None:
+            results['web_findings'] = out['scan.web_findings']
         
         return results
     
-    def _phase_enumeration(self) -> Dict[str, Any]:
+    def _phase_enumeration(self, out: Dict[str, Any]) -> Dict[str, Any]:
         """阶段3: 枚举"""
         results = {
             'phase': 'enumeration',
@@ -127,24 +280,19 @@ class PentestChain:
         }
         
         # 1. 目录枚举
-        print("  🔍 Directory enumeration...")
-        directories = self._enumerate_directories()
+        directories = out['enum.directories']
         results['directories'] = directories
         results['findings'].append(f"Found {len(directories)} directories")
         
         # 2. 参数发现
-        print("  🔍 Parameter discovery...")
-        parameters = self._discover_parameters()
-        results['parameters'] = parameters
+        results['parameters'] = out['enum.parameters']
         
         # 3. API端点发现
-        print("  🔍 API endpoint discovery...")
-        api_endpoints = self._discover_api_endpoints()
-        results['api_endpoints'] = api_endpoints
+        results['api_endpoints'] = out['enum.api_endpoints']
         
         return results
     
-    def _phase_exploitation(self) -> Dict[str, Any]:
+    def _phase_exploitation(self, out: Dict[str, Any]) -> Dict[str, Any]:
         """阶段4: 利用"""
         results = {
             'phase': 'exploitation',
@@ -153,13 +301,12 @@ class PentestChain:
         }
         
         # 1. 漏洞扫描
-        print("  🔍 Vulnerability scanning...")
-        vulns = self._scan_vulnerabilities()
+        vulns = out['exploit.vulnerabilities']
         results['vulnerabilities'] = vulns
         results['findings'] = [f"Found {len(vulns)} potential vulnerabilities"]
         
         # 2. 尝试利用（非破坏性）
-        print("  🔍 Safe exploitation attempts...")
+        logger.info("🔍 Safe exploitation attempts...")
         for vuln in vulns:
             if vuln.get('severity') in ['critical', 'high']:
                 exploit_result = self._safe_exploit(vuln)
@@ -168,7 +315,7 @@ class PentestChain:
         
         return results
     
-    def _phase_post_exploitation(self) -> Dict[str, Any]:
+    def _phase_post_exploitation(self, out: Dict[str, Any]) -> Dict[str, Any]:
         """阶段5: 后渗透"""
         results = {
             'phase': 'post_exploitation',
@@ -180,7 +327,7 @@ class PentestChain:
             results['findings'].append("No exploitation success, skipping post-exploitation")
             return results
         
-        print("  🔍 Post-exploitation analysis...")
+        logger.info("🔍 Post-exploitation analysis...")
         
         # 1. 权限提升路径分析
         privesc_paths = self._analyze_privesc()
@@ -192,9 +339,9 @@ class PentestChain:
         
         return results
     
-    def _phase_reporting(self) -> Dict[str, Any]:
+    def _phase_reporting(self, out: Dict[str, Any]) -> Dict[str, Any]:
         """阶段6: 报告"""
-        print("  📝 Generating report...")
+        logger.info("📝 Generating report...")
         
         report = {
             'target': self.target,
@@ -206,22 +353,40 @@ class PentestChain:
         
         # 保存报告
         report_file = f"pentest_report_{self.target.replace('/', '_')}_{int(time.time())}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
         
-        print(f"  ✅ Report saved: {report_file}")
+        # 先写唯一命名的临时文件再原子替换，避免生成不完整的报告；
+        # 同一秒内同目标的并发链各用各的临时文件，序列化失败时删除临时文件
+        tmp_file = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                'wb' if ORJSON_AVAILABLE else 'w',
+                dir=os.path.dirname(os.path.abspath(report_file)),
+                prefix=f"{report_file}.", suffix='.tmp', delete=False
+            ) as f:
+                tmp_file = f.name
+                if ORJSON_AVAILABLE:
+                    f.write(orjson.dumps(
+                        report,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                    ))
+                else:
+                    json.dump(report, f, separators=(',', ':'))
+            os.replace(tmp_file, report_file)
+        except BaseException:
+            if tmp_file is not None:
+                try:
+                    os.unlink(tmp_file)
+                except OSError:
+                    pass
+            raise
+        
+        logger.info("✅ Report saved: %s", report_file)
         
         return report
     
     def _should_continue(self, phase: str, result: Dict) -> bool:
         """判断是否继续下一阶段"""
-        # 基于目标和结果决定
-        if self.objective == 'quick':
-            # 快速扫描只到枚举阶段
-            return phase not in ['enumeration', 'exploitation']
-        
-        # 全面扫描继续所有阶段
-        return True
+        return bool(self.PHASE_MASK[phase] & self.objective_bits)
     
     # === 辅助方法 ===
     
@@ -261,8 +426,7 @@ class PentestChain:
     
     def _has_web_service(self, services: Dict) -> bool:
         """检查是否有Web服务"""
-        web_services = ['http', 'https']
-        return any(svc in web_services for svc in services.values())
+        return not _WEB_SERVICES.isdisjoint(services.values())
     
     def _scan_web_services(self) -> Dict[str, Any]:
         """扫描Web服务"""
@@ -328,41 +492,78 @@ class PentestChain:
 # 2. 智能Fuzzer - 基于AI的模糊测试
 # ============================================================================
 
+# Payload注册表 - 驻留字符串，IntelligentFuzzer 与 CTFSolver 共享同一批对象
+def _intern_all(*payloads: str) -> Tuple[str, ...]:
+    return tuple(map(sys.intern, payloads))
+
+
+_SQLI = _intern_all(
+    "' OR '1'='1",
+    "admin' --",
+    "' UNION SELECT NULL--",
+    "1' AND 1=1--"
+)
+_XSS = _intern_all(
+    "<script>alert(1)</script>",
+    "<img src=x onerror=alert(1)>",
+    "<svg/onload=alert(1)>",
+    "javascript:alert(1)"
+)
+_CMDI = _intern_all(
+    "; ls",
+    "| whoami",
+    "`id`",
+    "$(cat /etc/passwd)"
+)
+_PATH_TRAVERSAL = _intern_all(
+    "../../../etc/passwd",
+    "..\\..\\..\\windows\\system32\\config\\sam",
+    "....//....//etc/passwd"
+)
+_SSRF = _intern_all(
+    "http://127.0.0.1",
+    "http://localhost",
+    "http://169.254.169.254/latest/meta-data/"
+)
+_CTF_SQLI = _intern_all(
+    "admin' --",
+    "' OR '1'='1",
+    "admin' OR '1'='1'--"
+)
+_CTF_XSS = _XSS[:3]
+
+
+@lru_cache(maxsize=4096)
+def _payload_variants(base_payload: str) -> Tuple[str, ...]:
+    """生成payload编码变体（按base_payload缓存）"""
+    return (
+        base_payload,
+        # 编码变体
+        base_payload.replace(' ', '+'),
+        base64.b64encode(base_payload.encode()).decode(),
+        # URL编码
+        quote(base_payload),
+        # 大小写变体
+        base_payload.upper(),
+        base_payload.lower(),
+    )
+
+
 class IntelligentFuzzer:
     """智能Fuzzer - 自适应模糊测试"""
     
     # Payload模板
     PAYLOAD_TEMPLATES = {
-        'sql_injection': [
-            "' OR '1'='1",
-            "admin' --",
-            "' UNION SELECT NULL--",
-            "1' AND 1=1--"
-        ],
-        'xss': [
-            "<script>alert(1)</script>",
-            "<img src=x onerror=alert(1)>",
-            "<svg/onload=alert(1)>",
-            "javascript:alert(1)"
-        ],
-        'command_injection': [
-            "; ls",
-            "| whoami",
-            "`id`",
-            "$(cat /etc/passwd)"
-        ],
-        'path_traversal': [
-            "../../../etc/passwd",
-            "..\\..\\..\\windows\\system32\\config\\sam",
-            "....//....//etc/passwd"
-        ],
-        'ssrf': [
-            "http://127.0.0.1",
-            "http://localhost",
-            "http://169.254.169.254/latest/meta-data/"
-        ]
+        'sql_injection': _SQLI,
+        'xss': _XSS,
+        'command_injection': _CMDI,
+        'path_traversal': _PATH_TRAVERSAL,
+        'ssrf': _SSRF
     }
     
+    # 并发请求上限
+    CONCURRENCY = 100
+    
     def __init__(self, target_url: str):
         self.target_url = target_url
         self.successful_payloads = []
@@ -370,9 +571,7 @@ class IntelligentFuzzer:
         
     def fuzz(self, attack_type: str = 'all', parameters: List[str] = None) -> Dict[str, Any]:
         """执行模糊测试"""
-        print(f"🎯 Fuzzing: {self.target_url}")
-        print(f"🔥 Attack Type: {attack_type}")
-        print("=" * 60)
+        logger.info("🎯 Fuzzing: %s (attack type: %s)", self.target_url, attack_type)
         
         results = {
             'target': self.target_url,
@@ -387,30 +586,48 @@ class IntelligentFuzzer:
         if parameters is None:
             parameters = self._discover_parameters()
         
-        print(f"📋 Testing {len(parameters)} parameters")
+        logger.info("📋 Testing %d parameters", len(parameters))
         
-        # 对每个参数测试每种攻击类型
-        for param in parameters:
-            for atype in attack_types:
-                payloads = self.PAYLOAD_TEMPLATES.get(atype, [])
-                
-                for payload in payloads:
-                    result = self._test_payload(param, payload, atype)
-                    
-                    if result['vulnerable']:
-                        results['findings'].append(result)
-                        results['successful_payloads'].append(payload)
-                        print(f"  🚨 VULNERABLE: {atype} in {param}")
-                        print(f"     Payload: {payload}")
+        # 预先展开全部 (param, atype, payload) 任务，并发执行
+        jobs = [
+            (param, atype, payload)
+            for param in parameters
+            for atype in attack_types
+            for payload in self.PAYLOAD_TEMPLATES.get(atype, [])
+        ]
+        
+        for result in asyncio.run(self._fuzz_async(jobs)):
+            if result['vulnerable']:
+                results['findings'].append(result)
+                results['successful_payloads'].append(result['payload'])
+                logger.warning("🚨 VULNERABLE: %s in %s (payload: %s)",
+                               result['attack_type'], result['parameter'], result['payload'])
         
         return results
     
+    async def _fuzz_async(self, jobs: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """在共享的keep-alive连接池上并发测试所有payload"""
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+        
+        async def run(session, job):
+            param, atype, payload = job
+            async with semaphore:
+                return await self._test_payload(session, param, payload, atype)
+        
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.gather(*(run(None, job) for job in jobs))
+        
+        connector = aiohttp.TCPConnector(limit=200, ttl_dns_cache=300, keepalive_timeout=30)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*(run(session, job) for job in jobs))
+    
     def _discover_parameters(self) -> List[str]:
         """自动发现参数"""
         # 简化实现 - 实际应该从URL和表单中提取
         return ['id', 'user', 'search', 'file']
     
-    def _test_payload(self, parameter: str, payload: str, attack_type: str) -> Dict[str, Any]:
+    async def _test_payload(self, session, parameter: str, payload: str,
+                            attack_type: str) -> Dict[str, Any]:
         """测试单个payload"""
         result = {
             'parameter': parameter,
@@ -425,10 +642,12 @@ class IntelligentFuzzer:
         
         try:
             # 发送请求（仅模拟）
-            # response = requests.get(test_url, timeout=5)
+            # async with session.get(test_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+            #     body = await response.text()
+            body = "mock_response"
             
             # 检测响应特征
-            indicators = self._detect_vulnerability_indicators(attack_type, "mock_response")
+            indicators = self._detect_vulnerability_indicators(attack_type, body)
             
             if indicators:
                 result['vulnerable'] = True
@@ -459,21 +678,7 @@ class IntelligentFuzzer:
     
     def generate_custom_payload(self, base_payload: str, context: Dict) -> List[str]:
         """生成自定义payload（AI增强）"""
-        variations = [base_payload]
-        
-        # 编码变体
-        variations.append(base_payload.replace(' ', '+'))
-        variations.append(base64.b64encode(base_payload.encode()).decode())
-        
-        # URL编码
-        from urllib.parse import quote
-        variations.append(quote(base_payload))
-        
-        # 大小写变体
-        variations.append(base_payload.upper())
-        variations.append(base_payload.lower())
-        
-        return variations
+        return list(_payload_variants(base_payload))
 
 
 # ============================================================================
@@ -491,19 +696,39 @@ class CTFSolver:
         'misc': ['steganography', 'encoding', 'forensics']
     }
     
-    def __init__(self):
-        self.solvers = self._load_solvers()
-        
-    def _load_solvers(self) -> Dict[str, callable]:
-        """加载解题器"""
-        return {
-            'base64': self._solve_base64,
-            'caesar': self._solve_caesar,
-            'sql_injection': self._solve_sql_injection,
-            'xss': self._solve_xss,
-            'strings': self._solve_strings,
-            'steganography': self._solve_stego
-        }
+    # flag{...} / ctf{...}，不区分大小写，花括号内为可打印字符
+    _FLAG_RE = re.compile(rb'(?:flag|ctf)\{[\x20-\x7c\x7e]*\}', re.IGNORECASE)
+    _PRINTABLE_RE = re.compile(rb'[\x20-\x7e]{4,}')
+    
+    # 描述关键词 -> 挑战类型（组名即类型）
+    _KEYWORD_RE = re.compile(
+        r'(?P<base64>base64)'
+        r'|(?P<caesar>caesar|rot)'
+        r'|(?P<sql_injection>sql)'
+        r'|(?P<xss>xss)'
+        r'|(?P<steganography>image|steg)'
+    )
+    _KEYWORD_PRIORITY = ('base64', 'caesar', 'sql_injection', 'xss', 'steganography')
+    
+    # 无关键词命中时按类别选择默认解题器
+    _CATEGORY_DEFAULTS = {
+        'crypto': 'base64',  # 默认尝试base64
+        'web': 'sql_injection',
+        'reverse': 'strings'
+    }
+    
+    # 超过该长度的Caesar密文按偏移分发到多个进程扫描
+    CAESAR_PARALLEL_THRESHOLD = 64 * 1024
+    
+    # 挑战类型 -> 解题方法名，调用时再绑定
+    SOLVERS = {
+        'base64': '_solve_base64',
+        'caesar': '_solve_caesar',
+        'sql_injection': '_solve_sql_injection',
+        'xss': '_solve_xss',
+        'strings': '_solve_strings',
+        'steganography': '_solve_stego'
+    }
     
     def auto_solve(self, challenge_data: Dict[str, Any]) -> Dict[str, Any]:
         """自动解题"""
@@ -512,19 +737,17 @@ class CTFSolver:
         url = challenge_data.get('url')
         file_path = challenge_data.get('file')
         
-        print(f"🏁 CTF Challenge: {challenge_data.get('name', 'Unknown')}")
-        print(f"📂 Category: {category}")
-        print("=" * 60)
+        logger.info("🏁 CTF Challenge: %s (category: %s)", challenge_data.get('name', 'Unknown'), category)
         
         # 识别挑战类型
         challenge_type = self._identify_challenge_type(category, description)
-        print(f"🔍 Identified Type: {challenge_type}")
+        logger.info("🔍 Identified Type: %s", challenge_type)
         
         # 选择合适的解题器
-        solver = self.solvers.get(challenge_type)
+        solver = getattr(self, self.SOLVERS.get(challenge_type, ''), None)
         
         if solver:
-            print(f"🚀 Attempting to solve...")
+            logger.info("🚀 Attempting to solve...")
             result = solver(challenge_data)
             return result
         else:
@@ -535,29 +758,14 @@ class CTFSolver:
     
     def _identify_challenge_type(self, category: str, description: str) -> str:
         """识别挑战类型"""
-        description_lower = description.lower()
-        
-        # 关键词匹配
-        if 'base64' in description_lower:
-            return 'base64'
-        elif 'caesar' in description_lower or 'rot' in description_lower:
-            return 'caesar'
-        elif 'sql' in description_lower:
-            return 'sql_injection'
-        elif 'xss' in description_lower:
-            return 'xss'
-        elif 'image' in description_lower or 'steg' in description_lower:
-            return 'steganography'
+        # 关键词匹配，多个命中时按 _KEYWORD_PRIORITY 取优先级最高者
+        found = {m.lastgroup for m in self._KEYWORD_RE.finditer(description.lower())}
+        for challenge_type in self._KEYWORD_PRIORITY:
+            if challenge_type in found:
+                return challenge_type
         
         # 基于类别
-        if category == 'crypto':
-            return 'base64'  # 默认尝试base64
-        elif category == 'web':
-            return 'sql_injection'
-        elif category == 'reverse':
-            return 'strings'
-        
-        return 'unknown'
+        return self._CATEGORY_DEFAULTS.get(category, 'unknown')
     
     # === 解题器实现 ===
     
@@ -566,28 +774,34 @@ class CTFSolver:
         encoded = data.get('data', '')
         
         try:
-            # 尝试多次解码
-            decoded = encoded
+            # 全程以bytes处理，仅在返回时解码
+            decoded = encoded.encode() if isinstance(encoded, str) else encoded
             iterations = 0
             
+            # 尝试多次解码，首层容忍空白等非法字符，之后的层须为严格的base64
             while iterations < 10:
                 try:
-                    decoded = base64.b64decode(decoded).decode('utf-8')
-                    iterations += 1
-                    
-                    # 检查是否是flag
-                    if self._is_flag(decoded):
-                        return {
-                            'success': True,
-                            'flag': decoded,
-                            'iterations': iterations
-                        }
-                except:
+                    layer = base64.b64decode(decoded, validate=iterations > 0)
+                except (binascii.Error, ValueError):
+                    break
+                
+                # 检查是否是flag
+                if self._FLAG_RE.search(layer):
+                    return {
+                        'success': True,
+                        'flag': layer.decode('utf-8', 'replace'),
+                        'iterations': iterations + 1
+                    }
+                
+                # 解出的不是可打印文本时，说明上一层已是明文，不再继续解码
+                if not self._is_printable_text(layer):
                     break
+                decoded = layer
+                iterations += 1
             
             return {
                 'success': True,
-                'result': decoded,
+                'result': decoded.decode('utf-8', 'replace'),
                 'iterations': iterations
             }
         
@@ -601,6 +815,29 @@ class CTFSolver:
         """解Caesar密码"""
         encrypted = data.get('data', '')
         
+        # 长密文分发到多进程，短密文用NumPy向量化，均一次性处理全部26种偏移
+        scan = None
+        if encrypted.isascii():
+            if len(encrypted) >= self.CAESAR_PARALLEL_THRESHOLD:
+                scan = _caesar_scan_parallel
+            elif NUMPY_AVAILABLE:
+                scan = self._caesar_scan_vectorized
+        
+        if scan is not None:
+            hit = scan(encrypted.encode('ascii'))
+            if hit:
+                shift, candidate = hit
+                return {
+                    'success': True,
+                    'flag': candidate.decode('ascii'),
+                    'shift': shift
+                }
+            
+            return {
+                'success': False,
+                'message': 'No valid flag found'
+            }
+        
         # 尝试所有可能的偏移
         for shift in range(26):
             decrypted = self._caesar_decrypt(encrypted, shift)
@@ -617,29 +854,35 @@ class CTFSolver:
             'message': 'No valid flag found'
         }
     
+    @classmethod
+    def _caesar_scan_vectorized(cls, data: bytes) -> Optional[Tuple[int, bytes]]:
+        """计算全部偏移的明文矩阵 (26, N)，返回第一个含flag的 (偏移, 明文)"""
+        arr = np.frombuffer(data, dtype=np.uint8).astype(np.int16)
+        upper = (arr >= 65) & (arr <= 90)
+        lower = (arr >= 97) & (arr <= 122)
+        shifted = arr - np.arange(26, dtype=np.int16)[:, None]
+        
+        candidates = np.where(
+            upper, (shifted - 65) % 26 + 65,
+            np.where(lower, (shifted - 97) % 26 + 97, arr)
+        ).astype(np.uint8)
+        
+        for shift, row in enumerate(candidates):
+            candidate = row.tobytes()
+            if cls._FLAG_RE.search(candidate):
+                return shift, candidate
+        return None
+    
     def _caesar_decrypt(self, text: str, shift: int) -> str:
         """Caesar解密"""
-        result = ""
-        for char in text:
-            if char.isalpha():
-                ascii_offset = 65 if char.isupper() else 97
-                result += chr((ord(char) - ascii_offset - shift) % 26 + ascii_offset)
-            else:
-                result += char
-        return result
+        return text.translate(_caesar_table(shift))
     
     def _solve_sql_injection(self, data: Dict) -> Dict[str, Any]:
         """解SQL注入题"""
         url = data.get('url')
         
         # 尝试常见SQL注入payload
-        payloads = [
-            "admin' --",
-            "' OR '1'='1",
-            "admin' OR '1'='1'--"
-        ]
-        
-        for payload in payloads:
+        for payload in _CTF_SQLI:
             # 模拟测试
             if self._test_sql_payload(url, payload):
                 return {
@@ -657,13 +900,7 @@ class CTFSolver:
         """解XSS题"""
         url = data.get('url')
         
-        xss_payloads = [
-            "<script>alert(1)</script>",
-            "<img src=x onerror=alert(1)>",
-            "<svg/onload=alert(1)>"
-        ]
-        
-        for payload in xss_payloads:
+        for payload in _CTF_XSS:
             # 模拟测试
             pass
         
@@ -682,27 +919,32 @@ class CTFSolver:
                 'message': 'File not found'
             }
         
-        # 读取文件中的字符串
+        # 空文件无法mmap
+        if os.path.getsize(file_path) == 0:
+            return {
+                'success': False,
+                'strings': []
+            }
+        
+        # 通过mmap原地扫描文件，无需整体读入内存
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                
-            # 提取可打印字符串
-            strings = re.findall(b'[\x20-\x7e]{4,}', content)
-            
-            # 查找flag
-            for s in strings:
-                s_decoded = s.decode('utf-8', errors='ignore')
-                if self._is_flag(s_decoded):
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # 直接在原始字节上查找flag
+                match = self._FLAG_RE.search(mm)
+                if match:
                     return {
                         'success': True,
-                        'flag': s_decoded
+                        'flag': match.group().decode('utf-8', errors='ignore')
                     }
-            
-            return {
-                'success': False,
-                'strings': [s.decode('utf-8', errors='ignore') for s in strings[:10]]
-            }
+                
+                # 提取前10个可打印字符串
+                strings = islice(self._PRINTABLE_RE.finditer(mm), 10)
+                
+                return {
+                    'success': False,
+                    'strings': [m.group().decode('utf-8', errors='ignore') for m in strings]
+                }
         
         except Exception as e:
             return {
@@ -717,32 +959,90 @@ class CTFSolver:
             'message': 'Steganography solver requires specialized tools'
         }
     
-    def _is_flag(self, text: str) -> bool:
+    @staticmethod
+    def _is_printable_text(data: bytes) -> bool:
+        """检查bytes是否为可打印的UTF-8文本（允许空白字符）"""
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return False
+        return all(ch.isprintable() or ch.isspace() for ch in text)
+    
+    def _is_flag(self, text) -> bool:
         """检查是否是flag"""
-        flag_patterns = [
-            r'flag\{.*?\}',
-            r'FLAG\{.*?\}',
-            r'ctf\{.*?\}',
-            r'CTF\{.*?\}'
-        ]
-        
-        for pattern in flag_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        
-        return False
+        if isinstance(text, str):
+            text = text.encode('utf-8', 'ignore')
+        return bool(self._FLAG_RE.search(text))
     
     def _test_sql_payload(self, url: str, payload: str) -> bool:
         """测试SQL payload"""
         # 简化实现
+        # response = _SESSION.get(url, params={'username': payload}, timeout=5)
         return False
 
 
+# Caesar转换表与多进程扫描 - worker函数须位于模块级以便pickle
+_caesar_worker_data = b''
+
+
+def _shifted_alphabet(shift: int) -> str:
+    """字母表整体左移shift位后的大小写字母"""
+    upper = ''.join(chr((i - shift) % 26 + 65) for i in range(26))
+    return upper + upper.lower()
+
+
+@lru_cache(maxsize=26)
+def _caesar_table(shift: int) -> Dict[int, int]:
+    """偏移shift的str解密转换表"""
+    return str.maketrans(string.ascii_uppercase + string.ascii_lowercase, _shifted_alphabet(shift))
+
+
+@lru_cache(maxsize=26)
+def _caesar_bytes_table(shift: int) -> bytes:
+    """偏移shift的bytes解密转换表"""
+    return bytes.maketrans((string.ascii_uppercase + string.ascii_lowercase).encode(),
+                           _shifted_alphabet(shift).encode())
+
+
+def _init_caesar_worker(data: bytes):
+    """每个worker进程只接收一次密文"""
+    global _caesar_worker_data
+    _caesar_worker_data = data
+
+
+def _scan_caesar_shift(shift: int) -> Optional[bytes]:
+    candidate = _caesar_worker_data.translate(_caesar_bytes_table(shift))
+    return candidate if CTFSolver._FLAG_RE.search(candidate) else None
+
+
+def _caesar_scan_parallel(data: bytes) -> Optional[Tuple[int, bytes]]:
+    """26个偏移并行扫描，返回偏移最小的命中"""
+    executor = ProcessPoolExecutor(
+        max_workers=min(26, os.cpu_count() or 1),
+        initializer=_init_caesar_worker,
+        initargs=(data,)
+    )
+    futures = [executor.submit(_scan_caesar_shift, shift) for shift in range(26)]
+    try:
+        for shift, future in enumerate(futures):
+            candidate = future.result()
+            if candidate is not None:
+                return shift, candidate
+        return None
+    finally:
+        # 命中后取消尚未开始的偏移（shutdown(cancel_futures=True) 需要Python 3.9+）
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+
+
 # ============================================================================
 # 使用示例
 # ============================================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     print("🔥 HexStrike AI Advanced Features")
     print("=" * 60)
     
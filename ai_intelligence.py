@@ -13,13 +13,31 @@ AI Intelligence & Learning Module
 import json
 import os
 import pickle
+import re
 import time
-from collections import defaultdict
+from array import array
+from collections import Counter, defaultdict
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# URL / IP / 域名 合并为一个正则，单次扫描提取全部目标
+_TARGET_RE = re.compile(
+    r'(?P<url>https?://[^\s]+)'
+    r'|(?P<ip>\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b)'
+    r'|(?P<domain>\b(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}\b)'
+)
+
+_IP_RE = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
+
 
 # ============================================================================
 # 1. AI 对话系统 - 自然语言理解
@@ -59,26 +77,48 @@ class NLPIntentClassifier:
         ]
     }
     
+    def __init__(self):
+        # 小写pattern -> 所属意图，以及每个意图的pattern数
+        self._pattern_to_intent = {
+            pattern.lower(): intent
+            for intent, patterns in self.INTENT_PATTERNS.items()
+            for pattern in patterns
+        }
+        self._intent_sizes = {intent: len(patterns) for intent, patterns in self.INTENT_PATTERNS.items()}
+        
+        # Aho-Corasick自动机: 单次线性扫描找出所有命中的pattern
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for pattern in self._pattern_to_intent:
+                self._automaton.add_word(pattern, pattern)
+            self._automaton.make_automaton()
+    
+    def _match_patterns(self, text: str) -> set:
+        """返回文本中出现的全部pattern（允许重叠）"""
+        if self._automaton is not None:
+            return {pattern for _, pattern in self._automaton.iter(text)}
+        return {pattern for pattern in self._pattern_to_intent if pattern in text}
+    
     def classify(self, user_input: str) -> Dict[str, Any]:
         """分类用户意图"""
         user_input = user_input.lower()
         
         # 计算每个意图的匹配分数
-        scores = defaultdict(int)
-        for intent, patterns in self.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if pattern.lower() in user_input:
-                    scores[intent] += 1
+        counts = Counter(self._pattern_to_intent[pattern] for pattern in self._match_patterns(user_input))
+        
+        # 按INTENT_PATTERNS顺序排列，保持同分时的选择不变
+        scores = {intent: counts[intent] for intent in self.INTENT_PATTERNS if intent in counts}
         
         # 获取最高分意图
         if scores:
             best_intent = max(scores, key=scores.get)
-            confidence = scores[best_intent] / len(self.INTENT_PATTERNS[best_intent])
+            confidence = scores[best_intent] / self._intent_sizes[best_intent]
             
             return {
                 'intent': best_intent,
                 'confidence': min(confidence, 1.0),
-                'all_scores': dict(scores)
+                'all_scores': scores
             }
         
         return {
@@ -88,27 +128,8 @@ class NLPIntentClassifier:
         }
     
     def extract_targets(self, user_input: str) -> List[str]:
-        """提取目标信息"""
-        import re
-        
-        targets = []
-        
-        # 提取 IP 地址
-        ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-        ips = re.findall(ip_pattern, user_input)
-        targets.extend(ips)
-        
-        # 提取域名
-        domain_pattern = r'\b(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}\b'
-        domains = re.findall(domain_pattern, user_input)
-        targets.extend(domains)
-        
-        # 提取 URL
-        url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, user_input)
-        targets.extend(urls)
-        
-        return list(set(targets))
+        """提取目标信息（URL、IP 地址、域名）"""
+        return list({m.group() for m in _TARGET_RE.finditer(user_input)})
 
 
 # ============================================================================
@@ -165,9 +186,28 @@ class IntelligentDecisionEngine:
         }
     }
     
+    # 技术栈 -> Nuclei标签（按优先级排列）
+    NUCLEI_TECH_TAGS = {
+        'apache': 'apache',
+        'nginx': 'nginx'
+    }
+    
     def __init__(self):
         self.learning_data = self._load_learning_data()
         
+        # 预计算基础分数（准确性、速度、功能），请求时只需加上学习加成
+        self._base_scores = {
+            intent: {
+                tool: (
+                    cap['priority'][tool]['accuracy'] * 0.4 +
+                    cap['priority'][tool]['speed'] * 0.3 +
+                    cap['priority'][tool]['features'] * 0.3
+                )
+                for tool in cap['tools'] if tool in cap['priority']
+            }
+            for intent, cap in self.TOOL_CAPABILITIES.items()
+        }
+        
     def _load_learning_data(self) -> Dict[str, Any]:
         """加载学习数据"""
         data_file = './ai_learning_data.json'
@@ -184,52 +224,29 @@ class IntelligentDecisionEngine:
                 'reason': f"No tools available for intent: {intent}"
             }
         
-        tools = self.TOOL_CAPABILITIES[intent]['tools']
-        priorities = self.TOOL_CAPABILITIES[intent]['priority']
-        
-        # 根据优先级和学习数据评分
+        # 基础分数 + 学习加成（最多+2分）
+        success_rates = self.learning_data['tool_success_rate']
+        # 计分时同步记录最高分工具，避免再次遍历
         scores = {}
-        for tool in tools:
-            if tool in priorities:
-                priority = priorities[tool]
-                
-                # 基础分数（准确性、速度、功能）
-                base_score = (
-                    priority['accuracy'] * 0.4 +
-                    priority['speed'] * 0.3 +
-                    priority['features'] * 0.3
-                )
-                
-                # 学习加成
-                success_rate = self.learning_data['tool_success_rate'].get(tool, 0.5)
-                learning_bonus = success_rate * 2  # 最多+2分
-                
-                scores[tool] = base_score + learning_bonus
-        
-        # 选择最高分工具
-        best_tool = max(scores, key=scores.get)
+        best_tool, best_score = None, float('-inf')
+        for tool, base_score in self._base_scores[intent].items():
+            score = base_score + success_rates.get(tool, 0.5) * 2
+            scores[tool] = score
+            if score > best_score:
+                best_tool, best_score = tool, score
         
         return {
             'tool': best_tool,
-            'score': scores[best_tool],
+            'score': best_score,
             'all_scores': scores,
             'reason': f"Selected based on accuracy, speed, features and historical success rate"
         }
     
     def optimize_parameters(self, tool: str, target: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """优化工具参数"""
-        params = {}
-        
-        # 基于工具类型优化参数
-        if tool == 'nmap':
-            params = self._optimize_nmap(target, context)
-        elif tool == 'gobuster':
-            params = self._optimize_gobuster(target, context)
-        elif tool == 'nuclei':
-            params = self._optimize_nuclei(target, context)
-        # ... 其他工具
-        
-        return params
+        # 基于工具类型查表分发，未登记的工具不做优化
+        optimizer = self._OPTIMIZERS.get(tool)
+        return optimizer(self, target, context) if optimizer else {}
     
     def _optimize_nmap(self, target: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """优化 Nmap 参数"""
@@ -268,46 +285,112 @@ class IntelligentDecisionEngine:
             'tags': ''
         }
         
-        # 根据技术栈添加标签
-        tech_stack = context.get('tech_stack', [])
-        if 'apache' in tech_stack:
-            params['tags'] = 'apache'
-        elif 'nginx' in tech_stack:
-            params['tags'] = 'nginx'
+        # 根据技术栈添加标签（按NUCLEI_TECH_TAGS顺序取第一个命中的）
+        tech_stack = context.get('tech_stack', ())
+        for tech, tag in self.NUCLEI_TECH_TAGS.items():
+            if tech in tech_stack:
+                params['tags'] = tag
+                break
         
         return params
+    
+    # 工具 -> 参数优化函数（新增工具在此登记）
+    _OPTIMIZERS = {
+        'nmap': _optimize_nmap,
+        'gobuster': _optimize_gobuster,
+        'nuclei': _optimize_nuclei
+    }
 
 
 # ============================================================================
 # 3. 学习系统 - 从历史中学习
 # ============================================================================
 
+def _new_tool_performance() -> Dict[str, array]:
+    """单个工具的性能记录（列式存储: 成功标记 / 耗时）"""
+    return {'success': array('B'), 'duration': array('d')}
+
+
 class LearningSystem:
-    """学习系统 - 从扫描历史中学习优化策略"""
+    """学习系统 - 从扫描历史中学习优化策略
+    
+    持久化分两部分: data_file 为pickle快照，data_file + '.jsonl' 为快照之后
+    新增扫描的追加日志。每累计 SNAPSHOT_INTERVAL 条日志写一次快照并清空日志。
+    """
+    
+    SNAPSHOT_INTERVAL = 1000
     
     def __init__(self, data_file: str = './learning_data.pkl'):
         self.data_file = data_file
+        self.log_file = f"{data_file}.jsonl"
         self.history = self._load_history()
         
+        # 目标类型 -> 各工具成功次数
+        self._patterns_by_type = defaultdict(Counter)
+        for pattern in self.history['success_patterns']:
+            self._patterns_by_type[pattern['target_type']][pattern['tool']] += 1
+        
+        # 重放快照之后的追加日志
+        self._pending_records = 0
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        self._apply_scan(json.loads(line))
+                        self._pending_records += 1
+        
     def _load_history(self) -> Dict[str, List]:
         """加载历史数据"""
         if os.path.exists(self.data_file):
             with open(self.data_file, 'rb') as f:
-                return pickle.load(f)
+                history = pickle.load(f)
+            history['tool_performance'] = self._migrate_tool_performance(history['tool_performance'])
+            return history
         return {
             'scans': [],
-            'tool_performance': defaultdict(list),
+            'tool_performance': defaultdict(_new_tool_performance),
             'success_patterns': []
         }
     
+    @staticmethod
+    def _migrate_tool_performance(tool_performance: Dict) -> Dict[str, Dict[str, array]]:
+        """将旧格式（每个工具一个dict列表）转换为列式存储"""
+        migrated = defaultdict(_new_tool_performance)
+        for tool, performances in tool_performance.items():
+            if isinstance(performances, dict):
+                migrated[tool] = performances
+                continue
+            columns = migrated[tool]
+            for p in performances:
+                columns['success'].append(1 if p['success'] else 0)
+                columns['duration'].append(float(p['duration'] or 0))
+        return migrated
+    
     def _save_history(self):
-        """保存历史数据"""
-        with open(self.data_file, 'wb') as f:
+        """保存历史快照并清空追加日志"""
+        tmp_file = f"{self.data_file}.tmp"
+        with open(tmp_file, 'wb') as f:
             pickle.dump(self.history, f)
+        os.replace(tmp_file, self.data_file)
+        
+        open(self.log_file, 'w').close()
+        self._pending_records = 0
     
     def record_scan(self, scan_data: Dict[str, Any]):
         """记录扫描结果"""
         scan_data['timestamp'] = datetime.now().isoformat()
+        self._apply_scan(scan_data)
+        
+        # 追加写入日志，定期生成快照
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(scan_data, default=str) + '\n')
+        self._pending_records += 1
+        
+        if self._pending_records >= self.SNAPSHOT_INTERVAL:
+            self._save_history()
+    
+    def _apply_scan(self, scan_data: Dict[str, Any]):
+        """将一条扫描记录合并到内存中的历史和索引"""
         self.history['scans'].append(scan_data)
         
         # 记录工具性能
@@ -316,11 +399,9 @@ class LearningSystem:
         duration = scan_data.get('duration', 0)
         
         if tool:
-            self.history['tool_performance'][tool].append({
-                'success': success,
-                'duration': duration,
-                'timestamp': scan_data['timestamp']
-            })
+            performance = self.history['tool_performance'][tool]
+            performance['success'].append(1 if success else 0)
+            performance['duration'].append(float(duration or 0))
         
         # 识别成功模式
         if success:
@@ -330,41 +411,40 @@ class LearningSystem:
                 'parameters': scan_data.get('parameters')
             }
             self.history['success_patterns'].append(pattern)
-        
-        self._save_history()
+            self._patterns_by_type[pattern['target_type']][tool] += 1
     
     def analyze_tool_effectiveness(self, tool: str) -> Dict[str, Any]:
         """分析工具有效性"""
-        performances = self.history['tool_performance'].get(tool, [])
+        performance = self.history['tool_performance'].get(tool)
         
-        if not performances:
+        if not performance or not performance['success']:
             return {
                 'success_rate': 0.0,
                 'avg_duration': 0.0,
                 'total_uses': 0
             }
         
-        successes = sum(1 for p in performances if p['success'])
-        total = len(performances)
-        avg_duration = sum(p['duration'] for p in performances) / total
+        successes = performance['success']
+        total = len(successes)
         
         return {
-            'success_rate': successes / total,
-            'avg_duration': avg_duration,
+            'success_rate': sum(successes) / total,
+            'avg_duration': sum(performance['duration']) / total,
             'total_uses': total,
-            'recent_trend': self._get_recent_trend(performances)
+            'recent_trend': self._get_recent_trend(successes)
         }
     
-    def _get_recent_trend(self, performances: List[Dict]) -> str:
+    def _get_recent_trend(self, successes: array) -> str:
         """获取最近趋势"""
-        if len(performances) < 10:
+        # 至少需要10条最近记录和1条更早的记录
+        if len(successes) <= 10:
             return 'insufficient_data'
         
-        recent = performances[-10:]
-        older = performances[-20:-10] if len(performances) >= 20 else performances[:-10]
+        recent = successes[-10:]
+        older = successes[-20:-10] if len(successes) >= 20 else successes[:-10]
         
-        recent_success = sum(1 for p in recent if p['success']) / len(recent)
-        older_success = sum(1 for p in older if p['success']) / len(older)
+        recent_success = sum(recent) / len(recent)
+        older_success = sum(older) / len(older)
         
         if recent_success > older_success + 0.1:
             return 'improving'
@@ -376,36 +456,27 @@ class LearningSystem:
     def recommend_workflow(self, intent: str, target: str) -> List[Dict[str, Any]]:
         """推荐工作流"""
         # 基于成功模式推荐
-        relevant_patterns = [
-            p for p in self.history['success_patterns']
-            if p.get('target_type') == self._classify_target(target)
-        ]
+        tool_counts = self._patterns_by_type.get(self._classify_target(target))
         
-        if not relevant_patterns:
+        if not tool_counts:
             # 使用默认工作流
             return self._get_default_workflow(intent)
         
-        # 统计最常见的成功模式
-        tool_counts = defaultdict(int)
-        for pattern in relevant_patterns:
-            tool_counts[pattern['tool']] += 1
-        
-        # 构建推荐工作流
+        # 构建推荐工作流（最常见的成功模式）
+        total = sum(tool_counts.values())
         workflow = []
-        for tool, count in sorted(tool_counts.items(), key=lambda x: x[1], reverse=True)[:3]:
+        for tool, count in tool_counts.most_common(3):
             workflow.append({
                 'tool': tool,
-                'confidence': count / len(relevant_patterns),
-                'reason': f'Successful in {count}/{len(relevant_patterns)} similar scans'
+                'confidence': count / total,
+                'reason': f'Successful in {count}/{total} similar scans'
             })
         
         return workflow
     
     def _classify_target(self, target: str) -> str:
         """分类目标类型"""
-        import re
-        
-        if re.match(r'^\d+\.\d+\.\d+\.\d+$', target):
+        if _IP_RE.match(target):
             return 'ip'
         elif target.startswith('http'):
             return 'url'
@@ -447,8 +518,11 @@ class IntelligentRecommender:
         
     def process_request(self, user_input: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """处理用户请求"""
-        if context is None:
-            context = {}
+        # tech_stack统一转为frozenset，供各参数优化函数O(1)判断成员（不修改调用方的dict）
+        tech_stack = (context or {}).get('tech_stack') or ()
+        if isinstance(tech_stack, str):
+            tech_stack = (tech_stack,)
+        context = {**(context or {}), 'tech_stack': frozenset(tech_stack)}
         
         # 1. 理解意图
         intent_result = self.nlp.classify(user_input)
@@ -11,19 +11,132 @@ Flask中间件集成性能优化功能:
 
 import time
 import logging
+import threading
 from functools import wraps
-from typing import Optional
-from flask import request, Response, jsonify, g
-import gzip
+from typing import Dict, Optional
+from uuid import uuid4
+from flask import request, Response, g
+from flask.json.provider import DefaultJSONProvider
 
 try:
-    import brotli
+    # gevent打补丁后 threading.get_ident 返回greenlet标识，这里取原始的OS线程标识
+    from gevent.monkey import get_original
+    _os_thread_ident = get_original('_thread', 'get_ident')
+except ImportError:
+    _os_thread_ident = threading.get_ident
+
+# 优先使用SIMD加速的deflate实现（ISA-L / zlib-ng），接口与zlib一致
+try:
+    from isal import isal_zlib as zlib
+except ImportError:
+    try:
+        from zlib_ng import zlib_ng as zlib
+    except ImportError:
+        import zlib
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotlicffi as brotli
     BROTLI_AVAILABLE = True
 except ImportError:
-    BROTLI_AVAILABLE = False
+    try:
+        import brotli
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# 可压缩的内容类型前缀（application/xml 同时覆盖 application/xml+rss）
+_COMPRESSIBLE_PREFIXES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+# 已压缩的二进制类型直接跳过；text/event-stream 为流式响应，读取body会阻塞到流结束
+_INCOMPRESSIBLE_PREFIXES = (
+    'image/', 'video/', 'audio/', 'application/zip', 'application/gzip',
+    'application/x-br', 'text/event-stream'
+)
+
+
+def dump_json(payload) -> bytes:
+    """序列化为JSON字节串（优先orjson；无法识别的对象按str处理）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """jsonify 的替代：直接用 dump_json 序列化生成响应"""
+    return Response(dump_json(payload), status=status, mimetype='application/json')
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    基于orjson的Flask JSON provider（request.get_json / jsonify 共用）
+    
+    输出与Flask默认provider保持一致：datetime/date 交给 default 按 http_date 格式化，
+    orjson无法处理的值（如超过64位的整数）回退到标准库序列化。
+    """
+
+    def _options(self, **kwargs) -> int:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(**kwargs)).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent=indent))
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+# 限流响应体是常量，导入时序列化一次，过载时直接复用
+_RATE_LIMIT_BODY = dump_json({
+    'success': False,
+    'error': 'Rate limit exceeded',
+    'message': 'Too many requests. Please try again later.'
+})
+_RATE_LIMIT_DECORATOR_BODY = dump_json({
+    'success': False,
+    'error': 'Rate limit exceeded'
+})
+
+
+def _accept_encoding() -> str:
+    """当前请求的Accept-Encoding（小写），在g上缓存供其他中间件复用"""
+    accept_encoding = g.get('_accept_encoding')
+    if accept_encoding is None:
+        accept_encoding = g._accept_encoding = request.headers.get('Accept-Encoding', '').lower()
+    return accept_encoding
+
+
+def _add_vary_accept_encoding(response: Response):
+    """在已有Vary头上追加Accept-Encoding，而不是覆盖"""
+    vary = response.headers.get('Vary')
+    if not vary:
+        response.headers['Vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        response.headers['Vary'] = f"{vary}, Accept-Encoding"
+
 
 # ============================================================================
 # COMPRESSION MIDDLEWARE
@@ -32,10 +145,12 @@ logger = logging.getLogger(__name__)
 class FlaskCompressionMiddleware:
     """Flask响应压缩中间件"""
     
-    def __init__(self, app=None, min_size=1024, compresslevel=6):
+    def __init__(self, app=None, min_size=1024, compresslevel=6, json_compresslevel=1):
         self.app = app
         self.min_size = min_size
         self.compresslevel = compresslevel
+        # JSON在低压缩级别下已有很好的压缩率，且CPU开销小得多
+        self.json_compresslevel = json_compresslevel
         
         if app is not None:
             self.init_app(app)
@@ -51,10 +166,10 @@ class FlaskCompressionMiddleware:
             return response
         
         # 获取客户端支持的压缩方式
-        accept_encoding = request.headers.get('Accept-Encoding', '').lower()
+        accept_encoding = _accept_encoding()
         
         # 压缩响应
-        if 'br' in accept_encoding and BROTLI_AVAILABLE:
+        if BROTLI_AVAILABLE and 'br' in accept_encoding:
             response = self._compress_brotli(response)
         elif 'gzip' in accept_encoding:
             response = self._compress_gzip(response)
@@ -67,14 +182,15 @@ class FlaskCompressionMiddleware:
         if response.status_code < 200 or response.status_code >= 300:
             return False
         
+        # 直接透传的响应（如send_file）不读取其body
+        if response.direct_passthrough:
+            return False
+        
         # 检查内容类型
         content_type = response.content_type or ''
-        compressible_types = {
-            'text/', 'application/json', 'application/javascript',
-            'application/xml', 'application/xml+rss'
-        }
-        
-        if not any(ct in content_type for ct in compressible_types):
+        if content_type.startswith(_INCOMPRESSIBLE_PREFIXES):
+            return False
+        if not content_type.startswith(_COMPRESSIBLE_PREFIXES):
             return False
         
         # 检查大小
@@ -91,15 +207,22 @@ class FlaskCompressionMiddleware:
         """使用Gzip压缩"""
         try:
             data = response.get_data()
-            compressed = gzip.compress(data, compresslevel=self.compresslevel)
+            level = self.json_compresslevel if response.is_json else self.compresslevel
+            level = min(level, zlib.Z_BEST_COMPRESSION)  # ISA-L仅支持0-3级
+            
+            # wbits=31: 直接输出gzip格式（头部+CRC），省去gzip模块的额外开销
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            compressed = compressor.compress(data) + compressor.flush()
             
-            response.set_data(compressed)
+            response.response = [compressed]
+            response.direct_passthrough = False
+            response.content_length = len(compressed)
             response.headers['Content-Encoding'] = 'gzip'
-            response.headers['Content-Length'] = len(compressed)
-            response.headers['Vary'] = 'Accept-Encoding'
+            _add_vary_accept_encoding(response)
             
-            logger.debug(f"Gzip compression: {len(data)} -> {len(compressed)} bytes "
-                        f"({100 * (1 - len(compressed)/len(data)):.1f}% reduction)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Gzip compression: {len(data)} -> {len(compressed)} bytes "
+                            f"({100 * (1 - len(compressed)/len(data)):.1f}% reduction)")
         except Exception as e:
             logger.error(f"Gzip compression failed: {e}")
         
@@ -112,13 +235,15 @@ class FlaskCompressionMiddleware:
             # 使用质量级别4（平衡速度和压缩率）
             compressed = brotli.compress(data, quality=4)
             
-            response.set_data(compressed)
+            response.response = [compressed]
+            response.direct_passthrough = False
+            response.content_length = len(compressed)
             response.headers['Content-Encoding'] = 'br'
-            response.headers['Content-Length'] = len(compressed)
-            response.headers['Vary'] = 'Accept-Encoding'
+            _add_vary_accept_encoding(response)
             
-            logger.debug(f"Brotli compression: {len(data)} -> {len(compressed)} bytes "
-                        f"({100 * (1 - len(compressed)/len(data)):.1f}% reduction)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Brotli compression: {len(data)} -> {len(compressed)} bytes "
+                            f"({100 * (1 - len(compressed)/len(data)):.1f}% reduction)")
         except Exception as e:
             logger.error(f"Brotli compression failed: {e}")
         
@@ -147,29 +272,48 @@ class FlaskRateLimitMiddleware:
     def check_rate_limit(self):
         """检查请求是否超过限流"""
         if self.rate_limiter and not self.rate_limiter.allow_request():
-            return jsonify({
-                'success': False,
-                'error': 'Rate limit exceeded',
-                'message': 'Too many requests. Please try again later.'
-            }), 429
+            return Response(_RATE_LIMIT_BODY, status=429, mimetype='application/json')
 
 
 # ============================================================================
 # PERFORMANCE MONITORING MIDDLEWARE
 # ============================================================================
 
+class _StatsAccumulator:
+    """单个OS线程的请求耗时累计（只由所属线程写入）"""
+    
+    __slots__ = ('count', 'total_ns', 'slowest_ns', 'fastest_ns')
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.count = 0
+        self.total_ns = 0
+        self.slowest_ns = 0
+        self.fastest_ns = None
+
+
 class FlaskPerformanceMiddleware:
-    """Flask性能监控中间件"""
+    """Flask性能监控中间件
+    
+    每个OS线程先在本地累计，满 FLUSH_EVERY 个请求才加锁合并到共享统计，
+    避免多线程worker在每个请求上争用同一把锁。累计器按真实线程标识索引：
+    gevent下同一线程的greenlet共用一个累计器（更新中没有切换点，互不干扰），
+    不会每个请求新建一个。
+    """
+    
+    FLUSH_EVERY = 128
     
     def __init__(self, app=None):
         self.app = app
-        self.stats = {
-            'total_requests': 0,
-            'total_time': 0.0,
-            'avg_time': 0.0,
-            'slowest': 0.0,
-            'fastest': float('inf')
-        }
+        # 使用单调时钟的整数纳秒累计，平均值等在 get_stats 中再换算
+        self._lock = threading.Lock()
+        self._total_requests = 0
+        self._total_ns = 0
+        self._slowest_ns = 0
+        self._fastest_ns = None
+        self._accumulators: Dict[int, _StatsAccumulator] = {}
         
         if app is not None:
             self.init_app(app)
@@ -181,19 +325,25 @@ class FlaskPerformanceMiddleware:
     
     def before_request(self):
         """请求前记录时间"""
-        g.start_time = time.time()
+        g.start_time = time.perf_counter_ns()
     
     def after_request(self, response: Response) -> Response:
         """请求后计算耗时"""
         if hasattr(g, 'start_time'):
-            elapsed = time.time() - g.start_time
+            elapsed_ns = time.perf_counter_ns() - g.start_time
+            
+            # 更新本线程统计，定期合并
+            acc = self._accumulator()
+            acc.count += 1
+            acc.total_ns += elapsed_ns
+            if elapsed_ns > acc.slowest_ns:
+                acc.slowest_ns = elapsed_ns
+            if acc.fastest_ns is None or elapsed_ns < acc.fastest_ns:
+                acc.fastest_ns = elapsed_ns
+            if acc.count >= self.FLUSH_EVERY:
+                self._fold(acc)
             
-            # 更新统计
-            self.stats['total_requests'] += 1
-            self.stats['total_time'] += elapsed
-            self.stats['avg_time'] = self.stats['total_time'] / self.stats['total_requests']
-            self.stats['slowest'] = max(self.stats['slowest'], elapsed)
-            self.stats['fastest'] = min(self.stats['fastest'], elapsed)
+            elapsed = elapsed_ns / 1e9
             
             # 添加响应头
             response.headers['X-Response-Time'] = f"{elapsed:.4f}s"
@@ -204,9 +354,48 @@ class FlaskPerformanceMiddleware:
         
         return response
     
+    def _accumulator(self) -> _StatsAccumulator:
+        """获取（必要时创建）当前OS线程的累计器"""
+        ident = _os_thread_ident()
+        acc = self._accumulators.get(ident)
+        if acc is None:
+            with self._lock:
+                acc = self._accumulators.setdefault(ident, _StatsAccumulator())
+        return acc
+    
+    def _fold(self, acc: _StatsAccumulator):
+        """把线程累计并入共享统计并清零"""
+        with self._lock:
+            self._total_requests += acc.count
+            self._total_ns += acc.total_ns
+            self._slowest_ns = max(self._slowest_ns, acc.slowest_ns)
+            if acc.fastest_ns is not None and (self._fastest_ns is None or acc.fastest_ns < self._fastest_ns):
+                self._fastest_ns = acc.fastest_ns
+            acc.reset()
+    
     def get_stats(self) -> dict:
-        """获取统计信息"""
-        return self.stats.copy()
+        """获取统计信息（包含各线程尚未合并的部分）"""
+        with self._lock:
+            count = self._total_requests
+            total_ns = self._total_ns
+            slowest_ns = self._slowest_ns
+            fastest_ns = self._fastest_ns
+            
+            # 只读汇总，不清零其他线程的累计器，避免与其写入竞争
+            for acc in self._accumulators.values():
+                count += acc.count
+                total_ns += acc.total_ns
+                slowest_ns = max(slowest_ns, acc.slowest_ns)
+                if acc.fastest_ns is not None and (fastest_ns is None or acc.fastest_ns < fastest_ns):
+                    fastest_ns = acc.fastest_ns
+        
+        return {
+            'total_requests': count,
+            'total_time': total_ns / 1e9,
+            'avg_time': total_ns / count / 1e9 if count else 0.0,
+            'slowest': slowest_ns / 1e9,
+            'fastest': fastest_ns / 1e9 if fastest_ns is not None else float('inf')
+        }
 
 
 # ============================================================================
@@ -297,8 +486,7 @@ class FlaskRequestIDMiddleware:
     
     def add_request_id(self):
         """添加请求ID"""
-        import uuid
-        request_id = request.headers.get(self.header_name) or str(uuid.uuid4())
+        request_id = request.headers.get(self.header_name) or uuid4().hex
         g.request_id = request_id
     
     def add_response_id(self, response: Response) -> Response:
@@ -326,12 +514,18 @@ class MiddlewareManager:
         """初始化所有中间件"""
         config = config or {}
         
+        # orjson JSON provider
+        if config.get('orjson_enabled', True) and ORJSON_AVAILABLE:
+            app.json = OrjsonJSONProvider(app)
+            logger.info("✅ orjson JSON provider enabled")
+        
         # 压缩中间件
         if config.get('compression_enabled', True):
             self.middlewares['compression'] = FlaskCompressionMiddleware(
                 app,
                 min_size=config.get('compression_min_size', 1024),
-                compresslevel=config.get('compression_level', 6)
+                compresslevel=config.get('compression_level', 6),
+                json_compresslevel=config.get('compression_json_level', 1)
             )
             logger.info("✅ Compression middleware enabled")
         
@@ -385,10 +579,7 @@ def require_rate_limit(rate_limiter):
         @wraps(func)
         def wrapper(*args, **kwargs):
             if not rate_limiter.allow_request():
-                return jsonify({
-                    'success': False,
-                    'error': 'Rate limit exceeded'
-                }), 429
+                return Response(_RATE_LIMIT_DECORATOR_BODY, status=429, mimetype='application/json')
             return func(*args, **kwargs)
         return wrapper
     return decorator
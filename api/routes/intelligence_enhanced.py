@@ -3,15 +3,26 @@
 集成了工具检查、并行执行、缓存优化和错误处理
 """
 
+import asyncio
+import hashlib
 import logging
+import math
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
-from flask import Blueprint, request, jsonify
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Optional, Tuple
+from flask import Blueprint, Response, request, stream_with_context
 
 # 导入新模块
 from core.utils.tool_checker import tool_checker
-from core.execution.parallel_scanner import ParallelScanner, ScanTask
-from core.cache.scan_cache import cache_executor
+from core.execution.parallel_scanner import ParallelScanner, ScanResult, ScanTask
+from core.cache.scan_cache import CacheAwareExecutor, cache_executor
 from core.execution.error_handler import resilient_executor
+from api.middleware import dump_json, json_response
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +32,128 @@ intelligence_enhanced_bp = Blueprint('intelligence_enhanced', __name__, url_pref
 # Dependencies
 decision_engine = None
 tool_executors = None
+circuit_breaker = None
 
+# 漏洞指示词（按出现的种类计数，不区分大小写）
+VULN_INDICATORS = ('CRITICAL', 'HIGH', 'MEDIUM', 'VULNERABILITY', 'SQL injection', 'XSS')
+_VULN_RE = re.compile('|'.join(re.escape(i) for i in VULN_INDICATORS), re.IGNORECASE | re.ASCII)
 
-def init_app(dec_engine, executors):
+# 优先执行的工具（精确匹配规范工具名）
+_PRIORITY_TOOLS = frozenset({'nmap', 'nmap-advanced', 'nuclei', 'masscan', 'rustscan'})
+
+# 工具可用性快照，超过 _AVAIL_TTL 秒后重新探测（整体替换dict，读取无需加锁）
+_AVAIL_TTL = 60
+_AVAIL_CACHE = {'available': frozenset(), 'checked': frozenset(), 'ts': 0.0}
+
+# 进行中的扫描（single-flight）：相同参数的并发请求等待同一个Future
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# 扫描进度日志：回调只入队，由后台线程写日志，避免慢速handler阻塞扫描
+_LOG_Q = queue.SimpleQueue()
+_log_thread = None
+_log_thread_lock = threading.Lock()
+
+# 秒级ISO时间戳缓存 (epoch秒, ISO字符串)，供高频轮询接口复用
+_ISO_CACHE = (0, '')
+
+
+def init_app(dec_engine, executors, breaker=None):
     """Initialize blueprint with dependencies"""
-    global decision_engine, tool_executors
+    global decision_engine, tool_executors, circuit_breaker
     decision_engine = dec_engine
     tool_executors = executors
+    circuit_breaker = breaker
+    _cached_profile.cache_clear()
+    _cached_profile_json.cache_clear()
+    _cached_selection.cache_clear()
+    _build_tool_callable.cache_clear()
+
+
+def _log_flusher():
+    """后台日志线程：逐条消费 _LOG_Q 中的 (msg, *args)"""
+    while True:
+        record = _LOG_Q.get()
+        try:
+            logger.info(*record)
+        except Exception:
+            pass
+
+
+def _log_async(msg: str, *args):
+    """将一条INFO日志交给后台线程输出"""
+    global _log_thread
+    
+    if _log_thread is None or not _log_thread.is_alive():
+        with _log_thread_lock:
+            if _log_thread is None or not _log_thread.is_alive():
+                _log_thread = threading.Thread(
+                    target=_log_flusher, name='scan-progress-logger', daemon=True
+                )
+                _log_thread.start()
+    
+    _LOG_Q.put((msg, *args))
+
+
+def _now_iso() -> str:
+    """当前时间的ISO字符串（秒级精度，同一秒内复用）"""
+    global _ISO_CACHE
+    
+    second = int(time.time())
+    cached = _ISO_CACHE
+    if cached[0] != second:
+        cached = _ISO_CACHE = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
+
+def _refresh_availability(extra_tools=()) -> dict:
+    """重新探测所有已知工具（及 extra_tools）的可用性并替换快照"""
+    global _AVAIL_CACHE
+    
+    tool_checker.is_tool_available.cache_clear()
+    checked = frozenset(tool_checker.TOOL_INSTALL_COMMANDS).union(_AVAIL_CACHE['checked'], extra_tools)
+    _AVAIL_CACHE = {
+        'available': frozenset(tool for tool in checked if tool_checker.is_tool_available(tool)),
+        'checked': checked,
+        'ts': time.monotonic()
+    }
+    return _AVAIL_CACHE
+
+
+def _get_available_set(tools=()) -> frozenset:
+    """获取可用工具集合；快照过期或包含未探测过的工具时刷新"""
+    cache = _AVAIL_CACHE
+    if time.monotonic() - cache['ts'] > _AVAIL_TTL or not cache['checked'].issuperset(tools):
+        cache = _refresh_availability(tools)
+    return cache['available']
+
+
+@lru_cache(maxsize=2048)
+def _cached_profile(target: str):
+    """目标画像缓存（画像只读共享，不要在调用方修改）"""
+    return decision_engine.analyze_target(target)
+
+
+@lru_cache(maxsize=2048)
+def _cached_profile_json(target: str) -> bytes:
+    """目标画像 to_dict() 的JSON字节串缓存，响应中直接拼接，不重复序列化"""
+    return dump_json(_cached_profile(target).to_dict())
+
+
+@lru_cache(maxsize=2048)
+def _cached_selection(target: str, objective: str) -> tuple:
+    """按 (target, objective) 缓存的工具选择结果"""
+    return tuple(decision_engine.select_optimal_tools(_cached_profile(target), objective))
+
+
+def _count_vuln_indicators(output: str) -> int:
+    """统计输出中出现了几种漏洞指示词（单次扫描，无需整体转小写）"""
+    found = set()
+    for match in _VULN_RE.finditer(output):
+        found.add(match.group().lower())
+        if len(found) == len(VULN_INDICATORS):
+            break
+    return len(found)
 
 
 @intelligence_enhanced_bp.route("/tool-check", methods=["GET"])
@@ -36,6 +162,8 @@ def check_tools():
     try:
         logger.info("🔍 Checking system tools availability")
         
+        # 强制刷新可用性缓存（新安装的工具立即生效）
+        _refresh_availability()
         report = tool_checker.get_system_report()
         
         logger.info(
@@ -44,7 +172,7 @@ def check_tools():
             f"({report['coverage_percentage']:.1f}%)"
         )
         
-        return jsonify({
+        return json_response({
             "success": True,
             "report": report,
             "timestamp": datetime.now().isoformat()
@@ -52,10 +180,10 @@ def check_tools():
     
     except Exception as e:
         logger.error(f"❌ Tool check error: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 
 @intelligence_enhanced_bp.route("/generate-install-script", methods=["POST"])
@@ -70,266 +198,525 @@ def generate_install_script():
         script_path = tool_checker.generate_install_script(output_file)
         
         if script_path:
-            return jsonify({
+            return json_response({
                 "success": True,
                 "script_path": script_path,
                 "message": f"Install script generated: {script_path}",
                 "usage": f"Run with: ./{script_path}"
             })
         else:
-            return jsonify({
+            return json_response({
                 "success": True,
                 "message": "All tools are already installed!"
             })
     
     except Exception as e:
         logger.error(f"❌ Script generation error: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 
-@intelligence_enhanced_bp.route("/smart-scan-enhanced", methods=["POST"])
-def smart_scan_enhanced():
+# 请求可覆盖的重试参数: 名称 -> (类型, 下限, 上限)，超出范围的值截断到边界
+RETRY_OPTION_LIMITS = {
+    'retry_max': (int, 0, 5),
+    'retry_base': (float, 0.0, 30.0),
+    'retry_jitter': (float, 0.0, 1.0),
+}
+
+
+def _retry_option(data: Dict[str, Any], name: str):
+    """读取并校验一个重试参数（None 表示使用默认值），无法转换为数值时抛出 ValueError"""
+    value = data.get(name)
+    if value is None:
+        return None
+    
+    cast, low, high = RETRY_OPTION_LIMITS[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return cast(min(max(number, low), high))
+
+
+def _scan_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    """解析扫描请求参数（补全默认值），重试参数非法时抛出 ValueError"""
+    return {
+        'target': data['target'],
+        'objective': data.get('objective', 'comprehensive'),
+        'max_tools': data.get('max_tools', 5),
+        'force_refresh': data.get('force_refresh', False),
+        'max_workers': data.get('max_workers', 5),
+        'enable_cache': data.get('enable_cache', True),
+        'enable_retry': data.get('enable_retry', True),
+        'enable_fallback': data.get('enable_fallback', True),
+        # 重试策略覆盖（None 表示使用 resilient_executor 的默认值）
+        'retry_max': _retry_option(data, 'retry_max'),
+        'retry_base': _retry_option(data, 'retry_base'),
+        'retry_jitter': _retry_option(data, 'retry_jitter')
+    }
+
+
+@lru_cache(maxsize=512)
+def _build_tool_callable(tool_name: str, objective: str, use_cache: bool, resilient: bool,
+                         retry: Tuple[Optional[int], Optional[float], Optional[float]] = (None, None, None)):
     """
-    增强的智能扫描
-    集成工具检查、并行执行、缓存和错误处理
+    为工具构建带缓存/重试的执行器（functools.partial，无闭包，不增加Python调用帧）
+    
+    缓存在外层：命中时直接返回，不进入重试/回退逻辑；未命中时重试在内层
+    直接调用原始执行器，整个调用只查询一次缓存。
+    结果按参数缓存，跨请求复用；init_app 时清空。回退工具的结果不缓存。
     """
-    try:
-        data = request.get_json()
-        if not data or 'target' not in data:
-            return jsonify({"error": "Target is required"}), 400
-        
-        target = data['target']
-        objective = data.get('objective', 'comprehensive')
-        max_tools = data.get('max_tools', 5)
-        force_refresh = data.get('force_refresh', False)
-        max_workers = data.get('max_workers', 5)
-        enable_cache = data.get('enable_cache', True)
-        enable_retry = data.get('enable_retry', True)
-        enable_fallback = data.get('enable_fallback', True)
-        
-        logger.info(f"""
-╔══════════════════════════════════════════════════════════════╗
-║ 🚀 ENHANCED INTELLIGENT SCAN                                ║
-╠══════════════════════════════════════════════════════════════╣
-║ Target:          {target:<44} ║
-║ Objective:       {objective:<44} ║
-║ Max Tools:       {max_tools:<44} ║
-║ Cache:           {'Enabled' if enable_cache else 'Disabled':<44} ║
-║ Retry:           {'Enabled' if enable_retry else 'Disabled':<44} ║
-║ Fallback:        {'Enabled' if enable_fallback else 'Disabled':<44} ║
-║ Max Workers:     {max_workers:<44} ║
-╚══════════════════════════════════════════════════════════════╝
-        """)
-        
-        # 1. 分析目标
-        logger.info("📊 Step 1/5: Analyzing target...")
-        profile = decision_engine.analyze_target(target)
-        
-        # 2. 选择最优工具
-        logger.info("🎯 Step 2/5: Selecting optimal tools...")
-        selected_tools = decision_engine.select_optimal_tools(profile, objective)[:max_tools]
-        
-        # 3. 过滤可用工具
-        logger.info("🔍 Step 3/5: Checking tool availability...")
-        available_tools = []
-        unavailable_tools = []
-        
-        for tool in selected_tools:
-            if tool_checker.is_tool_available(tool):
-                available_tools.append(tool)
-            else:
-                unavailable_tools.append(tool)
-                logger.warning(f"⚠️  Tool not available: {tool}")
-        
-        if not available_tools:
-            return jsonify({
-                "success": False,
-                "error": "No available tools found",
-                "unavailable_tools": unavailable_tools,
-                "suggestions": [
-                    tool_checker.check_tool_or_error(tool)
-                    for tool in unavailable_tools
-                ]
-            }), 400
-        
-        logger.info(f"✅ Available tools: {len(available_tools)}/{len(selected_tools)}")
-        
-        # 4. 创建扫描任务
-        logger.info("📋 Step 4/5: Creating scan tasks...")
-        scanner = ParallelScanner(max_workers=max_workers)
-        tasks = []
-        
-        for tool_name in available_tools:
-            # 获取优化的参数
-            optimized_params = decision_engine.optimize_parameters(tool_name, profile)
-            
-            # 创建任务
-            task = scanner.create_task_from_selection(
-                tool_name=tool_name,
-                target=target,
-                params=optimized_params,
-                priority=1 if 'nmap' in tool_name or 'nuclei' in tool_name else 0
-            )
-            tasks.append(task)
-        
-        # 5. 执行扫描（带缓存和错误处理）
-        logger.info("🚀 Step 5/5: Executing parallel scan...")
-        
-        def create_cached_executor(tool_name):
-            """为工具创建带缓存的执行器"""
-            original_executor = tool_executors.get(tool_name)
-            
-            if not original_executor:
-                return None
-            
-            def cached_wrapper(target, params):
-                if enable_cache and not force_refresh:
-                    # 尝试从缓存获取
-                    return cache_executor.execute_with_cache(
-                        tool_name=tool_name,
-                        target=target,
-                        params=params,
-                        executor_func=original_executor,
-                        force_refresh=force_refresh,
-                        scan_type=objective
-                    )
-                else:
-                    # 直接执行
-                    return original_executor(target, params)
-            
-            # 如果启用了重试和回退
-            if enable_retry or enable_fallback:
-                def resilient_wrapper(target, params):
-                    return resilient_executor.execute_with_resilience(
-                        tool_name=tool_name,
-                        target=target,
-                        params=params,
-                        executor_func=cached_wrapper,
-                        tool_executors=tool_executors
-                    )
-                return resilient_wrapper
-            else:
-                return cached_wrapper
-        
-        # 创建增强的执行器字典
-        enhanced_executors = {
-            tool_name: create_cached_executor(tool_name)
-            for tool_name in available_tools
-        }
-        
-        # 进度回调
-        progress = {"completed": 0, "total": len(tasks)}
-        
-        def progress_callback(completed, total, current_tool):
-            progress["completed"] = completed
-            logger.info(f"📊 Progress: {completed}/{total} ({completed/total*100:.1f}%) - Completed: {current_tool}")
-        
-        # 执行并行扫描
-        results = scanner.execute_parallel(
-            tasks=tasks,
-            tool_executors=enhanced_executors,
-            progress_callback=progress_callback
+    original_executor = tool_executors.get(tool_name)
+    
+    if not original_executor:
+        return None
+    
+    executor = original_executor
+    if resilient:
+        executor = partial(
+            resilient_executor.execute_with_resilience,
+            tool_name,
+            executor_func=original_executor,
+            tool_executors=tool_executors,
+            max_retries=retry[0],
+            retry_delay=retry[1],
+            jitter=retry[2]
         )
+    
+    if use_cache:
+        executor = partial(
+            cache_executor.execute_with_cache,
+            tool_name,
+            executor_func=executor,
+            scan_type=objective
+        )
+    
+    return executor
+
+
+def _plan_scan(opts: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Any]]:
+    """
+    扫描步骤1-4：分析目标、选择工具、过滤可用工具、创建任务
+    
+    Returns:
+        (plan, None) 或 (None, (错误数据, 状态码))
+    """
+    target = opts['target']
+    objective = opts['objective']
+    
+    logger.info(
+        "🚀 Enhanced intelligent scan: target=%s objective=%s max_tools=%s "
+        "cache=%s retry=%s fallback=%s max_workers=%s",
+        target, objective, opts['max_tools'], opts['enable_cache'],
+        opts['enable_retry'], opts['enable_fallback'], opts['max_workers']
+    )
+    
+    # 1. 分析目标
+    logger.info("📊 Step 1/5: Analyzing target...")
+    profile = _cached_profile(target)
+    
+    # 2. 选择最优工具
+    logger.info("🎯 Step 2/5: Selecting optimal tools...")
+    selected_tools = list(_cached_selection(target, objective)[:opts['max_tools']])
+    
+    # 3. 过滤可用工具
+    logger.info("🔍 Step 3/5: Checking tool availability...")
+    avail_set = _get_available_set(selected_tools)
+    available_tools = [tool for tool in selected_tools if tool in avail_set]
+    unavailable_tools = [tool for tool in selected_tools if tool not in avail_set]
+    
+    for tool in unavailable_tools:
+        logger.warning(f"⚠️  Tool not available: {tool}")
+    
+    if not available_tools:
+        return None, ({
+            "success": False,
+            "error": "No available tools found",
+            "unavailable_tools": unavailable_tools,
+            "suggestions": [
+                tool_checker.check_tool_or_error(tool)
+                for tool in unavailable_tools
+            ]
+        }, 400)
+    
+    logger.info(f"✅ Available tools: {len(available_tools)}/{len(selected_tools)}")
+    
+    # 4. 创建扫描任务
+    logger.info("📋 Step 4/5: Creating scan tasks...")
+    scanner = ParallelScanner(max_workers=opts['max_workers'])
+    tasks = []
+    
+    for tool_name in available_tools:
+        # 获取优化的参数
+        optimized_params = decision_engine.optimize_parameters(tool_name, profile)
+        
+        # 创建任务
+        task = scanner.create_task_from_selection(
+            tool_name=tool_name,
+            target=target,
+            params=optimized_params,
+            priority=1 if tool_name in _PRIORITY_TOOLS else 0
+        )
+        tasks.append(task)
+    
+    # 创建增强的执行器字典（带缓存和错误处理）
+    use_cache = opts['enable_cache'] and not opts['force_refresh']
+    resilient = opts['enable_retry'] or opts['enable_fallback']
+    retry = (
+        opts['retry_max'] if opts['enable_retry'] else 0,
+        opts['retry_base'],
+        opts['retry_jitter']
+    )
+    enhanced_executors = {
+        tool_name: _build_tool_callable(tool_name, objective, use_cache, resilient, retry)
+        for tool_name in available_tools
+    }
+    
+    cached_results = _prefetch_cached(tasks) if use_cache else []
+    if cached_results:
+        hit_tools = {scan_result.tool_name for scan_result in cached_results}
+        tasks = [task for task in tasks if task.tool_name not in hit_tools]
+    
+    return {
+        'profile': profile,
+        'scanner': scanner,
+        'tasks': tasks,
+        'cached': cached_results,
+        'executors': enhanced_executors,
+        'unavailable_tools': unavailable_tools
+    }, None
+
+
+def _prefetch_cached(tasks: List[ScanTask]) -> List[ScanResult]:
+    """
+    一次批量查询（Redis单个pipeline）取回所有任务的缓存结果
+    
+    命中的工具直接作为结果返回，不再进入并行执行；未命中的任务仍由
+    带缓存的执行器负责执行和写缓存。
+    """
+    hits = cache_executor.cache.get_many([(task.tool_name, task.target, task.params) for task in tasks])
+    return [
+        ParallelScanner._make_result(task, CacheAwareExecutor._from_cache(cached), 0.0)
+        for task, cached in zip(tasks, hits)
+        if cached
+    ]
+
+
+class _ScanTally:
+    """逐个累计工具结果的统计（只保留计数和工具名，不保留输出）"""
+    
+    def __init__(self):
+        self.successful_tools = []
+        self.failed_tools = []
+        self.cached_results = 0
+        self.total_vulnerabilities = 0
+        self.total_time = 0.0
+    
+    def add(self, tool_name: str, scan_result) -> Dict[str, Any]:
+        """累计单个工具结果，返回该工具的结果数据"""
+        tool_data = {
+            "tool": tool_name,
+            "success": scan_result.success,
+            "execution_time": scan_result.execution_time,
+            "timed_out": scan_result.timed_out,
+            "error": scan_result.error,
+            "aborted": scan_result.aborted,
+            "from_cache": scan_result.result.get('from_cache', False),
+            "used_alternative": scan_result.result.get('used_alternative', False),
+            "result": scan_result.result
+        }
         
-        # 6. 处理结果
-        logger.info("📊 Processing results...")
-        
-        tools_executed = []
-        total_vulnerabilities = 0
-        successful_tools = []
-        failed_tools = []
-        cached_results = 0
+        self.total_time += scan_result.execution_time
         
-        for tool_name, scan_result in results.items():
-            tool_data = {
-                "tool": tool_name,
-                "success": scan_result.success,
-                "execution_time": scan_result.execution_time,
-                "timed_out": scan_result.timed_out,
-                "error": scan_result.error,
-                "from_cache": scan_result.result.get('from_cache', False),
-                "used_alternative": scan_result.result.get('used_alternative', False),
-                "result": scan_result.result
-            }
-            
-            tools_executed.append(tool_data)
+        if scan_result.success:
+            self.successful_tools.append(tool_name)
             
-            if scan_result.success:
-                successful_tools.append(tool_name)
-                
-                # 统计漏洞
-                if 'stdout' in scan_result.result:
-                    output = scan_result.result['stdout']
-                    vuln_indicators = ['CRITICAL', 'HIGH', 'MEDIUM', 'VULNERABILITY', 'SQL injection', 'XSS']
-                    vuln_count = sum(1 for indicator in vuln_indicators if indicator.lower() in output.lower())
-                    total_vulnerabilities += vuln_count
-            else:
-                failed_tools.append(tool_name)
-            
-            if tool_data.get('from_cache'):
-                cached_results += 1
+            # 统计漏洞
+            if 'stdout' in scan_result.result:
+                self.total_vulnerabilities += _count_vuln_indicators(scan_result.result['stdout'])
+        else:
+            self.failed_tools.append(tool_name)
         
-        # 生成执行摘要
-        total_time = sum(r.execution_time for r in results.values())
+        if tool_data['from_cache']:
+            self.cached_results += 1
         
-        response = {
-            "success": True,
-            "target": target,
-            "objective": objective,
-            "target_profile": profile.to_dict(),
-            "tools_executed": tools_executed,
+        return tool_data
+    
+    def summary(self, total_tools: int, unavailable_tools: List[str]) -> Dict[str, Any]:
+        """生成执行摘要和漏洞统计"""
+        return {
             "execution_summary": {
-                "total_tools": len(tasks),
-                "successful_tools": len(successful_tools),
-                "failed_tools": len(failed_tools),
-                "cached_results": cached_results,
+                "total_tools": total_tools,
+                "successful_tools": len(self.successful_tools),
+                "failed_tools": len(self.failed_tools),
+                "cached_results": self.cached_results,
                 "unavailable_tools": len(unavailable_tools),
-                "total_execution_time": round(total_time, 2),
-                "average_time_per_tool": round(total_time / len(tasks), 2) if tasks else 0,
-                "successful_tool_names": successful_tools,
-                "failed_tool_names": failed_tools,
+                "total_execution_time": round(self.total_time, 2),
+                "average_time_per_tool": round(self.total_time / total_tools, 2) if total_tools else 0,
+                "successful_tool_names": self.successful_tools,
+                "failed_tool_names": self.failed_tools,
                 "unavailable_tool_names": unavailable_tools
             },
             "vulnerabilities": {
-                "total_found": total_vulnerabilities,
-                "requires_review": total_vulnerabilities > 0
-            },
-            "timestamp": datetime.now().isoformat(),
-            "enhancements_used": {
-                "tool_availability_check": True,
-                "parallel_execution": True,
-                "result_caching": enable_cache,
-                "error_retry": enable_retry,
-                "tool_fallback": enable_fallback
+                "total_found": self.total_vulnerabilities,
+                "requires_review": self.total_vulnerabilities > 0
             }
         }
+
+
+def _sse_event(event: str, payload: Dict[str, Any]) -> bytes:
+    """格式化一条Server-Sent Events消息"""
+    return b"event: " + event.encode() + b"\ndata: " + dump_json(payload) + b"\n\n"
+
+
+def _scan_key(opts: Dict[str, Any]) -> str:
+    """扫描请求的去重键（目标、目标类型及全部扫描参数）"""
+    return hashlib.sha256(repr(sorted(opts.items())).encode()).hexdigest()
+
+
+def _single_flight(key: str, fn) -> Any:
+    """
+    相同 key 的并发调用只执行一次 fn，其余调用等待并共享其结果（或异常）
+    
+    只合并执行期间的重复请求，结束后立即移除；已完成结果的复用由扫描缓存负责。
+    """
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _INFLIGHT[key] = future
+    
+    if leader:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with _INFLIGHT_LOCK:
+                _INFLIGHT.pop(key, None)
+    else:
+        logger.info("🔁 Joining in-flight scan %s", key[:12])
+    
+    return future.result()
+
+
+def _breaker_open(scan_result=None) -> bool:
+    """
+    熔断检查：API级熔断器打开时取消剩余工具并返回部分结果
+    
+    只读取状态，不把工具结果计入熔断器：单个扫描中目标不可达、工具非零退出
+    等普通失败不应打开全局熔断器而波及其他客户端的扫描和健康检查。
+    """
+    return circuit_breaker.is_open()
+
+
+def _execute_scan(opts: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    执行完整扫描流程，返回 (响应数据, 状态码)
+    
+    不直接构造Response，以便 single-flight 的多个请求共享同一份结果。
+    成功时的数据不含 target_profile，由调用方按目标补充。
+    """
+    plan, error = _plan_scan(opts)
+    if error is not None:
+        return error
+    
+    tasks = plan['tasks']
+    total_tools = len(tasks) + len(plan['cached'])
+    
+    # 5. 执行扫描（缓存命中的工具已在规划阶段批量取回）
+    logger.info("🚀 Step 5/5: Executing parallel scan...")
+    
+    # 进度回调（日志异步输出）
+    progress = {"completed": 0, "total": len(tasks)}
+    
+    def progress_callback(completed, total, current_tool):
+        progress["completed"] = completed
+        _log_async("📊 Progress: %d/%d (%.1f%%) - Completed: %s",
+                   completed, total, completed / total * 100, current_tool)
+    
+    # 执行并行扫描（事件循环调度，单个工具超时不阻塞整体返回）
+    results = {scan_result.tool_name: scan_result for scan_result in plan['cached']}
+    if tasks:
+        results.update(asyncio.run(plan['scanner'].execute_parallel_async(
+            tasks=tasks,
+            tool_executors=plan['executors'],
+            progress_callback=progress_callback,
+            abort_check=_breaker_open if circuit_breaker is not None else None
+        )))
+    
+    # 6. 处理结果
+    logger.info("📊 Processing results...")
+    
+    tally = _ScanTally()
+    tools_executed = [
+        tally.add(tool_name, scan_result)
+        for tool_name, scan_result in results.items()
+    ]
+    breaker_tripped = any(scan_result.aborted for scan_result in results.values())
+    
+    response = {
+        "success": True,
+        "target": opts['target'],
+        "objective": opts['objective'],
+        "tools_executed": tools_executed,
+        **tally.summary(total_tools, plan['unavailable_tools']),
+        "timestamp": datetime.now().isoformat(),
+        "enhancements_used": {
+            "tool_availability_check": True,
+            "parallel_execution": True,
+            "result_caching": opts['enable_cache'],
+            "error_retry": opts['enable_retry'],
+            "tool_fallback": opts['enable_fallback'],
+            "circuit_breaker_tripped": breaker_tripped
+        }
+    }
+    
+    logger.info(
+        "✅ Scan completed: successful=%d/%d failed=%d cached=%d vulnerabilities=%d total_time=%.2fs",
+        len(tally.successful_tools), total_tools, len(tally.failed_tools),
+        tally.cached_results, tally.total_vulnerabilities, tally.total_time
+    )
+    
+    return response, 200
+
+
+def execute_smart_scan(opts: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """执行增强智能扫描（相同参数的并发调用合并执行），返回含 target_profile 的完整数据"""
+    payload, status = _single_flight(_scan_key(opts), partial(_execute_scan, opts))
+    if status == 200:
+        payload = {"target_profile": _cached_profile(opts['target']).to_dict(), **payload}
+    return payload, status
+
+
+def _scan_response(payload: Dict[str, Any], target: str) -> Response:
+    """序列化扫描结果，target_profile 直接拼接缓存的JSON字节串"""
+    body = dump_json(payload)
+    return Response(
+        b'{"target_profile":' + _cached_profile_json(target) + b',' + body[1:],
+        mimetype='application/json'
+    )
+
+
+@intelligence_enhanced_bp.route("/smart-scan-enhanced", methods=["POST"])
+def smart_scan_enhanced():
+    """
+    增强的智能扫描
+    集成工具检查、并行执行、缓存和错误处理
+    
+    请求中 "async": true 时提交到Celery并立即返回 202 + task_id，
+    通过 /api/tasks/<task_id>/status 查询进度和结果。
+    """
+    try:
+        data = request.get_json()
+        if not data or 'target' not in data:
+            return json_response({"error": "Target is required"}, 400)
         
-        logger.info(f"""
-╔══════════════════════════════════════════════════════════════╗
-║ ✅ SCAN COMPLETED                                           ║
-╠══════════════════════════════════════════════════════════════╣
-║ Successful:      {len(successful_tools)}/{len(tasks):<44} ║
-║ Failed:          {len(failed_tools):<44} ║
-║ Cached:          {cached_results:<44} ║
-║ Vulnerabilities: {total_vulnerabilities:<44} ║
-║ Total Time:      {total_time:.2f}s{'':<38} ║
-╚══════════════════════════════════════════════════════════════╝
-        """)
+        try:
+            opts = _scan_options(data)
+        except ValueError as e:
+            return json_response({"error": str(e)}, 400)
         
-        return jsonify(response)
+        if data.get('async', False):
+            # 按需导入：Celery 及其配置只在提交后台任务时加载
+            from core.tasks.scan_tasks import run_smart_scan
+            
+            task = run_smart_scan.apply_async(args=[opts])
+            return json_response({
+                "success": True,
+                "task_id": task.id,
+                "status": "submitted",
+                "status_url": f"/api/tasks/{task.id}/status",
+                "result_url": f"/api/tasks/{task.id}/result",
+                "message": f"Smart scan task submitted for {opts['target']}"
+            }, 202)
+        
+        payload, status = _single_flight(_scan_key(opts), partial(_execute_scan, opts))
+        if status != 200:
+            return json_response(payload, status)
+        
+        return _scan_response(payload, opts['target'])
     
     except Exception as e:
         logger.error(f"❌ Enhanced smart scan error: {str(e)}")
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return json_response({
             "success": False,
             "error": str(e),
             "traceback": traceback.format_exc()
-        }), 500
+        }, 500)
+
+
+@intelligence_enhanced_bp.route("/smart-scan-enhanced/stream", methods=["POST"])
+def smart_scan_enhanced_stream():
+    """
+    增强的智能扫描（SSE流式版本）
+    每个工具完成即推送一条 tool 事件，最后推送 summary 事件；
+    服务端不保留各工具输出，峰值内存与单个工具结果相当
+    """
+    try:
+        data = request.get_json()
+        if not data or 'target' not in data:
+            return json_response({"error": "Target is required"}, 400)
+        
+        try:
+            opts = _scan_options(data)
+        except ValueError as e:
+            return json_response({"error": str(e)}, 400)
+        
+        plan, error = _plan_scan(opts)
+        if error is not None:
+            return json_response(*error)
+    
+    except Exception as e:
+        logger.error(f"❌ Enhanced smart scan (stream) error: {str(e)}")
+        return json_response({
+            "success": False,
+            "error": str(e)
+        }, 500)
+    
+    tasks = plan['tasks']
+    total_tools = len(tasks) + len(plan['cached'])
+    
+    def generate():
+        tally = _ScanTally()
+        
+        yield _sse_event('start', {
+            "target": opts['target'],
+            "objective": opts['objective'],
+            "target_profile": plan['profile'].to_dict(),
+            "total_tools": total_tools
+        })
+        
+        try:
+            # 缓存命中的工具先推送，其余按完成顺序推送
+            for scan_result in plan['cached']:
+                yield _sse_event('tool', tally.add(scan_result.tool_name, scan_result))
+            for scan_result in plan['scanner'].iter_parallel(tasks, plan['executors']):
+                yield _sse_event('tool', tally.add(scan_result.tool_name, scan_result))
+            
+            yield _sse_event('summary', {
+                "success": True,
+                **tally.summary(total_tools, plan['unavailable_tools']),
+                "timestamp": datetime.now().isoformat()
+            })
+        except Exception as e:
+            logger.error(f"❌ Enhanced smart scan (stream) error: {str(e)}")
+            yield _sse_event('error', {"success": False, "error": str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @intelligence_enhanced_bp.route("/cache-stats", methods=["GET"])
@@ -340,18 +727,18 @@ def get_cache_stats():
         
         stats = scan_cache.get_stats()
         
-        return jsonify({
+        return json_response({
             "success": True,
             "cache_stats": stats,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         })
     
     except Exception as e:
         logger.error(f"❌ Cache stats error: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 
 @intelligence_enhanced_bp.route("/cache-clear", methods=["POST"])
@@ -364,8 +751,11 @@ def clear_cache():
         pattern = data.get('pattern')
         
         count = scan_cache.clear_all(pattern)
+        _cached_profile.cache_clear()
+        _cached_profile_json.cache_clear()
+        _cached_selection.cache_clear()
         
-        return jsonify({
+        return json_response({
             "success": True,
             "cleared_entries": count,
             "message": f"Cleared {count} cache entries",
@@ -374,7 +764,7 @@ def clear_cache():
     
     except Exception as e:
         logger.error(f"❌ Cache clear error: {str(e)}")
-        return jsonify({
+        return json_response({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
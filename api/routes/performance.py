@@ -5,12 +5,15 @@ HexStrike AI - Performance Monitoring API Routes (v6.1)
 提供性能监控和统计信息的API端点
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 import logging
 import psutil
+import threading
 import time
 from typing import Optional
 
+from api.middleware import json_response
+
 logger = logging.getLogger(__name__)
 
 # Create Blueprint
@@ -22,6 +25,12 @@ _middleware_manager = None
 _cache_instance = None
 _telemetry_instance = None
 
+# 系统资源快照：由后台线程每 _SNAPSHOT_INTERVAL 秒整体替换，请求只读引用，不阻塞在psutil上
+_SNAPSHOT_INTERVAL = 1.0
+_SYS_SNAPSHOT = None
+_collector_thread = None
+_collector_lock = threading.Lock()
+
 
 def init_app(performance_optimizer, middleware_manager, cache_instance=None, telemetry_instance=None):
     """初始化模块"""
@@ -30,6 +39,71 @@ def init_app(performance_optimizer, middleware_manager, cache_instance=None, tel
     _middleware_manager = middleware_manager
     _cache_instance = cache_instance
     _telemetry_instance = telemetry_instance
+    _start_collector()
+
+
+# ============================================================================
+# SYSTEM SNAPSHOT COLLECTOR
+# ============================================================================
+
+def _collect_snapshot(process: psutil.Process, cpu_interval: Optional[float] = None) -> dict:
+    """采集一次系统资源（cpu_interval=None 时返回距上次调用的CPU占用，不阻塞）"""
+    return {
+        'cpu_percent': psutil.cpu_percent(interval=cpu_interval),
+        'cpu_count': psutil.cpu_count(),
+        'cpu_freq': psutil.cpu_freq(),
+        'memory': psutil.virtual_memory(),
+        'swap': psutil.swap_memory(),
+        'disk': psutil.disk_usage('/'),
+        'network': psutil.net_io_counters(),
+        'process_memory': process.memory_info(),
+        'process_cpu_percent': process.cpu_percent(interval=cpu_interval),
+        'process_threads': process.num_threads(),
+        'ts': time.time()
+    }
+
+
+def _collector():
+    """后台采集线程"""
+    global _SYS_SNAPSHOT
+    
+    process = psutil.Process()
+    # 预热：interval=None 的首次调用只建立基线
+    psutil.cpu_percent(interval=None)
+    process.cpu_percent(interval=None)
+    
+    while True:
+        time.sleep(_SNAPSHOT_INTERVAL)
+        try:
+            _SYS_SNAPSHOT = _collect_snapshot(process)
+        except Exception as e:
+            logger.warning(f"System snapshot collection failed: {e}")
+
+
+def _start_collector():
+    """启动采集线程（每个进程一个；fork后的子进程中会重新启动）"""
+    global _collector_thread
+    
+    if _collector_thread is not None and _collector_thread.is_alive():
+        return
+    
+    with _collector_lock:
+        if _collector_thread is None or not _collector_thread.is_alive():
+            _collector_thread = threading.Thread(
+                target=_collector, name='perf-snapshot-collector', daemon=True
+            )
+            _collector_thread.start()
+
+
+def _get_system_snapshot() -> dict:
+    """获取最新的系统资源快照"""
+    _start_collector()
+    
+    snapshot = _SYS_SNAPSHOT
+    if snapshot is None:
+        # 采集线程尚未产出第一份快照时同步采集一次
+        snapshot = _collect_snapshot(psutil.Process(), cpu_interval=0.1)
+    return snapshot
 
 
 # ============================================================================
@@ -41,10 +115,10 @@ def get_performance_stats():
     """获取综合性能统计"""
     try:
         if not _performance_optimizer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Performance optimizer not initialized'
-            }), 503
+            }, 503)
         
         # 获取所有统计信息
         stats = _performance_optimizer.get_all_stats()
@@ -61,7 +135,7 @@ def get_performance_stats():
         if _telemetry_instance and hasattr(_telemetry_instance, 'get_stats'):
             stats['telemetry'] = _telemetry_instance.get_stats()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'stats': stats
@@ -69,10 +143,10 @@ def get_performance_stats():
         
     except Exception as e:
         logger.error(f"Error getting performance stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/stats/connection-pool', methods=['GET'])
@@ -80,14 +154,14 @@ def get_connection_pool_stats():
     """获取连接池统计"""
     try:
         if not _performance_optimizer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Performance optimizer not initialized'
-            }), 503
+            }, 503)
         
         stats = _performance_optimizer.connection_pool.get_stats()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'connection_pool': stats
@@ -95,10 +169,10 @@ def get_connection_pool_stats():
         
     except Exception as e:
         logger.error(f"Error getting connection pool stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/stats/rate-limiter', methods=['GET'])
@@ -106,14 +180,14 @@ def get_rate_limiter_stats():
     """获取限流器统计"""
     try:
         if not _performance_optimizer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Performance optimizer not initialized'
-            }), 503
+            }, 503)
         
         stats = _performance_optimizer.rate_limiter.get_stats()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'rate_limiter': stats
@@ -121,10 +195,10 @@ def get_rate_limiter_stats():
         
     except Exception as e:
         logger.error(f"Error getting rate limiter stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/stats/circuit-breaker', methods=['GET'])
@@ -132,14 +206,14 @@ def get_circuit_breaker_stats():
     """获取熔断器状态"""
     try:
         if not _performance_optimizer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Performance optimizer not initialized'
-            }), 503
+            }, 503)
         
         state = _performance_optimizer.circuit_breaker.get_state()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'circuit_breaker': {
@@ -149,10 +223,10 @@ def get_circuit_breaker_stats():
         
     except Exception as e:
         logger.error(f"Error getting circuit breaker stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/stats/worker-pool', methods=['GET'])
@@ -160,14 +234,14 @@ def get_worker_pool_stats():
     """获取工作池统计"""
     try:
         if not _performance_optimizer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Performance optimizer not initialized'
-            }), 503
+            }, 503)
         
         stats = _performance_optimizer.worker_pool.get_stats()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'worker_pool': stats
@@ -175,10 +249,10 @@ def get_worker_pool_stats():
         
     except Exception as e:
         logger.error(f"Error getting worker pool stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/stats/lazy-imports', methods=['GET'])
@@ -186,14 +260,14 @@ def get_lazy_imports_stats():
     """获取懒加载模块统计"""
     try:
         if not _performance_optimizer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Performance optimizer not initialized'
-            }), 503
+            }, 503)
         
         stats = _performance_optimizer.lazy_import_manager.get_stats()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'lazy_imports': stats
@@ -201,10 +275,10 @@ def get_lazy_imports_stats():
         
     except Exception as e:
         logger.error(f"Error getting lazy imports stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 # ============================================================================
@@ -215,32 +289,21 @@ def get_lazy_imports_stats():
 def get_system_resources():
     """获取系统资源使用情况"""
     try:
-        # CPU信息
-        cpu_percent = psutil.cpu_percent(interval=1)
-        cpu_count = psutil.cpu_count()
-        cpu_freq = psutil.cpu_freq()
-        
-        # 内存信息
-        memory = psutil.virtual_memory()
-        swap = psutil.swap_memory()
-        
-        # 磁盘信息
-        disk = psutil.disk_usage('/')
-        
-        # 网络信息
-        network = psutil.net_io_counters()
-        
-        # 进程信息
-        process = psutil.Process()
-        process_memory = process.memory_info()
-        
-        return jsonify({
+        snapshot = _get_system_snapshot()
+        cpu_freq = snapshot['cpu_freq']
+        memory = snapshot['memory']
+        swap = snapshot['swap']
+        disk = snapshot['disk']
+        network = snapshot['network']
+        process_memory = snapshot['process_memory']
+        
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'system': {
                 'cpu': {
-                    'percent': cpu_percent,
-                    'count': cpu_count,
+                    'percent': snapshot['cpu_percent'],
+                    'count': snapshot['cpu_count'],
                     'frequency_mhz': cpu_freq.current if cpu_freq else None
                 },
                 'memory': {
@@ -269,18 +332,18 @@ def get_system_resources():
                 'process': {
                     'rss_mb': process_memory.rss / (1024**2),
                     'vms_mb': process_memory.vms / (1024**2),
-                    'cpu_percent': process.cpu_percent(interval=0.1),
-                    'num_threads': process.num_threads()
+                    'cpu_percent': snapshot['process_cpu_percent'],
+                    'num_threads': snapshot['process_threads']
                 }
             }
         })
         
     except Exception as e:
         logger.error(f"Error getting system resources: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/health', methods=['GET'])
@@ -301,25 +364,24 @@ def health_check():
             health_status['checks']['performance_optimizer'] = 'unavailable'
             health_status['status'] = 'degraded'
         
+        snapshot = _get_system_snapshot()
+        
         # 检查CPU使用率
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        if cpu_percent > 90:
+        if snapshot['cpu_percent'] > 90:
             health_status['checks']['cpu'] = 'warning'
             health_status['status'] = 'degraded'
         else:
             health_status['checks']['cpu'] = 'ok'
         
         # 检查内存使用率
-        memory_percent = psutil.virtual_memory().percent
-        if memory_percent > 90:
+        if snapshot['memory'].percent > 90:
             health_status['checks']['memory'] = 'warning'
             health_status['status'] = 'degraded'
         else:
             health_status['checks']['memory'] = 'ok'
         
         # 检查磁盘使用率
-        disk_percent = psutil.disk_usage('/').percent
-        if disk_percent > 90:
+        if snapshot['disk'].percent > 90:
             health_status['checks']['disk'] = 'warning'
             health_status['status'] = 'degraded'
         else:
@@ -336,20 +398,20 @@ def health_check():
         
         status_code = 200 if health_status['status'] == 'healthy' else 503
         
-        return jsonify({
+        return json_response({
             'success': True,
             'health': health_status
-        }), status_code
+        }, status_code)
         
     except Exception as e:
         logger.error(f"Error in health check: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'health': {
                 'status': 'unhealthy',
                 'error': str(e)
             }
-        }), 503
+        }, 503)
 
 
 # ============================================================================
@@ -361,17 +423,17 @@ def get_cache_stats():
     """获取缓存统计"""
     try:
         if not _cache_instance:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Cache not initialized'
-            }), 503
+            }, 503)
         
         if hasattr(_cache_instance, 'get_stats'):
             stats = _cache_instance.get_stats()
         else:
             stats = {'message': 'Cache stats not available'}
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'cache': stats
@@ -379,10 +441,10 @@ def get_cache_stats():
         
     except Exception as e:
         logger.error(f"Error getting cache stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/cache/clear', methods=['POST'])
@@ -390,26 +452,26 @@ def clear_cache():
     """清空缓存"""
     try:
         if not _cache_instance:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Cache not initialized'
-            }), 503
+            }, 503)
         
         if hasattr(_cache_instance, 'clear'):
             _cache_instance.clear()
             logger.info("Cache cleared successfully")
         
-        return jsonify({
+        return json_response({
             'success': True,
             'message': 'Cache cleared successfully'
         })
         
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @performance_bp.route('/cache/warmup', methods=['POST'])
@@ -417,25 +479,25 @@ def trigger_cache_warmup():
     """触发缓存预热"""
     try:
         if not _performance_optimizer or not _performance_optimizer.cache_warmer:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Cache warmer not initialized'
-            }), 503
+            }, 503)
         
         # 触发异步预热
         _performance_optimizer.cache_warmer.warmup(background=True)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'message': 'Cache warmup triggered'
         })
         
     except Exception as e:
         logger.error(f"Error triggering cache warmup: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 # ============================================================================
@@ -447,14 +509,14 @@ def get_redis_stats():
     """获取Redis统计（如果启用）"""
     try:
         if not _performance_optimizer or not _performance_optimizer.redis_cache:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Redis cache not enabled'
-            }), 503
+            }, 503)
         
         stats = _performance_optimizer.redis_cache.get_stats()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'timestamp': time.time(),
             'redis': stats
@@ -462,10 +524,10 @@ def get_redis_stats():
         
     except Exception as e:
         logger.error(f"Error getting Redis stats: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 # ============================================================================
@@ -482,9 +544,10 @@ def get_performance_dashboard():
         }
         
         # 系统资源
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        snapshot = _get_system_snapshot()
+        cpu_percent = snapshot['cpu_percent']
+        memory = snapshot['memory']
+        disk = snapshot['disk']
         
         dashboard['system'] = {
             'cpu_percent': cpu_percent,
@@ -504,14 +567,14 @@ def get_performance_dashboard():
         if cpu_percent > 90 or memory.percent > 90 or disk.percent > 90:
             dashboard['status'] = 'warning'
         
-        return jsonify({
+        return json_response({
             'success': True,
             'dashboard': dashboard
         })
         
     except Exception as e:
         logger.error(f"Error getting performance dashboard: {e}")
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
@@ -5,19 +5,42 @@ HexStrike AI - Task Management API Routes (v6.2)
 异步任务管理API端点
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+import hashlib
+import heapq
 import logging
-from typing import Optional
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+from werkzeug.exceptions import HTTPException
+from celery import chord, group
+from celery.states import FAILURE, PENDING, READY_STATES, SUCCESS
 from celery.result import AsyncResult
 
-from core.celery_app import celery_app, get_worker_status, get_queue_length
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+from api.middleware import dump_json, json_response
+from core.celery_app import (
+    celery_app, get_worker_status, get_queue_lengths,
+    TASK_COMPRESSION, TASK_COMPRESSION_MIN_SIZE
+)
 from core.tasks.scan_tasks import (
     run_nmap_scan, run_nuclei_scan, run_subdomain_enum,
     run_web_scan, run_directory_scan, run_sqlmap_scan, run_xss_scan
 )
 from core.tasks.ai_tasks import (
-    analyze_scan_results, generate_exploit_suggestions,
-    predict_attack_vectors, generate_intelligent_payloads
+    analyze_scan_results, analyze_scan_results_batch, finalize_analysis,
+    generate_exploit_suggestions, predict_attack_vectors, generate_intelligent_payloads
 )
 
 logger = logging.getLogger(__name__)
@@ -25,6 +48,232 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 
+# 批量提交支持的扫描类型
+BULK_SCAN_TASKS = {
+    'nmap': run_nmap_scan,
+    'nuclei': run_nuclei_scan,
+    'subdomain': run_subdomain_enum,
+    'web': run_web_scan,
+}
+
+# msgpack流式上传
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_READ_SIZE = 64 * 1024
+MSGPACK_MAX_BUFFER = 128 * 1024 * 1024
+
+
+def _request_compression() -> Optional[str]:
+    """任务参数来自请求体，按请求体大小决定是否压缩（分块上传大小未知时压缩）"""
+    if not TASK_COMPRESSION:
+        return None
+    length = request.content_length
+    if length is not None and length < TASK_COMPRESSION_MIN_SIZE:
+        return None
+    return TASK_COMPRESSION
+
+
+def _enqueue(task, *args, **kwargs) -> AsyncResult:
+    """从producer池借出producer发布任务，避免每次发布重新建立broker连接"""
+    compression = _request_compression()
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        return task.apply_async(args=args, kwargs=kwargs, producer=producer,
+                                compression=compression)
+
+
+# 扫描目标校验（在HTTP层拒绝格式错误的输入，不进入任务队列）
+_HOST_PATTERN = r'[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*'
+_TARGET_RE = re.compile(
+    r'^(?:' + _HOST_PATTERN +
+    r'|\d{1,3}(?:\.\d{1,3}){3}(?:/\d{1,2})?'
+    r'|[0-9a-fA-F]*:[0-9a-fA-F:.]+(?:/\d{1,3})?'
+    r'|https?://\S+)$'
+)
+_DOMAIN_RE = re.compile(r'^' + _HOST_PATTERN + r'\.[a-zA-Z]{2,63}\.?$')
+
+# 批量扫描类型对应的目标类别
+BULK_SCAN_TARGET_KINDS = {
+    'nmap': 'target',
+    'nuclei': 'target',
+    'subdomain': 'domain',
+    'web': 'url',
+}
+
+
+@lru_cache(maxsize=4096)
+def _split_url(url: str):
+    return urlsplit(url)
+
+
+def _validate(kind: str, value) -> Tuple[bool, Optional[str]]:
+    """校验扫描目标，返回 (ok, err)"""
+    if not isinstance(value, str) or not value or len(value) > 2048:
+        return False, f'Invalid {kind}'
+    if kind == 'url':
+        try:
+            parts = _split_url(value)
+            ok = parts.scheme in ('http', 'https') and bool(parts.hostname) and not any(c.isspace() for c in value)
+        except ValueError:
+            ok = False
+    elif kind == 'domain':
+        ok = _DOMAIN_RE.match(value) is not None
+    else:
+        ok = _TARGET_RE.match(value) is not None
+    return (True, None) if ok else (False, f'Invalid {kind}: {value[:100]}')
+
+
+# 任务状态轮询缓存 (进程内, 秒)
+STATUS_CACHE_TTL = 1.0
+READY_CACHE_TTL = 300.0
+STATUS_CACHE_MAX = 10000
+# 缓存的终态结果总字节数上限 / 单个结果上限（更大的结果只缓存状态，结果每次从后端读取）
+STATUS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+READY_INFO_MAX_BYTES = 1024 * 1024
+
+# task_id -> (过期时间, 快照, 结果字节数)，按最近使用排序
+_status_cache = OrderedDict()
+_status_cache_bytes = 0
+# (过期时间, task_id) 最小堆：超出上限时只弹出已过期的条目，不扫描整个缓存
+_status_expiry_heap = []
+_status_cache_lock = threading.Lock()
+
+
+def _status_cache_pop(task_id: str):
+    """移除一个缓存条目（调用方持有锁）"""
+    global _status_cache_bytes
+    entry = _status_cache.pop(task_id, None)
+    if entry is not None:
+        _status_cache_bytes -= entry[2]
+
+
+def _status_cache_purge_expired(now: float):
+    """弹出已到期的堆项并移除对应的过期条目，代价与实际过期数成正比（调用方持有锁）"""
+    heap = _status_expiry_heap
+    while heap and heap[0][0] <= now:
+        expires, task_id = heapq.heappop(heap)
+        entry = _status_cache.get(task_id)
+        # 条目可能已被刷新为更晚的过期时间或已被淘汰
+        if entry is not None and entry[0] == expires:
+            _status_cache_pop(task_id)
+
+
+def _status_cache_put(task_id: str, entry: tuple):
+    """写入缓存条目；超出条目数或字节数上限时先清理过期条目，再按LRU淘汰（调用方持有锁）"""
+    global _status_cache_bytes, _status_expiry_heap
+    _status_cache_pop(task_id)
+    _status_cache[task_id] = entry
+    _status_cache_bytes += entry[2]
+    heapq.heappush(_status_expiry_heap, (entry[0], task_id))
+    
+    if len(_status_cache) > STATUS_CACHE_MAX or _status_cache_bytes > STATUS_CACHE_MAX_BYTES:
+        _status_cache_purge_expired(time.monotonic())
+    while len(_status_cache) > STATUS_CACHE_MAX or _status_cache_bytes > STATUS_CACHE_MAX_BYTES:
+        _status_cache_pop(next(iter(_status_cache)))
+    
+    # 刷新/淘汰留下的陈旧堆项过多时按现存条目重建
+    if len(_status_expiry_heap) > 2 * max(len(_status_cache), 1024):
+        _status_expiry_heap = [(expires, key) for key, (expires, _, _) in _status_cache.items()]
+        heapq.heapify(_status_expiry_heap)
+
+
+def _task_snapshot(task_id: str) -> dict:
+    """读取任务状态快照, 每个TTL窗口内只访问一次结果后端（大结果除外）"""
+    now = time.monotonic()
+    with _status_cache_lock:
+        entry = _status_cache.get(task_id)
+        if entry and entry[0] > now:
+            _status_cache.move_to_end(task_id)
+        else:
+            entry = None
+    if entry:
+        snapshot = entry[1]
+        if 'info' not in snapshot:
+            # 终态但结果过大未缓存：状态复用缓存，结果从后端读取
+            snapshot = {**snapshot, 'info': celery_app.backend.get_task_meta(task_id).get('result')}
+        return snapshot
+
+    meta = celery_app.backend.get_task_meta(task_id)
+    state = meta.get('status', PENDING)
+    snapshot = {
+        'state': state,
+        'info': meta.get('result'),
+        'ready': state in READY_STATES,
+    }
+
+    cached, nbytes = snapshot, 0
+    if snapshot['ready']:
+        ttl = READY_CACHE_TTL
+        nbytes = len(dump_json(snapshot['info']))
+        if nbytes > READY_INFO_MAX_BYTES:
+            cached, nbytes = {'state': state, 'ready': True}, 0
+    else:
+        ttl = STATUS_CACHE_TTL
+    
+    with _status_cache_lock:
+        _status_cache_put(task_id, (now + ttl, cached, nbytes))
+    return snapshot
+
+
+def _conditional_json(payload, status: int = 200) -> Response:
+    """带ETag的JSON响应，轮询内容未变化时返回304（只有响应头）"""
+    body = dump_json(payload)
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, status=status, mimetype='application/json')
+    # 压缩中间件可能改写响应体，使用弱ETag
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = f'max-age={int(STATUS_CACHE_TTL)}'
+    return response
+
+
+# Worker inspect快照缓存 (秒)
+INSPECT_CACHE_TTL = 2.0
+INSPECT_TIMEOUT = 0.5
+INSPECT_KINDS = ('active', 'reserved', 'scheduled')
+
+# Inspect对象无状态，可复用；每次调用才发起广播
+_INSPECTOR = celery_app.control.inspect(timeout=INSPECT_TIMEOUT)
+# 三类广播并发发出，刷新耗时约为一个超时窗口而非三个
+_INSPECT_POOL = ThreadPoolExecutor(max_workers=len(INSPECT_KINDS), thread_name_prefix='inspect')
+
+_inspect_cache = (0.0, None)
+_inspect_lock = threading.Lock()
+
+
+def _inspect_snapshot() -> dict:
+    """并发获取active/reserved/scheduled, TTL内复用, 并发请求只触发一轮广播"""
+    global _inspect_cache
+    with _inspect_lock:
+        expires, snapshot = _inspect_cache
+        if snapshot is not None and expires > time.monotonic():
+            return snapshot
+
+        futures = {kind: _INSPECT_POOL.submit(getattr(_INSPECTOR, kind)) for kind in INSPECT_KINDS}
+        snapshot = {kind: future.result() for kind, future in futures.items()}
+        _inspect_cache = (time.monotonic() + INSPECT_CACHE_TTL, snapshot)
+        return snapshot
+
+
+# ============================================================================
+# ERROR HANDLING
+# ============================================================================
+
+@tasks_bp.errorhandler(Exception)
+def handle_error(e):
+    """蓝图内统一异常处理（各端点不再单独try/except）"""
+    if isinstance(e, HTTPException):
+        return jsonify({
+            'success': False,
+            'error': e.description
+        }), e.code
+    
+    logger.error(f"Failed to handle {request.endpoint}: {e}")
+    return jsonify({
+        'success': False,
+        'error': str(e)
+    }), 500
+
 
 # ============================================================================
 # TASK SUBMISSION ENDPOINTS
@@ -33,250 +282,336 @@ tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 @tasks_bp.route('/scan/nmap', methods=['POST'])
 def submit_nmap_scan():
     """提交Nmap扫描任务"""
-    try:
-        data = request.get_json()
-        target = data.get('target')
-        options = data.get('options', {})
-        
-        if not target:
-            return jsonify({
-                'success': False,
-                'error': 'Target is required'
-            }), 400
-        
-        # 提交异步任务
-        task = run_nmap_scan.delay(target, options)
-        
+    data = request.get_json()
+    target = data.get('target')
+    options = data.get('options', {})
+    
+    if not target:
         return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': f'Nmap scan task submitted for {target}'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit nmap scan: {e}")
+            'success': False,
+            'error': 'Target is required'
+        }), 400
+    
+    ok, err = _validate('target', target)
+    if not ok:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': err
+        }), 400
+    
+    # 提交异步任务
+    task = _enqueue(run_nmap_scan, target, options)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': f'Nmap scan task submitted for {target}'
+    })
 
 
 @tasks_bp.route('/scan/nuclei', methods=['POST'])
 def submit_nuclei_scan():
     """提交Nuclei扫描任务"""
-    try:
-        data = request.get_json()
-        target = data.get('target')
-        options = data.get('options', {})
-        
-        if not target:
-            return jsonify({
-                'success': False,
-                'error': 'Target is required'
-            }), 400
-        
-        task = run_nuclei_scan.delay(target, options)
-        
+    data = request.get_json()
+    target = data.get('target')
+    options = data.get('options', {})
+    
+    if not target:
         return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': f'Nuclei scan task submitted for {target}'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit nuclei scan: {e}")
+            'success': False,
+            'error': 'Target is required'
+        }), 400
+    
+    ok, err = _validate('target', target)
+    if not ok:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': err
+        }), 400
+    
+    task = _enqueue(run_nuclei_scan, target, options)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': f'Nuclei scan task submitted for {target}'
+    })
 
 
 @tasks_bp.route('/scan/subdomain', methods=['POST'])
 def submit_subdomain_enum():
     """提交子域名枚举任务"""
-    try:
-        data = request.get_json()
-        domain = data.get('domain')
-        options = data.get('options', {})
-        
-        if not domain:
-            return jsonify({
-                'success': False,
-                'error': 'Domain is required'
-            }), 400
-        
-        task = run_subdomain_enum.delay(domain, options)
-        
+    data = request.get_json()
+    domain = data.get('domain')
+    options = data.get('options', {})
+    
+    if not domain:
         return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': f'Subdomain enumeration task submitted for {domain}'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit subdomain enum: {e}")
+            'success': False,
+            'error': 'Domain is required'
+        }), 400
+    
+    ok, err = _validate('domain', domain)
+    if not ok:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': err
+        }), 400
+    
+    task = _enqueue(run_subdomain_enum, domain, options)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': f'Subdomain enumeration task submitted for {domain}'
+    })
 
 
 @tasks_bp.route('/scan/web', methods=['POST'])
 def submit_web_scan():
     """提交Web应用扫描任务（综合）"""
-    try:
-        data = request.get_json()
-        url = data.get('url')
-        options = data.get('options', {})
-        
-        if not url:
-            return jsonify({
-                'success': False,
-                'error': 'URL is required'
-            }), 400
-        
-        task = run_web_scan.delay(url, options)
-        
+    data = request.get_json()
+    url = data.get('url')
+    options = data.get('options', {})
+    
+    if not url:
         return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': f'Web scan task submitted for {url}'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit web scan: {e}")
+            'success': False,
+            'error': 'URL is required'
+        }), 400
+    
+    ok, err = _validate('url', url)
+    if not ok:
+        return jsonify({
+            'success': False,
+            'error': err
+        }), 400
+    
+    task = _enqueue(run_web_scan, url, options)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': f'Web scan task submitted for {url}'
+    })
+
+
+@tasks_bp.route('/scan/<scan_type>/bulk', methods=['POST'])
+def submit_bulk_scan(scan_type):
+    """批量提交扫描任务（一个group，共用同一个broker连接发布）"""
+    task_func = BULK_SCAN_TASKS.get(scan_type)
+    if task_func is None:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': f'Unsupported scan type: {scan_type}',
+            'supported_types': list(BULK_SCAN_TASKS)
+        }), 400
+    
+    data = request.get_json() or {}
+    targets = data.get('targets')
+    options = data.get('options', {})
+    
+    if not targets or not isinstance(targets, list):
+        return jsonify({
+            'success': False,
+            'error': 'Targets list is required'
+        }), 400
+    
+    kind = BULK_SCAN_TARGET_KINDS[scan_type]
+    for target in targets:
+        ok, err = _validate(kind, target)
+        if not ok:
+            return jsonify({
+                'success': False,
+                'error': err
+            }), 400
+    
+    # 预先生成任务ID，响应不依赖发布后返回的GroupResult
+    group_id = str(uuid.uuid4())
+    task_ids = [str(uuid.uuid4()) for _ in targets]
+    signatures = [
+        task_func.s(target, options).set(task_id=task_id)
+        for target, task_id in zip(targets, task_ids)
+    ]
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        group(signatures).apply_async(
+            task_id=group_id, producer=producer, compression=_request_compression()
+        )
+    
+    return jsonify({
+        'success': True,
+        'group_id': group_id,
+        'task_ids': task_ids,
+        'status': 'submitted',
+        'message': f'{len(targets)} {scan_type} scan tasks submitted'
+    })
 
 
 # ============================================================================
 # AI TASK SUBMISSION ENDPOINTS
 # ============================================================================
 
+def _submit_ai_analysis_stream():
+    """
+    流式提交AI分析（Content-Type: application/msgpack）
+    
+    请求体为msgpack数组，边读边解包，每个元素一个分析任务，由chord汇总结果
+    """
+    if not MSGPACK_AVAILABLE:
+        return jsonify({
+            'success': False,
+            'error': 'msgpack payloads are not supported on this server'
+        }), 415
+    
+    unpacker = msgpack.Unpacker(
+        request.stream, raw=False,
+        read_size=MSGPACK_READ_SIZE, max_buffer_size=MSGPACK_MAX_BUFFER
+    )
+    compression = _request_compression()
+    try:
+        count = unpacker.read_array_header()
+        signatures = [
+            analyze_scan_results.s(unpacker.unpack()).set(compression=compression)
+            for _ in range(count)
+        ]
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid msgpack payload: {e}'
+        }), 400
+    
+    if not signatures:
+        return jsonify({
+            'success': False,
+            'error': 'Scan results are required'
+        }), 400
+    
+    result = chord(signatures, finalize_analysis.s()).apply_async()
+    
+    return jsonify({
+        'success': True,
+        'task_id': result.id,
+        'count': count,
+        'status': 'submitted',
+        'message': f'AI analysis chord submitted ({count} items)'
+    })
+
+
 @tasks_bp.route('/ai/analyze', methods=['POST'])
 def submit_ai_analysis():
     """提交AI分析任务"""
-    try:
-        data = request.get_json()
-        scan_results = data.get('scan_results')
-        
-        if not scan_results:
-            return jsonify({
-                'success': False,
-                'error': 'Scan results are required'
-            }), 400
-        
-        task = analyze_scan_results.delay(scan_results)
-        
+    if request.mimetype == MSGPACK_MIMETYPE:
+        return _submit_ai_analysis_stream()
+    
+    data = request.get_json()
+    scan_results = data.get('scan_results')
+    
+    if not scan_results:
         return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': 'AI analysis task submitted'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit AI analysis: {e}")
+            'success': False,
+            'error': 'Scan results are required'
+        }), 400
+    
+    task = _enqueue(analyze_scan_results, scan_results)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': 'AI analysis task submitted'
+    })
+
+
+@tasks_bp.route('/ai/analyze/batch', methods=['POST'])
+def submit_ai_analysis_batch():
+    """批量提交AI分析任务（一个任务处理多份扫描结果）"""
+    data = request.get_json() or {}
+    batch = data.get('scan_results')
+    
+    if not batch or not isinstance(batch, list):
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Scan results list is required'
+        }), 400
+    
+    task = _enqueue(analyze_scan_results_batch, batch)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': f'AI analysis batch task submitted ({len(batch)} items)'
+    })
 
 
 @tasks_bp.route('/ai/exploit-suggestions', methods=['POST'])
 def submit_exploit_suggestions():
     """提交利用建议生成任务"""
-    try:
-        data = request.get_json()
-        vulnerability_data = data.get('vulnerability_data')
-        
-        if not vulnerability_data:
-            return jsonify({
-                'success': False,
-                'error': 'Vulnerability data is required'
-            }), 400
-        
-        task = generate_exploit_suggestions.delay(vulnerability_data)
-        
-        return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': 'Exploit suggestions task submitted'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit exploit suggestions: {e}")
+    data = request.get_json()
+    vulnerability_data = data.get('vulnerability_data')
+    
+    if not vulnerability_data:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Vulnerability data is required'
+        }), 400
+    
+    task = _enqueue(generate_exploit_suggestions, vulnerability_data)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': 'Exploit suggestions task submitted'
+    })
 
 
 @tasks_bp.route('/ai/predict-vectors', methods=['POST'])
 def submit_attack_vector_prediction():
     """提交攻击向量预测任务"""
-    try:
-        data = request.get_json()
-        target_info = data.get('target_info')
-        
-        if not target_info:
-            return jsonify({
-                'success': False,
-                'error': 'Target info is required'
-            }), 400
-        
-        task = predict_attack_vectors.delay(target_info)
-        
-        return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': 'Attack vector prediction task submitted'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit attack vector prediction: {e}")
+    data = request.get_json()
+    target_info = data.get('target_info')
+    
+    if not target_info:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Target info is required'
+        }), 400
+    
+    task = _enqueue(predict_attack_vectors, target_info)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': 'Attack vector prediction task submitted'
+    })
 
 
 @tasks_bp.route('/ai/generate-payloads', methods=['POST'])
 def submit_payload_generation():
     """提交智能Payload生成任务"""
-    try:
-        data = request.get_json()
-        context = data.get('context')
-        
-        if not context:
-            return jsonify({
-                'success': False,
-                'error': 'Context is required'
-            }), 400
-        
-        task = generate_intelligent_payloads.delay(context)
-        
-        return jsonify({
-            'success': True,
-            'task_id': task.id,
-            'status': 'submitted',
-            'message': 'Payload generation task submitted'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to submit payload generation: {e}")
+    data = request.get_json()
+    context = data.get('context')
+    
+    if not context:
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Context is required'
+        }), 400
+    
+    task = _enqueue(generate_intelligent_payloads, context)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task.id,
+        'status': 'submitted',
+        'message': 'Payload generation task submitted'
+    })
 
 
 # ============================================================================
@@ -286,89 +621,68 @@ def submit_payload_generation():
 @tasks_bp.route('/<task_id>/status', methods=['GET'])
 def get_task_status(task_id):
     """获取任务状态"""
-    try:
-        task = AsyncResult(task_id, app=celery_app)
-        
-        response = {
-            'task_id': task_id,
-            'status': task.state,
-            'ready': task.ready(),
-            'successful': task.successful() if task.ready() else None,
-            'failed': task.failed() if task.ready() else None
-        }
-        
-        if task.state == 'PROGRESS':
-            response['progress'] = task.info
-        elif task.state == 'SUCCESS':
-            response['result'] = task.result
-        elif task.state == 'FAILURE':
-            response['error'] = str(task.info)
-        
-        return jsonify({
-            'success': True,
-            **response
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get task status: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    snap = _task_snapshot(task_id)
+    state, ready = snap['state'], snap['ready']
+    
+    response = {
+        'task_id': task_id,
+        'status': state,
+        'ready': ready,
+        'successful': state == SUCCESS if ready else None,
+        'failed': state == FAILURE if ready else None
+    }
+    
+    if state == 'PROGRESS':
+        response['progress'] = snap['info']
+    elif state == SUCCESS:
+        response['result'] = snap['info']
+    elif state == FAILURE:
+        response['error'] = str(snap['info'])
+    
+    return _conditional_json({
+        'success': True,
+        **response
+    })
 
 
 @tasks_bp.route('/<task_id>/result', methods=['GET'])
 def get_task_result(task_id):
     """获取任务结果"""
-    try:
-        task = AsyncResult(task_id, app=celery_app)
-        
-        if not task.ready():
-            return jsonify({
-                'success': False,
-                'error': 'Task not completed yet',
-                'status': task.state
-            }), 202  # Accepted but not ready
-        
-        if task.failed():
-            return jsonify({
-                'success': False,
-                'error': str(task.info),
-                'status': 'FAILURE'
-            }), 500
-        
-        return jsonify({
-            'success': True,
-            'status': 'SUCCESS',
-            'result': task.result
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get task result: {e}")
-        return jsonify({
+    snap = _task_snapshot(task_id)
+    
+    if not snap['ready']:
+        return _conditional_json({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Task not completed yet',
+            'status': snap['state']
+        }, 202)  # Accepted but not ready
+    
+    if snap['state'] == FAILURE:
+        return json_response({
+            'success': False,
+            'error': str(snap['info']),
+            'status': 'FAILURE'
+        }, 500)
+    
+    return _conditional_json({
+        'success': True,
+        'status': 'SUCCESS',
+        'result': snap['info']
+    })
 
 
 @tasks_bp.route('/<task_id>/cancel', methods=['POST'])
 def cancel_task(task_id):
     """取消任务"""
-    try:
-        task = AsyncResult(task_id, app=celery_app)
-        task.revoke(terminate=True)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Task {task_id} cancelled'
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to cancel task: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    task = AsyncResult(task_id, app=celery_app)
+    task.revoke(terminate=True)
+    with _status_cache_lock:
+        _status_cache_pop(task_id)
+    
+    return jsonify({
+        'success': True,
+        'message': f'Task {task_id} cancelled'
+    })
 
 
 # ============================================================================
@@ -378,80 +692,56 @@ def cancel_task(task_id):
 @tasks_bp.route('/workers/status', methods=['GET'])
 def get_workers_status():
     """获取Worker状态"""
-    try:
-        status = get_worker_status()
-        
-        return jsonify({
-            'success': True,
-            'workers': status
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get workers status: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    status = get_worker_status()
+    
+    return jsonify({
+        'success': True,
+        'workers': status
+    })
+
+
+@tasks_bp.route('/workers/snapshot', methods=['GET'])
+def get_workers_snapshot():
+    """获取活跃/预留/计划任务快照"""
+    snapshot = _inspect_snapshot()
+    
+    return jsonify({
+        'success': True,
+        'active_tasks': snapshot['active'],
+        'reserved_tasks': snapshot['reserved'],
+        'scheduled_tasks': snapshot['scheduled']
+    })
 
 
 @tasks_bp.route('/queues/stats', methods=['GET'])
 def get_queue_stats():
     """获取队列统计"""
-    try:
-        queues = ['default', 'scan', 'analysis', 'report', 'ai']
-        stats = {}
-        
-        for queue in queues:
-            stats[queue] = get_queue_length(queue)
-        
-        return jsonify({
-            'success': True,
-            'queues': stats
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get queue stats: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    queues = ['default', 'scan', 'analysis', 'report', 'ai']
+    stats = get_queue_lengths(queues)
+    
+    return jsonify({
+        'success': True,
+        'queues': stats
+    })
 
 
 @tasks_bp.route('/active', methods=['GET'])
 def get_active_tasks():
     """获取活跃任务列表"""
-    try:
-        inspector = celery_app.control.inspect()
-        active = inspector.active()
-        
-        return jsonify({
-            'success': True,
-            'active_tasks': active
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get active tasks: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    active = _inspect_snapshot()['active']
+    
+    return jsonify({
+        'success': True,
+        'active_tasks': active
+    })
 
 
 @tasks_bp.route('/reserved', methods=['GET'])
 def get_reserved_tasks():
     """获取预留任务列表"""
-    try:
-        inspector = celery_app.control.inspect()
-        reserved = inspector.reserved()
-        
-        return jsonify({
-            'success': True,
-            'reserved_tasks': reserved
-        })
-        
-    except Exception as e:
-        logger.error(f"Failed to get reserved tasks: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    reserved = _inspect_snapshot()['reserved']
+    
+    return jsonify({
+        'success': True,
+        'reserved_tasks': reserved
+    })
@@ -7,7 +7,21 @@ HexStrike AI - Performance Configuration (v6.1)
 
 import os
 import multiprocessing as mp
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+
+def _default_max_workers() -> int:
+    """按负载类型推算线程池上限: 扫描/AI任务以网络I/O为主, 线程数可远超CPU核数"""
+    value = os.getenv('MAX_WORKERS', 'auto')
+    if value != 'auto':
+        return int(value)
+    cpus = mp.cpu_count()
+    profile = os.getenv('WORKLOAD_PROFILE', 'io')
+    if profile == 'cpu' or os.getenv('WORKER_TYPE', 'thread') == 'process':
+        return cpus * 2
+    return min(cpus * 8, 64)
 
 
 # ============================================================================
@@ -50,8 +64,9 @@ class PerformanceConfig:
     # ========================================================================
     WORKER_POOL = {
         'min_workers': int(os.getenv('MIN_WORKERS', '2')),
-        'max_workers': int(os.getenv('MAX_WORKERS', str(mp.cpu_count() * 2))),
-        'worker_type': os.getenv('WORKER_TYPE', 'thread')  # 'thread' or 'process'
+        'max_workers': _default_max_workers(),
+        'worker_type': os.getenv('WORKER_TYPE', 'thread'),  # 'thread' or 'process'
+        'workload_profile': os.getenv('WORKLOAD_PROFILE', 'io')  # 'io' or 'cpu'
     }
     
     # ========================================================================
@@ -74,7 +89,9 @@ class PerformanceConfig:
         'enabled': os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('true', '1', 'yes'),
         'min_size': int(os.getenv('COMPRESSION_MIN_SIZE', '1024')),
         'level': int(os.getenv('COMPRESSION_LEVEL', '6')),  # 1-9 for gzip, 0-11 for brotli
-        'prefer_brotli': os.getenv('PREFER_BROTLI', 'true').lower() in ('true', '1', 'yes')
+        'prefer_brotli': os.getenv('PREFER_BROTLI', 'true').lower() in ('true', '1', 'yes'),
+        # Celery任务/结果消息压缩: zstd, gzip, brotli 或 none
+        'task_compression': os.getenv('TASK_COMPRESSION', 'zstd')
     }
     
     # ========================================================================
@@ -99,6 +116,20 @@ class PerformanceConfig:
         'max_requests_jitter': int(os.getenv('MAX_REQUESTS_JITTER', '1000'))
     }
     
+    # ========================================================================
+    # CELERY TASK QUEUE
+    # ========================================================================
+    CELERY = {
+        # msgpack 需要安装 msgpack 包，未安装时 celery_app 自动回退到 json
+        'serializer': os.getenv('CELERY_SERIALIZER', 'msgpack'),
+        # 扫描任务耗时长：每个worker进程只预取1个任务，避免任务堆在忙碌的worker上
+        'prefetch_multiplier': int(os.getenv('CELERY_PREFETCH', '1')),
+        'acks_late': os.getenv('CELERY_ACKS_LATE', 'true').lower() in ('true', '1', 'yes'),
+        'reject_on_worker_lost': os.getenv('CELERY_REJECT_ON_WORKER_LOST', 'true').lower() in ('true', '1', 'yes'),
+        # 任务发布复用的broker连接数上限
+        'broker_pool_limit': int(os.getenv('CELERY_BROKER_POOL_LIMIT', str(CONNECTION_POOL['max_connections']))),
+    }
+    
     # ========================================================================
     # LAZY LOADING
     # ========================================================================
@@ -123,9 +154,10 @@ class PerformanceConfig:
     }
     
     @classmethod
-    def get_config(cls) -> Dict[str, Any]:
-        """获取完整配置字典"""
-        return {
+    @lru_cache(maxsize=None)
+    def get_config(cls) -> Mapping[str, Any]:
+        """获取完整配置字典（环境变量在导入时已读取，只构建一次，返回只读视图）"""
+        return MappingProxyType({
             'connection_pool': cls.CONNECTION_POOL,
             'rate_limit': cls.RATE_LIMIT,
             'circuit_breaker': cls.CIRCUIT_BREAKER,
@@ -138,7 +170,7 @@ class PerformanceConfig:
             'redis_db': cls.REDIS['db'],
             'redis_password': cls.REDIS['password'],
             'redis_prefix': cls.REDIS['prefix']
-        }
+        })
     
     @classmethod
     def print_config(cls):
@@ -182,6 +214,10 @@ class PerformanceConfig:
         for key, value in cls.SERVER.items():
             print(f"  • {key}: {value}")
         
+        print("\n📨 Celery:")
+        for key, value in cls.CELERY.items():
+            print(f"  • {key}: {value}")
+        
         print("\n⏳ Lazy Loading:")
         print(f"  • enabled: {cls.LAZY_LOADING['enabled']}")
         if cls.LAZY_LOADING['enabled']:
@@ -219,8 +255,9 @@ CB_RECOVERY_TIMEOUT=60
 
 # Worker Pool
 MIN_WORKERS=2
-MAX_WORKERS=auto  # Will use CPU count * 2
+MAX_WORKERS=auto  # io: CPU count * 8 (max 64), cpu/process: CPU count * 2
 WORKER_TYPE=thread  # thread or process
+WORKLOAD_PROFILE=io  # io (network-bound scans/AI calls) or cpu
 
 # Redis Cache (Optional)
 REDIS_ENABLED=false
@@ -236,6 +273,7 @@ COMPRESSION_ENABLED=true
 COMPRESSION_MIN_SIZE=1024
 COMPRESSION_LEVEL=6
 PREFER_BROTLI=true
+TASK_COMPRESSION=zstd  # Celery message compression: zstd (requires zstandard), gzip, brotli or none
 
 # Cache Warmup
 CACHE_WARMUP_ENABLED=true
@@ -251,6 +289,13 @@ KEEPALIVE=5
 MAX_REQUESTS=10000
 MAX_REQUESTS_JITTER=1000
 
+# Celery Task Queue
+CELERY_SERIALIZER=msgpack  # msgpack (requires msgpack package) or json
+CELERY_PREFETCH=1
+CELERY_ACKS_LATE=true
+CELERY_REJECT_ON_WORKER_LOST=true
+CELERY_BROKER_POOL_LIMIT=100  # defaults to MAX_CONNECTIONS
+
 # Lazy Loading
 LAZY_LOADING_ENABLED=true
 
@@ -4,25 +4,127 @@
 """
 
 import hashlib
+import heapq
 import json
 import logging
+import threading
 import time
-from typing import Dict, Any, Optional, List
+import zlib
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+# 序列化: 优先msgspec.msgpack（参数按键排序编码，保证缓存键稳定），否则回退到json
+if MSGSPEC_AVAILABLE:
+    _params_encoder = msgspec.msgpack.Encoder(order='deterministic')
+    _encoder = msgspec.msgpack.Encoder()
+    _decoder = msgspec.msgpack.Decoder()
+
+    _encode_params = _params_encoder.encode
+    _serialize = _encoder.encode
+    _deserialize = _decoder.decode
+else:
+    def _encode_params(params: Dict[str, Any]) -> bytes:
+        return json.dumps(params, sort_keys=True).encode()
+
+    def _serialize(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data).encode()
+
+    _deserialize = json.loads
+
+# 大于该大小（字节）的Redis载荷压缩存储（zstd level 3，未安装时回退zlib）
+COMPRESS_THRESHOLD = 4096
+COMPRESS_LEVEL = 3
+
+# 压缩格式由帧头识别：msgpack map / JSON 对象不会以这两种头开始，未压缩的旧条目照常读取
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_ZLIB_HEADER = b'\x78'
+
+# zstd 压缩器/解压器实例不可跨线程共享
+_zstd_local = threading.local()
+
+
+def _pack(data: Dict[str, Any]) -> bytes:
+    """序列化缓存数据，超过阈值时压缩"""
+    blob = _serialize(data)
+    if len(blob) <= COMPRESS_THRESHOLD:
+        return blob
+    if ZSTD_AVAILABLE:
+        compressor = getattr(_zstd_local, 'compressor', None)
+        if compressor is None:
+            compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=COMPRESS_LEVEL)
+        return compressor.compress(blob)
+    return zlib.compress(blob, COMPRESS_LEVEL)
+
+
+def _unpack(raw: bytes) -> Dict[str, Any]:
+    """按帧头解压并反序列化缓存数据"""
+    if raw[:4] == _ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd-compressed cache entry but zstandard is not installed")
+        decompressor = getattr(_zstd_local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+        raw = decompressor.decompress(raw)
+    elif raw[:1] == _ZLIB_HEADER:
+        raw = zlib.decompress(raw)
+    return _deserialize(raw)
+
+
+# 缓存键前缀（键全程使用bytes，Redis客户端无需再编码）
+_KEY_PREFIX = b"hexstrike:scan:"
+_KEY_PATTERN = _KEY_PREFIX + b"*"
+
+# 缓存键哈希: 优先XXH3，否则回退到MD5
+if XXHASH_AVAILABLE:
+    _hexdigest = xxhash.xxh3_64_hexdigest
+else:
+    def _hexdigest(data: bytes) -> str:
+        return hashlib.md5(data).hexdigest()
+
+
 @dataclass
 class CacheEntry:
-    """缓存条目数据类"""
-    key: str
+    """缓存条目数据类（data为扫描结果本身，expires_at为monotonic纳秒）"""
+    key: bytes
     data: Dict[str, Any]
     created_at: float
-    expires_at: float
+    expires_at: int
     tool_name: str
     target: str
+    ttl: int
+
+
+@lru_cache(maxsize=4096)
+def _cached_key(tool_name: str, target: str, params_blob: bytes) -> bytes:
+    """由工具、目标和已编码参数计算缓存键（get→set 同一输入只哈希一次）"""
+    tool = tool_name.encode()
+    hash_key = _hexdigest(tool + b":" + target.encode() + b":" + params_blob)
+    return _KEY_PREFIX + tool + b":" + hash_key.encode()
 
 
 class ScanResultCache:
@@ -48,17 +150,28 @@ class ScanResultCache:
         'nikto': 14400,     # 4小时
     }
     
-    def __init__(self, use_redis: bool = True, redis_client=None):
+    # 内存缓存默认容量（条目数）
+    DEFAULT_MAX_ENTRIES = 10000
+    
+    # Redis键遍历：SCAN每批提示数量 / UNLINK每批键数
+    SCAN_COUNT = 1000
+    UNLINK_BATCH = 500
+    
+    def __init__(self, use_redis: bool = True, redis_client=None, max_entries: int = DEFAULT_MAX_ENTRIES):
         """
         初始化缓存管理器
         
         Args:
             use_redis: 是否使用Redis
             redis_client: Redis客户端实例
+            max_entries: 内存缓存容量，超出时淘汰最久未使用的条目
         """
         self.use_redis = use_redis
         self.redis_client = redis_client
-        self.memory_cache = {}  # 内存缓存作为fallback
+        self.memory_cache = OrderedDict()  # 内存缓存作为fallback（LRU）
+        self.max_entries = max_entries
+        self._memory_lock = threading.Lock()
+        self._expiry_heap: List[Tuple[int, bytes]] = []  # (expires_at_ns, key) 最小堆
         
         if use_redis and redis_client:
             try:
@@ -75,7 +188,7 @@ class ScanResultCache:
         tool_name: str, 
         target: str, 
         params: Dict[str, Any]
-    ) -> str:
+    ) -> bytes:
         """
         生成缓存键
         
@@ -85,24 +198,38 @@ class ScanResultCache:
             params: 参数
             
         Returns:
-            str: 缓存键
+            bytes: 缓存键
         """
-        # 排序参数以确保一致性
-        sorted_params = json.dumps(params, sort_keys=True)
-        
-        # 组合数据
-        data = f"{tool_name}:{target}:{sorted_params}"
-        
-        # MD5哈希
-        hash_key = hashlib.md5(data.encode()).hexdigest()
-        
-        return f"hexstrike:scan:{tool_name}:{hash_key}"
+        # 参数按键排序编码以确保一致性；相同输入的哈希由LRU缓存复用
+        return _cached_key(tool_name, target, _encode_params(params))
+    
+    def make_key(self, tool_name: str, target: str, params: Optional[Dict] = None) -> bytes:
+        """计算缓存键，可作为precomputed_key传给get/set/invalidate以免重复编码参数"""
+        return self._generate_cache_key(tool_name, target, params or {})
+    
+    def _resolve_ttl(self, tool_name: str, scan_type: str, ttl: Optional[int]) -> int:
+        """确定TTL：自定义 > 工具特定 > 扫描类型默认"""
+        if ttl is not None:
+            return ttl
+        return _default_ttl(type(self), tool_name, scan_type)
+    
+    @staticmethod
+    def _wrap_result(tool_name: str, target: str, result: Dict[str, Any], ttl: int) -> Dict[str, Any]:
+        """为结果添加缓存元数据"""
+        return {
+            'result': result,
+            'tool_name': tool_name,
+            'target': target,
+            'cached_at': datetime.now().isoformat(),
+            'ttl': ttl
+        }
     
     def get(
         self, 
         tool_name: str, 
         target: str, 
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        precomputed_key: Optional[bytes] = None
     ) -> Optional[Dict[str, Any]]:
         """
         获取缓存结果
@@ -111,33 +238,38 @@ class ScanResultCache:
             tool_name: 工具名称
             target: 目标
             params: 参数
+            precomputed_key: make_key预先算好的缓存键
             
         Returns:
             Optional[Dict]: 缓存的结果，如果不存在或过期返回None
         """
-        params = params or {}
-        key = self._generate_cache_key(tool_name, target, params)
+        key = precomputed_key or self.make_key(tool_name, target, params)
         
         try:
             if self.use_redis and self.redis_client:
                 # 从Redis获取
                 cached = self.redis_client.get(key)
                 if cached:
-                    data = json.loads(cached)
-                    logger.info(f"🎯 Cache HIT (Redis): {tool_name} on {target}")
-                    return data
+                    data = self._decode_or_drop(key, cached)
+                    if data is not None:
+                        logger.info(f"🎯 Cache HIT (Redis): {tool_name} on {target}")
+                        return data
             else:
                 # 从内存获取
-                entry = self.memory_cache.get(key)
+                with self._memory_lock:
+                    entry = self.memory_cache.get(key)
+                    if entry:
+                        # 检查是否过期
+                        if time.monotonic_ns() < entry.expires_at:
+                            self.memory_cache.move_to_end(key)
+                        else:
+                            # 清理过期条目
+                            del self.memory_cache[key]
+                            logger.debug(f"🗑️  Removed expired cache entry: {key}")
+                            entry = None
                 if entry:
-                    # 检查是否过期
-                    if time.time() < entry.expires_at:
-                        logger.info(f"🎯 Cache HIT (Memory): {tool_name} on {target}")
-                        return entry.data
-                    else:
-                        # 清理过期条目
-                        del self.memory_cache[key]
-                        logger.debug(f"🗑️  Removed expired cache entry: {key}")
+                    logger.info(f"🎯 Cache HIT (Memory): {tool_name} on {target}")
+                    return self._entry_to_cached(entry)
         
         except Exception as e:
             logger.error(f"❌ Cache get error: {e}")
@@ -145,6 +277,23 @@ class ScanResultCache:
         logger.debug(f"❌ Cache MISS: {tool_name} on {target}")
         return None
     
+    def _decode_or_drop(self, key: bytes, raw: bytes) -> Optional[Dict[str, Any]]:
+        """
+        解码Redis中的缓存值；无法解码（旧格式、损坏或截断）时删除该键并返回None
+        
+        删除后键视为不存在，随后的 SET NX 写入才能替换它，
+        否则每次调用都会重新扫描直到旧条目过期。
+        """
+        try:
+            return _unpack(raw)
+        except Exception as e:
+            logger.warning(f"⚠️  Dropping undecodable cache entry {key!r}: {e}")
+            try:
+                self.redis_client.unlink(key)
+            except Exception as e:
+                logger.error(f"❌ Cache unlink error: {e}")
+            return None
+    
     def set(
         self,
         tool_name: str,
@@ -152,7 +301,9 @@ class ScanResultCache:
         params: Optional[Dict],
         result: Dict[str, Any],
         ttl: Optional[int] = None,
-        scan_type: str = 'default'
+        scan_type: str = 'default',
+        precomputed_key: Optional[bytes] = None,
+        if_not_exists: bool = False
     ) -> bool:
         """
         保存结果到缓存
@@ -164,62 +315,140 @@ class ScanResultCache:
             result: 扫描结果
             ttl: 自定义TTL（秒），None则使用默认值
             scan_type: 扫描类型，用于确定TTL
+            precomputed_key: make_key预先算好的缓存键
+            if_not_exists: 仅当键不存在时写入（Redis SET NX），不覆盖其他写入者的结果
             
         Returns:
-            bool: 是否成功保存
+            bool: 是否成功保存（if_not_exists且键已存在时返回False）
         """
-        params = params or {}
-        key = self._generate_cache_key(tool_name, target, params)
-        
-        # 确定TTL
-        if ttl is None:
-            ttl = self.TOOL_TTL.get(
-                tool_name,
-                self.DEFAULT_TTL.get(scan_type, self.DEFAULT_TTL['default'])
-            )
+        key = precomputed_key or self.make_key(tool_name, target, params)
+        
+        ttl = self._resolve_ttl(tool_name, scan_type, ttl)
         
         try:
-            # 添加元数据
-            cached_data = {
-                'result': result,
-                'tool_name': tool_name,
-                'target': target,
-                'cached_at': datetime.now().isoformat(),
-                'ttl': ttl
-            }
-            
             if self.use_redis and self.redis_client:
-                # 保存到Redis
-                self.redis_client.setex(
-                    key,
-                    ttl,
-                    json.dumps(cached_data)
-                )
-                logger.info(f"💾 Cached result (Redis): {tool_name} on {target} (TTL: {ttl}s)")
-                return True
+                return self._set_redis(key, tool_name, target, result, ttl, if_not_exists)
             else:
-                # 保存到内存
-                entry = CacheEntry(
-                    key=key,
-                    data=cached_data,
-                    created_at=time.time(),
-                    expires_at=time.time() + ttl,
-                    tool_name=tool_name,
-                    target=target
-                )
-                self.memory_cache[key] = entry
-                logger.info(f"💾 Cached result (Memory): {tool_name} on {target} (TTL: {ttl}s)")
-                return True
+                return self._set_memory(key, tool_name, target, result, ttl, if_not_exists)
                 
         except Exception as e:
             logger.error(f"❌ Cache set error: {e}")
             return False
     
+    def _set_redis(
+        self,
+        key: bytes,
+        tool_name: str,
+        target: str,
+        result: Dict[str, Any],
+        ttl: int,
+        if_not_exists: bool = False
+    ) -> bool:
+        """保存到Redis（结果连同元数据序列化）"""
+        blob = _pack(self._wrap_result(tool_name, target, result, ttl))
+        if if_not_exists:
+            # SET EX NX原子地"测试并写入"，已有结果时不覆盖
+            if not self.redis_client.set(key, blob, ex=ttl, nx=True):
+                logger.debug(f"⏭️  Cache entry exists (Redis), kept: {tool_name} on {target}")
+                return False
+        else:
+            self.redis_client.setex(key, ttl, blob)
+        logger.info(f"💾 Cached result (Redis): {tool_name} on {target} (TTL: {ttl}s)")
+        return True
+    
+    def _set_memory(
+        self,
+        key: bytes,
+        tool_name: str,
+        target: str,
+        result: Dict[str, Any],
+        ttl: int,
+        if_not_exists: bool = False
+    ) -> bool:
+        """保存到内存（直接保存结果对象，元数据放在CacheEntry字段中）"""
+        expires_at = time.monotonic_ns() + ttl * 1_000_000_000
+        entry = CacheEntry(
+            key=key,
+            data=result,
+            created_at=time.time(),
+            expires_at=expires_at,
+            tool_name=tool_name,
+            target=target,
+            ttl=ttl
+        )
+        with self._memory_lock:
+            existing = self.memory_cache.get(key)
+            if if_not_exists and existing and time.monotonic_ns() < existing.expires_at:
+                logger.debug(f"⏭️  Cache entry exists (Memory), kept: {tool_name} on {target}")
+                return False
+            self.memory_cache[key] = entry
+            self.memory_cache.move_to_end(key)
+            while len(self.memory_cache) > self.max_entries:
+                self.memory_cache.popitem(last=False)
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            # 覆盖/淘汰留下的陈旧堆项过多时按现存条目重建
+            if len(self._expiry_heap) > 2 * max(len(self.memory_cache), 1024):
+                self._expiry_heap = [(e.expires_at, k) for k, e in self.memory_cache.items()]
+                heapq.heapify(self._expiry_heap)
+        logger.info(f"💾 Cached result (Memory): {tool_name} on {target} (TTL: {ttl}s)")
+        return True
+    
+    @staticmethod
+    def _entry_to_cached(entry: CacheEntry) -> Dict[str, Any]:
+        """由内存条目生成与Redis路径一致的缓存结构"""
+        return {
+            'result': entry.data,
+            'tool_name': entry.tool_name,
+            'target': entry.target,
+            'cached_at': datetime.fromtimestamp(entry.created_at).isoformat(),
+            'ttl': entry.ttl
+        }
+    
+    def get_many(
+        self,
+        items: List[Tuple[str, str, Optional[Dict]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        批量获取缓存结果（Redis使用单个pipeline，一次往返）
+        
+        Args:
+            items: (工具名称, 目标, 参数) 列表
+            
+        Returns:
+            List[Optional[Dict]]: 与items顺序一致的缓存结果，未命中为None
+        """
+        if not (self.use_redis and self.redis_client):
+            return [self.get(tool_name, target, params) for tool_name, target, params in items]
+        
+        keys = [
+            self._generate_cache_key(tool_name, target, params or {})
+            for tool_name, target, params in items
+        ]
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+            raw = pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Cache get_many error: {e}")
+            return [None] * len(items)
+        
+        results = [
+            self._decode_or_drop(key, cached) if cached else None
+            for key, cached in zip(keys, raw)
+        ]
+        
+        hits = sum(1 for data in results if data is not None)
+        logger.info(f"🎯 Cache batch lookup (Redis): {hits}/{len(items)} hits")
+        return results
+    
     def invalidate(
         self,
         tool_name: str,
         target: str,
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        precomputed_key: Optional[bytes] = None
     ) -> bool:
         """
         失效缓存条目
@@ -228,12 +457,12 @@ class ScanResultCache:
             tool_name: 工具名称
             target: 目标
             params: 参数
+            precomputed_key: make_key预先算好的缓存键
             
         Returns:
             bool: 是否成功失效
         """
-        params = params or {}
-        key = self._generate_cache_key(tool_name, target, params)
+        key = precomputed_key or self.make_key(tool_name, target, params)
         
         try:
             if self.use_redis and self.redis_client:
@@ -242,8 +471,9 @@ class ScanResultCache:
                     logger.info(f"🗑️  Invalidated cache (Redis): {tool_name} on {target}")
                 return bool(deleted)
             else:
-                if key in self.memory_cache:
-                    del self.memory_cache[key]
+                with self._memory_lock:
+                    removed = self.memory_cache.pop(key, None)
+                if removed is not None:
                     logger.info(f"🗑️  Invalidated cache (Memory): {tool_name} on {target}")
                     return True
                 return False
@@ -266,32 +496,34 @@ class ScanResultCache:
         
         try:
             if self.use_redis and self.redis_client:
-                if pattern:
-                    # 使用模式匹配删除
-                    keys = self.redis_client.keys(pattern)
-                    if keys:
-                        count = self.redis_client.delete(*keys)
-                else:
-                    # 删除所有hexstrike缓存
-                    keys = self.redis_client.keys("hexstrike:scan:*")
-                    if keys:
-                        count = self.redis_client.delete(*keys)
+                # SCAN增量遍历（不阻塞Redis），分批UNLINK（后台释放内存）
+                batch = []
+                for key in self._scan_keys(pattern or _KEY_PATTERN):
+                    batch.append(key)
+                    if len(batch) >= self.UNLINK_BATCH:
+                        count += self.redis_client.unlink(*batch)
+                        batch = []
+                if batch:
+                    count += self.redis_client.unlink(*batch)
                 
                 logger.info(f"🗑️  Cleared {count} cache entries (Redis)")
             else:
                 # 清除内存缓存
-                if pattern:
-                    # 简单的模式匹配
-                    keys_to_delete = [
-                        k for k in self.memory_cache.keys()
-                        if pattern.replace('*', '') in k
-                    ]
-                    for key in keys_to_delete:
-                        del self.memory_cache[key]
-                    count = len(keys_to_delete)
-                else:
-                    count = len(self.memory_cache)
-                    self.memory_cache.clear()
+                with self._memory_lock:
+                    if pattern:
+                        # 简单的模式匹配
+                        needle = pattern.replace('*', '').encode()
+                        keys_to_delete = [
+                            k for k in self.memory_cache.keys()
+                            if needle in k
+                        ]
+                        for key in keys_to_delete:
+                            del self.memory_cache[key]
+                        count = len(keys_to_delete)
+                    else:
+                        count = len(self.memory_cache)
+                        self.memory_cache.clear()
+                        self._expiry_heap.clear()
                 
                 logger.info(f"🗑️  Cleared {count} cache entries (Memory)")
                 
@@ -300,6 +532,10 @@ class ScanResultCache:
         
         return count
     
+    def _scan_keys(self, pattern):
+        """用SCAN增量遍历匹配的Redis键（替代会阻塞服务端的KEYS）"""
+        return self.redis_client.scan_iter(match=pattern, count=self.SCAN_COUNT)
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         获取缓存统计信息
@@ -309,40 +545,35 @@ class ScanResultCache:
         """
         try:
             if self.use_redis and self.redis_client:
-                keys = self.redis_client.keys("hexstrike:scan:*")
-                
-                # 按工具分组统计
-                tool_counts = {}
-                for key in keys:
-                    # 解析工具名称
-                    parts = key.decode() if isinstance(key, bytes) else key
-                    parts = parts.split(':')
+                # 按工具分组统计：随SCAN流式计数，在bytes上切出工具名，仅在返回时解码
+                tool_counts = Counter()
+                total = 0
+                for key in self._scan_keys(_KEY_PATTERN):
+                    total += 1
+                    if isinstance(key, str):  # decode_responses=True 的客户端
+                        key = key.encode()
+                    parts = key.split(b':', 3)
                     if len(parts) >= 3:
-                        tool = parts[2]
-                        tool_counts[tool] = tool_counts.get(tool, 0) + 1
+                        tool_counts[parts[2]] += 1
                 
                 return {
                     'backend': 'redis',
-                    'total_entries': len(keys),
-                    'by_tool': tool_counts
+                    'total_entries': total,
+                    'by_tool': {tool.decode(): count for tool, count in tool_counts.items()}
                 }
             else:
                 # 内存缓存统计
-                tool_counts = {}
-                valid_entries = 0
-                now = time.time()
-                
-                for entry in self.memory_cache.values():
-                    if now < entry.expires_at:
-                        valid_entries += 1
-                        tool = entry.tool_name
-                        tool_counts[tool] = tool_counts.get(tool, 0) + 1
+                now = time.monotonic_ns()
+                tool_counts = Counter(
+                    entry.tool_name for entry in self.memory_cache.values()
+                    if now < entry.expires_at
+                )
                 
                 return {
                     'backend': 'memory',
                     'total_entries': len(self.memory_cache),
-                    'valid_entries': valid_entries,
-                    'by_tool': tool_counts
+                    'valid_entries': sum(tool_counts.values()),
+                    'by_tool': dict(tool_counts)
                 }
                 
         except Exception as e:
@@ -361,16 +592,18 @@ class ScanResultCache:
             return 0
         
         count = 0
-        now = time.time()
-        keys_to_delete = []
+        now = time.monotonic_ns()
         
-        for key, entry in self.memory_cache.items():
-            if now >= entry.expires_at:
-                keys_to_delete.append(key)
-        
-        for key in keys_to_delete:
-            del self.memory_cache[key]
-            count += 1
+        with self._memory_lock:
+            heap = self._expiry_heap
+            # 只弹出已到期的堆项，代价与实际过期数成正比
+            while heap and heap[0][0] <= now:
+                _, key = heapq.heappop(heap)
+                entry = self.memory_cache.get(key)
+                # 键可能已被覆盖为更晚的过期时间或已被移除
+                if entry and entry.expires_at <= now:
+                    del self.memory_cache[key]
+                    count += 1
         
         if count > 0:
             logger.info(f"🗑️  Cleaned up {count} expired cache entries")
@@ -378,6 +611,15 @@ class ScanResultCache:
         return count
 
 
+@lru_cache(maxsize=256)
+def _default_ttl(cache_cls, tool_name: str, scan_type: str) -> int:
+    """按 (缓存类, 工具, 扫描类型) 记忆默认TTL，写路径不再逐次查两层字典"""
+    return cache_cls.TOOL_TTL.get(
+        tool_name,
+        cache_cls.DEFAULT_TTL.get(scan_type, cache_cls.DEFAULT_TTL['default'])
+    )
+
+
 class CacheAwareExecutor:
     """支持缓存的工具执行器包装器"""
     
@@ -389,6 +631,9 @@ class CacheAwareExecutor:
             cache: 缓存管理器实例
         """
         self.cache = cache
+        # 进行中的执行（single-flight）：相同缓存键的并发未命中只执行一次
+        self._inflight: Dict[bytes, Future] = {}
+        self._inflight_lock = threading.Lock()
     
     def execute_with_cache(
         self,
@@ -413,28 +658,65 @@ class CacheAwareExecutor:
         Returns:
             Dict: 扫描结果
         """
+        # 缓存键只计算一次，查缓存、single-flight与写缓存共用
+        key = self.cache.make_key(tool_name, target, params)
+        
         # 如果不强制刷新，尝试从缓存获取
         if not force_refresh:
-            cached = self.cache.get(tool_name, target, params)
+            cached = self.cache.get(tool_name, target, params, precomputed_key=key)
             if cached:
-                return {
-                    **cached.get('result', {}),
-                    'from_cache': True,
-                    'cached_at': cached.get('cached_at')
-                }
+                return self._from_cache(cached)
         
-        # 执行工具
-        logger.info(f"🚀 Executing {tool_name} (cache miss or force refresh)")
-        result = executor_func(target, params)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
         
-        # 保存到缓存（仅当成功时）
-        if isinstance(result, dict) and result.get('success'):
-            self.cache.set(tool_name, target, params, result, scan_type=scan_type)
+        if not leader:
+            # 相同扫描正在执行，等待其结果
+            logger.info(f"⏳ Joining in-flight {tool_name} on {target}")
+            return {
+                **future.result(),
+                'from_cache': False
+            }
+        
+        try:
+            # 执行工具
+            logger.info(f"🚀 Executing {tool_name} (cache miss or force refresh)")
+            result = executor_func(target, params)
+            
+            # 保存到缓存（仅当成功时）；非强制刷新时不覆盖其他写入者期间存入的结果
+            # 回退到替代工具的结果不是该工具/参数的结果，不写入其缓存键
+            if isinstance(result, dict) and result.get('success') and not result.get('used_alternative'):
+                self.cache.set(
+                    tool_name, target, params, result,
+                    scan_type=scan_type,
+                    precomputed_key=key,
+                    if_not_exists=not force_refresh
+                )
+            
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
         
         return {
             **result,
             'from_cache': False
         }
+    
+    @staticmethod
+    def _from_cache(cached: Dict[str, Any]) -> Dict[str, Any]:
+        """缓存命中时的返回结构"""
+        return {
+            **cached.get('result', {}),
+            'from_cache': True,
+            'cached_at': cached.get('cached_at')
+        }
 
 
 # 尝试初始化Redis客户端
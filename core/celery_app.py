@@ -3,14 +3,36 @@
 HexStrike AI - Celery Application Configuration (v6.2)
 
 异步任务队列系统 - 支持长时间运行的扫描任务
+
+启动worker（-O fair：只把任务派给空闲的子进程，配合 prefetch=1 避免长任务阻塞队列）：
+    celery -A core.celery_app worker -Q default,scan,analysis,report,ai -O fair
+
+按队列分开部署时，长时间扫描不会阻塞分析/AI任务：
+    celery -A core.celery_app worker -Q scan -c 4 -O fair
+    celery -A core.celery_app worker -Q analysis,ai,report,default -O fair
 """
 
 import os
 import logging
+import importlib
 from celery import Celery
 from celery.schedules import crontab
 from kombu import Queue, Exchange
 
+from config.performance import PerformanceConfig
+
+try:
+    import msgpack  # noqa: F401
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard  # noqa: F401
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -29,6 +51,26 @@ CELERY_RESULT_BACKEND = os.getenv(
     os.getenv('REDIS_URL', 'redis://localhost:6379/2')
 )
 
+# 序列化格式（msgpack 体积更小、编解码更快；未安装时回退到json）
+TASK_SERIALIZER = PerformanceConfig.CELERY['serializer']
+if TASK_SERIALIZER == 'msgpack' and not MSGPACK_AVAILABLE:
+    logger.warning("⚠️  msgpack not installed, falling back to json task serialization")
+    TASK_SERIALIZER = 'json'
+
+# 接收两种格式，切换序列化格式时队列中的旧消息仍可处理
+ACCEPT_CONTENT = ['msgpack', 'json'] if MSGPACK_AVAILABLE else ['json']
+
+# 消息压缩（大体积扫描结果经broker/backend传输时节省带宽；未安装zstandard时回退到gzip）
+TASK_COMPRESSION = PerformanceConfig.COMPRESSION['task_compression']
+if TASK_COMPRESSION == 'none':
+    TASK_COMPRESSION = None
+elif TASK_COMPRESSION == 'zstd' and not ZSTD_AVAILABLE:
+    logger.warning("⚠️  zstandard not installed, falling back to gzip task compression")
+    TASK_COMPRESSION = 'gzip'
+
+# 小于该大小的任务参数不压缩
+TASK_COMPRESSION_MIN_SIZE = PerformanceConfig.COMPRESSION['min_size']
+
 # 创建Celery应用
 celery_app = Celery(
     'hexstrike',
@@ -47,19 +89,31 @@ celery_app = Celery(
 # ============================================================================
 
 celery_app.conf.update(
+    # Broker连接池（任务发布时复用连接与producer）
+    broker_pool_limit=PerformanceConfig.CELERY['broker_pool_limit'],
+    
+    # 启动时broker不可用则重试，避免首个任务时才重连
+    broker_connection_retry_on_startup=True,
+    
     # 任务结果设置
     result_expires=3600,  # 结果保存1小时
     result_backend_transport_options={'master_name': 'mymaster'},
     
     # 任务序列化
-    task_serializer='json',
-    result_serializer='json',
-    accept_content=['json'],
+    task_serializer=TASK_SERIALIZER,
+    result_serializer=TASK_SERIALIZER,
+    accept_content=ACCEPT_CONTENT,
+    result_accept_content=ACCEPT_CONTENT,
+    result_compression=TASK_COMPRESSION,
     timezone='UTC',
     enable_utc=True,
     
     # 任务路由
     task_routes={
+        # 扫描结果分析是轻量计算，走 analysis 队列，不与AI生成任务排队
+        'core.tasks.ai_tasks.analyze_scan_results': {'queue': 'analysis'},
+        'core.tasks.ai_tasks.analyze_scan_results_batch': {'queue': 'analysis'},
+        'core.tasks.ai_tasks.finalize_analysis': {'queue': 'analysis'},
         'core.tasks.scan_tasks.*': {'queue': 'scan'},
         'core.tasks.analysis_tasks.*': {'queue': 'analysis'},
         'core.tasks.report_tasks.*': {'queue': 'report'},
@@ -76,13 +130,13 @@ celery_app.conf.update(
     ),
     
     # Worker设置
-    worker_prefetch_multiplier=1,  # 每次只取1个任务
+    worker_prefetch_multiplier=PerformanceConfig.CELERY['prefetch_multiplier'],  # 默认每次只取1个任务
     worker_max_tasks_per_child=1000,  # 每个worker执行1000个任务后重启
     worker_disable_rate_limits=False,
     
     # 任务执行设置
-    task_acks_late=True,  # 任务完成后才确认
-    task_reject_on_worker_lost=True,  # worker丢失时拒绝任务
+    task_acks_late=PerformanceConfig.CELERY['acks_late'],  # 任务完成后才确认
+    task_reject_on_worker_lost=PerformanceConfig.CELERY['reject_on_worker_lost'],  # worker丢失时拒绝任务
     task_time_limit=3600,  # 任务超时1小时
     task_soft_time_limit=3300,  # 软超时55分钟
     
@@ -142,9 +196,31 @@ celery_app.conf.beat_schedule = {
 
 from celery.signals import (
     task_prerun, task_postrun, task_failure,
-    task_success, worker_ready, worker_shutdown
+    task_success, worker_ready, worker_shutdown,
+    worker_process_init
 )
 
+# 懒加载模块名 -> 实际导入名
+PRELOAD_IMPORT_NAMES = {'pwntools': 'pwn'}
+
+
+@worker_process_init.connect
+def worker_process_init_handler(**extra):
+    """Worker子进程启动后注入智能扫描依赖并预导入重量级模块（开销按进程生命周期摊销，而非落在首个任务上）"""
+    try:
+        from core.tasks.scan_tasks import init_smart_scan
+        init_smart_scan()
+    except Exception as e:
+        logger.warning(f"⚠️  Smart scan init failed, retrying on first task: {e}")
+    
+    if not PerformanceConfig.LAZY_LOADING['enabled']:
+        return
+    for name in PerformanceConfig.LAZY_LOADING['modules']:
+        try:
+            importlib.import_module(PRELOAD_IMPORT_NAMES.get(name, name))
+        except Exception as e:
+            logger.debug(f"Preload of {name} skipped: {e}")
+
 
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **extra):
@@ -239,6 +315,32 @@ def get_queue_length(queue_name='default'):
         return 0
 
 
+def get_queue_lengths(queue_names):
+    """批量获取队列长度（Redis broker 用一个pipeline完成，只需一次往返）"""
+    try:
+        with celery_app.connection_or_acquire() as conn:
+            if conn.transport.driver_type == 'redis':
+                channel = conn.default_channel
+                steps = channel.priority_steps
+                with channel.conn_or_acquire() as client:
+                    with client.pipeline(transaction=False) as pipe:
+                        for name in queue_names:
+                            for pri in steps:
+                                pipe.llen(channel._q_for_pri(name, pri))
+                        sizes = pipe.execute()
+                n = len(steps)
+                return {
+                    name: sum(sizes[i * n:(i + 1) * n])
+                    for i, name in enumerate(queue_names)
+                }
+    except Exception as e:
+        logger.error(f"Failed to get queue lengths: {e}")
+        return {name: 0 for name in queue_names}
+    
+    # 其他broker逐个查询
+    return {name: get_queue_length(name) for name in queue_names}
+
+
 if __name__ == '__main__':
     # 测试Celery连接
     print("Testing Celery connection...")
@@ -86,8 +86,10 @@ class EnhancedCommandExecutor:
         self.command = command
         self.timeout = timeout
         self.process = None
-        self.stdout_data = ""
-        self.stderr_data = ""
+        # 输出按行收集，结束时一次拼接（避免逐行 += 反复复制整段输出）
+        self._stdout_chunks = []
+        self._stderr_chunks = []
+        self._output_size = 0
         self.stdout_thread = None
         self.stderr_thread = None
         self.return_code = None
@@ -96,12 +98,23 @@ class EnhancedCommandExecutor:
         self.end_time = None
         self.telemetry = TelemetryCollector()
 
+    @property
+    def stdout_data(self) -> str:
+        """已读取的标准输出"""
+        return ''.join(self._stdout_chunks)
+
+    @property
+    def stderr_data(self) -> str:
+        """已读取的标准错误输出"""
+        return ''.join(self._stderr_chunks)
+
     def _read_stdout(self):
         """Thread function to continuously read and display stdout"""
         try:
             for line in iter(self.process.stdout.readline, ''):
                 if line:
-                    self.stdout_data += line
+                    self._stdout_chunks.append(line)
+                    self._output_size += len(line)
                     # Real-time output display
                     logger.info(f"📤 STDOUT: {line.strip()}")
         except Exception as e:
@@ -112,7 +125,8 @@ class EnhancedCommandExecutor:
         try:
             for line in iter(self.process.stderr.readline, ''):
                 if line:
-                    self.stderr_data += line
+                    self._stderr_chunks.append(line)
+                    self._output_size += len(line)
                     # Real-time error output display
                     logger.warning(f"📥 STDERR: {line.strip()}")
         except Exception as e:
@@ -138,7 +152,7 @@ class EnhancedCommandExecutor:
                     eta = ((elapsed / progress_percent) * 100) - elapsed
 
                 # Calculate speed
-                bytes_processed = len(self.stdout_data) + len(self.stderr_data)
+                bytes_processed = self._output_size
                 speed = f"{bytes_processed/elapsed:.0f} B/s" if elapsed > 0 else "0 B/s"
 
                 # Update process manager with progress
@@ -242,11 +256,14 @@ class EnhancedCommandExecutor:
                 self.return_code = -1
                 self.telemetry.record_execution(False, execution_time)
 
+            stdout_data = self.stdout_data
+            stderr_data = self.stderr_data
+
             # Always consider it a success if we have output, even with timeout
-            success = True if self.timed_out and (self.stdout_data or self.stderr_data) else (self.return_code == 0)
+            success = True if self.timed_out and (stdout_data or stderr_data) else (self.return_code == 0)
 
             # Log enhanced final results with summary using ModernVisualEngine
-            output_size = len(self.stdout_data) + len(self.stderr_data)
+            output_size = len(stdout_data) + len(stderr_data)
             execution_time = self.end_time - self.start_time if self.end_time else 0
 
             # Create status summary
@@ -273,12 +290,12 @@ class EnhancedCommandExecutor:
                     logger.info(line)
 
             return {
-                "stdout": self.stdout_data,
-                "stderr": self.stderr_data,
+                "stdout": stdout_data,
+                "stderr": stderr_data,
                 "return_code": self.return_code,
                 "success": success,
                 "timed_out": self.timed_out,
-                "partial_results": self.timed_out and (self.stdout_data or self.stderr_data),
+                "partial_results": self.timed_out and (stdout_data or stderr_data),
                 "execution_time": self.end_time - self.start_time if self.end_time else 0,
                 "timestamp": datetime.now().isoformat()
             }
@@ -291,13 +308,16 @@ class EnhancedCommandExecutor:
             logger.error(f"🔍 TRACEBACK: {traceback.format_exc()}")
             self.telemetry.record_execution(False, execution_time)
 
+            stdout_data = self.stdout_data
+            stderr_data = self.stderr_data
+
             return {
-                "stdout": self.stdout_data,
-                "stderr": f"Error executing command: {str(e)}\n{self.stderr_data}",
+                "stdout": stdout_data,
+                "stderr": f"Error executing command: {str(e)}\n{stderr_data}",
                 "return_code": -1,
                 "success": False,
                 "timed_out": False,
-                "partial_results": bool(self.stdout_data or self.stderr_data),
+                "partial_results": bool(stdout_data or stderr_data),
                 "execution_time": execution_time,
                 "timestamp": datetime.now().isoformat()
             }
@@ -4,6 +4,7 @@
 """
 
 import logging
+import random
 import time
 from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass
@@ -144,6 +145,12 @@ class ErrorDiagnostics:
         ],
     }
     
+    # 按返回码直接判定的错误（shell约定：126 无执行权限，127 命令不存在）
+    RETURNCODE_ERRORS = {
+        126: ErrorType.PERMISSION_DENIED,
+        127: ErrorType.TOOL_NOT_FOUND,
+    }
+    
     @classmethod
     def diagnose_error(
         cls, 
@@ -162,6 +169,9 @@ class ErrorDiagnostics:
         Returns:
             ErrorType: 错误类型
         """
+        if returncode in cls.RETURNCODE_ERRORS:
+            return cls.RETURNCODE_ERRORS[returncode]
+        
         combined_text = f"{error_message} {stderr}".lower()
         
         for error_type, patterns in cls.ERROR_PATTERNS.items():
@@ -227,32 +237,70 @@ class ErrorDiagnostics:
 class ResilientExecutor:
     """弹性工具执行器 - 支持重试和回退"""
     
+    # 不可恢复的错误：重试不会改变结果，直接进入回退
+    NON_RETRYABLE_ERRORS = frozenset({
+        ErrorType.TOOL_NOT_FOUND,
+        ErrorType.INVALID_TARGET,
+        ErrorType.PERMISSION_DENIED,
+    })
+    
     def __init__(
         self,
         max_retries: int = 2,
-        retry_delay: int = 2,
-        enable_fallback: bool = True
+        retry_delay: float = 1,
+        enable_fallback: bool = True,
+        max_delay: float = 30,
+        jitter: float = 0.5
     ):
         """
         初始化弹性执行器
         
         Args:
             max_retries: 最大重试次数
-            retry_delay: 重试延迟（秒）
+            retry_delay: 首次重试的基础延迟（秒），之后按指数增长
             enable_fallback: 是否启用工具回退
+            max_delay: 单次重试延迟上限（秒）
+            jitter: 随机抖动比例，实际延迟为 delay * (1 + uniform(0, jitter))
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.enable_fallback = enable_fallback
+        self.max_delay = max_delay
+        self.jitter = jitter
         self.execution_history = []
     
+    def backoff_delay(
+        self,
+        attempt: int,
+        base: Optional[float] = None,
+        jitter: Optional[float] = None
+    ) -> float:
+        """
+        计算第 attempt 次重试（从1开始）的等待时间：指数退避 + 随机抖动
+        
+        Args:
+            attempt: 重试序号
+            base: 基础延迟（默认使用实例配置）
+            jitter: 抖动比例（默认使用实例配置）
+            
+        Returns:
+            float: 等待秒数
+        """
+        base = self.retry_delay if base is None else base
+        jitter = self.jitter if jitter is None else jitter
+        delay = min(self.max_delay, base * 2 ** (attempt - 1))
+        return delay * (1 + random.uniform(0, jitter))
+    
     def execute_with_resilience(
         self,
         tool_name: str,
         target: str,
         params: Dict[str, Any],
         executor_func: Callable,
-        tool_executors: Dict[str, Callable]
+        tool_executors: Dict[str, Callable],
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+        jitter: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         弹性执行：支持重试和工具回退
@@ -263,17 +311,21 @@ class ResilientExecutor:
             params: 参数
             executor_func: 执行函数
             tool_executors: 所有工具执行器（用于回退）
+            max_retries: 覆盖实例的最大重试次数
+            retry_delay: 覆盖实例的基础重试延迟
+            jitter: 覆盖实例的抖动比例
             
         Returns:
             Dict: 执行结果
         """
+        max_retries = self.max_retries if max_retries is None else max_retries
         retry_count = 0
         last_error = None
         
         # 首先尝试主工具
-        while retry_count <= self.max_retries:
+        while retry_count <= max_retries:
             try:
-                logger.info(f"🔧 Executing {tool_name} (attempt {retry_count + 1}/{self.max_retries + 1})")
+                logger.info(f"🔧 Executing {tool_name} (attempt {retry_count + 1}/{max_retries + 1})")
                 
                 result = executor_func(target, params)
                 
@@ -304,15 +356,16 @@ class ResilientExecutor:
                 last_error = error_context
                 
                 # 某些错误不值得重试
-                if error_type in [ErrorType.TOOL_NOT_FOUND, ErrorType.INVALID_TARGET]:
+                if error_type in self.NON_RETRYABLE_ERRORS:
                     logger.warning(f"⚠️  {tool_name} failed with non-retryable error: {error_type.value}")
                     break
                 
                 retry_count += 1
                 
-                if retry_count <= self.max_retries:
-                    logger.warning(f"⚠️  {tool_name} failed, retrying in {self.retry_delay}s...")
-                    time.sleep(self.retry_delay)
+                if retry_count <= max_retries:
+                    delay = self.backoff_delay(retry_count, retry_delay, jitter)
+                    logger.warning(f"⚠️  {tool_name} failed, retrying in {delay:.1f}s...")
+                    time.sleep(delay)
                 
             except Exception as e:
                 logger.error(f"❌ {tool_name} raised exception: {str(e)}")
@@ -330,8 +383,8 @@ class ResilientExecutor:
                 last_error = error_context
                 retry_count += 1
                 
-                if retry_count <= self.max_retries:
-                    time.sleep(self.retry_delay)
+                if retry_count <= max_retries:
+                    time.sleep(self.backoff_delay(retry_count, retry_delay, jitter))
         
         # 主工具失败，尝试回退
         if self.enable_fallback and last_error:
@@ -451,6 +504,8 @@ class ResilientExecutor:
 # 全局实例
 resilient_executor = ResilientExecutor(
     max_retries=2,
-    retry_delay=2,
-    enable_fallback=True
+    retry_delay=1,
+    enable_fallback=True,
+    max_delay=30,
+    jitter=0.5
 )
@@ -3,10 +3,13 @@
 支持多工具并行执行，提高扫描效率
 """
 
+import asyncio
+import inspect
 import logging
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
-from typing import Dict, List, Any, Optional, Callable
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, List, Any, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -33,6 +36,7 @@ class ScanResult:
     execution_time: float
     error: Optional[str] = None
     timed_out: bool = False
+    aborted: bool = False  # 因提前终止（如熔断）未执行完
 
 
 class ParallelScanner:
@@ -90,32 +94,63 @@ class ParallelScanner:
             # 执行工具
             result = executor_func(task.target, task.params)
             
-            execution_time = time.time() - start_time
+            return self._make_result(task, result, time.time() - start_time)
             
-            # 检查是否成功
-            success = result.get('success', False) if isinstance(result, dict) else False
+        except Exception as e:
+            return self._error_result(task, e, time.time() - start_time)
+    
+    async def execute_single_task_async(
+        self,
+        task: ScanTask,
+        executor_func: Callable
+    ) -> ScanResult:
+        """
+        执行单个扫描任务（异步执行器，如基于 asyncio.create_subprocess_exec 的工具）
+        
+        Args:
+            task: 扫描任务
+            executor_func: 异步工具执行函数 async (target, params) -> dict
             
-            return ScanResult(
-                tool_name=task.tool_name,
-                target=task.target,
-                success=success,
-                result=result,
-                execution_time=execution_time,
-                timed_out=result.get('timed_out', False) if isinstance(result, dict) else False
-            )
+        Returns:
+            ScanResult: 扫描结果
+        """
+        start_time = time.time()
+        
+        try:
+            logger.info(f"🔧 Executing {task.tool_name} on {task.target}")
+            result = await executor_func(task.target, task.params)
+            return self._make_result(task, result, time.time() - start_time)
             
         except Exception as e:
-            execution_time = time.time() - start_time
-            logger.error(f"❌ {task.tool_name} failed: {str(e)}")
-            
-            return ScanResult(
-                tool_name=task.tool_name,
-                target=task.target,
-                success=False,
-                result={},
-                execution_time=execution_time,
-                error=str(e)
-            )
+            return self._error_result(task, e, time.time() - start_time)
+    
+    @staticmethod
+    def _make_result(task: ScanTask, result: Any, execution_time: float) -> ScanResult:
+        """由执行器返回值构造扫描结果"""
+        is_dict = isinstance(result, dict)
+        
+        return ScanResult(
+            tool_name=task.tool_name,
+            target=task.target,
+            success=result.get('success', False) if is_dict else False,
+            result=result,
+            execution_time=execution_time,
+            timed_out=result.get('timed_out', False) if is_dict else False
+        )
+    
+    @staticmethod
+    def _error_result(task: ScanTask, error: Exception, execution_time: float) -> ScanResult:
+        """构造执行器抛出异常时的扫描结果"""
+        logger.error(f"❌ {task.tool_name} failed: {str(error)}")
+        
+        return ScanResult(
+            tool_name=task.tool_name,
+            target=task.target,
+            success=False,
+            result={},
+            execution_time=execution_time,
+            error=str(error)
+        )
     
     def execute_parallel(
         self, 
@@ -227,9 +262,8 @@ class ParallelScanner:
                     completed_tasks += 1
         
         # 生成执行摘要
-        successful = sum(1 for r in results.values() if r.success)
+        successful, total_time = self._summarize(results)
         failed = len(results) - successful
-        total_time = sum(r.execution_time for r in results.values())
         
         logger.info(f"""
 ┌────────────────────────────────────────────┐
@@ -245,6 +279,229 @@ class ParallelScanner:
         
         return results
     
+    async def execute_parallel_async(
+        self,
+        tasks: List[ScanTask],
+        tool_executors: Dict[str, Callable],
+        progress_callback: Optional[Callable] = None,
+        abort_check: Optional[Callable[[Optional[ScanResult]], bool]] = None
+    ) -> Dict[str, ScanResult]:
+        """
+        在事件循环上并行执行多个扫描任务（asyncio.gather）
+        
+        并发数由 asyncio.Semaphore(max_workers) 限制，任务取得名额后才开始计时。
+        异步执行器（协程函数）直接在事件循环上运行，不占用线程；同步执行器
+        放到线程池中运行。与 execute_parallel 不同，每个任务的超时由
+        asyncio.wait_for 真正生效，超时任务不会阻塞整体返回。
+        
+        Args:
+            tasks: 扫描任务列表
+            tool_executors: 工具执行器字典 {tool_name: executor_func}
+            progress_callback: 进度回调函数(completed, total, current_tool)
+            abort_check: 开始前以 None、每个任务完成后以其结果调用；返回True时
+                取消其余任务，未完成的任务以 aborted 结果返回
+            
+        Returns:
+            Dict[str, ScanResult]: 工具名称到扫描结果的映射
+        """
+        if not tasks:
+            logger.warning("⚠️  No tasks to execute")
+            return {}
+        
+        sorted_tasks = sorted(tasks, key=lambda t: t.priority, reverse=True)
+        total_tasks = len(sorted_tasks)
+        results = {}
+        completed = 0
+        aborted = abort_check is not None and abort_check(None)
+        running = []
+        
+        logger.info(f"🚀 Starting async parallel execution of {total_tasks} tasks")
+        
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(self.max_workers)
+        # 并发由信号量限制；线程池按任务数设上限，超时任务遗留的线程不会挤占后续任务
+        pool = ThreadPoolExecutor(max_workers=total_tasks)
+        
+        async def run_task(task: ScanTask, executor_func: Callable):
+            nonlocal completed
+            async with sem:
+                if inspect.iscoroutinefunction(executor_func):
+                    run = self.execute_single_task_async(task, executor_func)
+                else:
+                    run = loop.run_in_executor(pool, self.execute_single_task, task, executor_func)
+                
+                try:
+                    result = await asyncio.wait_for(run, timeout=task.timeout)
+                except asyncio.TimeoutError:
+                    result = self._timeout_result(task)
+            
+            results[task.tool_name] = result
+            completed += 1
+            
+            if progress_callback and not result.timed_out:
+                progress_callback(completed, total_tasks, task.tool_name)
+            
+            if abort_check is not None and not aborted and abort_check(result):
+                abort_remaining()
+        
+        def abort_remaining():
+            nonlocal aborted
+            aborted = True
+            logger.warning(f"⛔ Aborting remaining scan tasks ({completed}/{total_tasks} completed)")
+            current = asyncio.current_task()
+            for fut in running:
+                if fut is not current:
+                    fut.cancel()
+        
+        try:
+            for task in sorted_tasks:
+                if aborted:
+                    break
+                
+                executor_func = tool_executors.get(task.tool_name)
+                
+                if not executor_func:
+                    logger.error(f"❌ No executor found for {task.tool_name}")
+                    results[task.tool_name] = ScanResult(
+                        tool_name=task.tool_name,
+                        target=task.target,
+                        success=False,
+                        result={},
+                        execution_time=0,
+                        error=f"No executor found for {task.tool_name}"
+                    )
+                    continue
+                
+                running.append(asyncio.ensure_future(run_task(task, executor_func)))
+            
+            outcomes = await asyncio.gather(*running, return_exceptions=True)
+            for outcome in outcomes:
+                # 被取消的任务返回 CancelledError（BaseException），其余异常照常抛出
+                if isinstance(outcome, Exception):
+                    raise outcome
+        finally:
+            # 超时/取消任务的线程无法强制终止，不等待其结束
+            pool.shutdown(wait=False)
+        
+        if aborted:
+            for task in sorted_tasks:
+                if task.tool_name not in results:
+                    results[task.tool_name] = self._aborted_result(task)
+        
+        successful, total_time = self._summarize(results)
+        logger.info(
+            f"🎯 Async parallel scan finished: {successful}/{total_tasks} successful, "
+            f"{total_time:.2f}s total"
+        )
+        
+        return results
+    
+    def iter_parallel(
+        self,
+        tasks: List[ScanTask],
+        tool_executors: Dict[str, Callable]
+    ) -> Iterator[ScanResult]:
+        """
+        并行执行多个扫描任务，按完成顺序逐个产出结果
+        
+        适合流式返回：调用方拿到一个结果即可处理/发送，无需等待所有任务结束。
+        同时进行的任务不超过 max_workers，有名额时才提交，因此超时从任务真正开始
+        执行时计算；超时任务产出 timed_out 结果并让出名额（其线程无法强制终止，
+        线程池按任务数设上限，遗留线程不会挤占后续任务）。
+        
+        Args:
+            tasks: 扫描任务列表
+            tool_executors: 工具执行器字典 {tool_name: executor_func}
+            
+        Yields:
+            ScanResult: 每个任务的扫描结果
+        """
+        todo = deque(sorted(tasks, key=lambda t: t.priority, reverse=True))
+        pool = ThreadPoolExecutor(max_workers=max(1, len(todo)))
+        pending = {}
+        
+        try:
+            while todo or pending:
+                while todo and len(pending) < self.max_workers:
+                    task = todo.popleft()
+                    executor_func = tool_executors.get(task.tool_name)
+                    
+                    if not executor_func:
+                        logger.error(f"❌ No executor found for {task.tool_name}")
+                        yield ScanResult(
+                            tool_name=task.tool_name,
+                            target=task.target,
+                            success=False,
+                            result={},
+                            execution_time=0,
+                            error=f"No executor found for {task.tool_name}"
+                        )
+                        continue
+                    
+                    future = pool.submit(self.execute_single_task, task, executor_func)
+                    pending[future] = (task, time.monotonic() + task.timeout)
+                
+                if not pending:
+                    break
+                
+                nearest_deadline = min(deadline for _, deadline in pending.values())
+                done, _ = wait(
+                    pending,
+                    timeout=max(0.0, nearest_deadline - time.monotonic()),
+                    return_when=FIRST_COMPLETED
+                )
+                
+                for future in done:
+                    pending.pop(future)
+                    yield future.result()
+                
+                now = time.monotonic()
+                for future, (task, deadline) in list(pending.items()):
+                    if deadline <= now:
+                        pending.pop(future)
+                        future.cancel()
+                        yield self._timeout_result(task)
+        finally:
+            # 调用方提前结束（如客户端断开）或有任务超时时，不等待剩余线程
+            pool.shutdown(wait=False)
+    
+    @staticmethod
+    def _summarize(results: Dict[str, ScanResult]) -> Tuple[int, float]:
+        """单次遍历统计成功数与总耗时"""
+        successful = 0
+        total_time = 0.0
+        for r in results.values():
+            total_time += r.execution_time
+            if r.success:
+                successful += 1
+        return successful, total_time
+    
+    def _timeout_result(self, task: ScanTask) -> ScanResult:
+        """构造任务超时的扫描结果"""
+        logger.error(f"⏱️  {task.tool_name} timed out after {task.timeout}s")
+        return ScanResult(
+            tool_name=task.tool_name,
+            target=task.target,
+            success=False,
+            result={},
+            execution_time=task.timeout,
+            error=f"Timeout after {task.timeout}s",
+            timed_out=True
+        )
+    
+    @staticmethod
+    def _aborted_result(task: ScanTask) -> ScanResult:
+        """构造被提前终止任务的扫描结果"""
+        return ScanResult(
+            tool_name=task.tool_name,
+            target=task.target,
+            success=False,
+            result={},
+            execution_time=0,
+            error="Aborted before completion",
+            aborted=True
+        )
+    
     def get_default_timeout(self, tool_name: str) -> int:
         """
         获取工具的默认超时时间
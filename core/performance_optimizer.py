@@ -341,6 +341,11 @@ class CircuitBreaker:
                 self.state = self.State.OPEN
                 logger.warning(f"Circuit breaker opened after {self.failure_count} failures")
     
+    def is_open(self) -> bool:
+        """是否处于熔断中（OPEN 且尚未到恢复时间）"""
+        with self._lock:
+            return self.state == self.State.OPEN and not self._should_attempt_reset()
+    
     def get_state(self) -> str:
         """获取当前状态"""
         with self._lock:
@@ -485,6 +490,9 @@ class RedisCache:
 class AdaptiveWorkerPool:
     """自适应工作池（根据负载动态调整）"""
     
+    # 已达上限且在途任务占比超过该值时告警（池容量不足）
+    SATURATION_WARN_RATIO = 0.9
+    
     def __init__(self, min_workers: int = 2, max_workers: int = None, 
                  worker_type: str = 'thread'):
         self.min_workers = min_workers
@@ -506,6 +514,7 @@ class AdaptiveWorkerPool:
             'workers': self.current_workers
         }
         self._lock = threading.Lock()
+        self._saturation_warned = False
         
         # 启动监控线程
         self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
@@ -552,6 +561,15 @@ class AdaptiveWorkerPool:
                 new_workers = max(self.current_workers - 1, self.min_workers)
                 logger.info(f"Decreasing workers from {self.current_workers} to {new_workers}")
                 self.current_workers = new_workers
+            
+            saturated = (self.current_workers >= self.max_workers and
+                         queue_size > self.max_workers * self.SATURATION_WARN_RATIO)
+            if saturated and not self._saturation_warned:
+                logger.warning(
+                    f"⚠️  Worker pool saturated ({queue_size} in flight, max_workers={self.max_workers}); "
+                    f"consider raising MAX_WORKERS or WORKLOAD_PROFILE=io"
+                )
+            self._saturation_warned = saturated
     
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
@@ -9,7 +9,7 @@ import logging
 import json
 import re
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from celery import Task
 
 from core.celery_app import celery_app
@@ -62,60 +62,9 @@ def analyze_scan_results(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
         
         analysis = {
             'task_id': self.request.id,
-            'scan_id': scan_results.get('task_id'),
-            'timestamp': datetime.now().isoformat(),
-            'severity_distribution': {},
-            'critical_findings': [],
-            'recommendations': [],
-            'attack_surface': {},
-            'risk_score': 0
+            **build_scan_analysis(scan_results, self.update_progress)
         }
         
-        # 1. 提取漏洞信息
-        self.update_progress(20, 100, 'Extracting vulnerability data...')
-        vulnerabilities = scan_results.get('vulnerabilities', [])
-        
-        # 统计严重程度分布
-        severity_count = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 0}
-        for vuln in vulnerabilities:
-            severity = vuln.get('severity', 'info').lower()
-            severity_count[severity] = severity_count.get(severity, 0) + 1
-        
-        analysis['severity_distribution'] = severity_count
-        
-        # 2. 识别关键发现
-        self.update_progress(40, 100, 'Identifying critical findings...')
-        for vuln in vulnerabilities:
-            if vuln.get('severity', '').lower() in ['critical', 'high']:
-                analysis['critical_findings'].append({
-                    'title': vuln.get('info', {}).get('name', 'Unknown'),
-                    'severity': vuln.get('severity'),
-                    'cve': vuln.get('info', {}).get('cve', []),
-                    'description': vuln.get('info', {}).get('description', ''),
-                    'matched_at': vuln.get('matched-at', ''),
-                    'cvss_score': vuln.get('info', {}).get('cvss-score', 0)
-                })
-        
-        # 3. 生成攻击面分析
-        self.update_progress(60, 100, 'Analyzing attack surface...')
-        analysis['attack_surface'] = analyze_attack_surface(scan_results)
-        
-        # 4. 计算风险评分
-        self.update_progress(80, 100, 'Calculating risk score...')
-        risk_score = (
-            severity_count['critical'] * 10 +
-            severity_count['high'] * 7 +
-            severity_count['medium'] * 4 +
-            severity_count['low'] * 2 +
-            severity_count['info'] * 0.5
-        )
-        analysis['risk_score'] = min(100, risk_score)
-        analysis['risk_level'] = get_risk_level(analysis['risk_score'])
-        
-        # 5. 生成修复建议
-        self.update_progress(90, 100, 'Generating recommendations...')
-        analysis['recommendations'] = generate_recommendations(analysis)
-        
         self.update_progress(100, 100, 'Analysis completed')
         
         return analysis
@@ -125,6 +74,59 @@ def analyze_scan_results(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
         raise self.retry(exc=e)
 
 
+@celery_app.task(
+    base=BaseAITask,
+    bind=True,
+    name='core.tasks.ai_tasks.analyze_scan_results_batch',
+    max_retries=2
+)
+def analyze_scan_results_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    批量分析扫描结果
+    
+    一个任务依次处理多份扫描结果，分摊任务调度和结果存储的开销；
+    单份结果分析失败只记录该项错误，不影响其余项
+    """
+    total = len(batch)
+    results = []
+    
+    for index, scan_results in enumerate(batch):
+        self.update_progress(index, total, f'Analyzing scan result {index + 1}/{total}...')
+        try:
+            results.append(build_scan_analysis(scan_results))
+        except Exception as e:
+            logger.error(f"AI analysis failed for batch item {index}: {e}")
+            results.append({'error': str(e)})
+    
+    self.update_progress(total, total, 'Batch analysis completed')
+    
+    return {
+        'task_id': self.request.id,
+        'count': total,
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+@celery_app.task(
+    base=BaseAITask,
+    bind=True,
+    name='core.tasks.ai_tasks.finalize_analysis'
+)
+def finalize_analysis(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    汇总分析结果
+    
+    作为chord回调，合并流式提交时逐项分析的结果，返回结构与批量分析一致
+    """
+    return {
+        'task_id': self.request.id,
+        'count': len(analyses),
+        'results': analyses,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
 @celery_app.task(
     base=BaseAITask,
     bind=True,
@@ -435,6 +437,78 @@ def generate_intelligent_payloads(self, context: Dict[str, Any]) -> Dict[str, An
 # HELPER FUNCTIONS
 # ============================================================================
 
+def build_scan_analysis(scan_results: Dict[str, Any], progress: Optional[Callable] = None) -> Dict[str, Any]:
+    """
+    分析单份扫描结果（不含任务ID）
+    
+    Args:
+        scan_results: 扫描结果
+        progress: 进度回调(current, total, message)，可选
+    """
+    progress = progress or _no_progress
+    
+    analysis = {
+        'scan_id': scan_results.get('task_id'),
+        'timestamp': datetime.now().isoformat(),
+        'severity_distribution': {},
+        'critical_findings': [],
+        'recommendations': [],
+        'attack_surface': {},
+        'risk_score': 0
+    }
+    
+    # 1. 提取漏洞信息
+    progress(20, 100, 'Extracting vulnerability data...')
+    vulnerabilities = scan_results.get('vulnerabilities', [])
+    
+    # 统计严重程度分布
+    severity_count = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 0}
+    for vuln in vulnerabilities:
+        severity = vuln.get('severity', 'info').lower()
+        severity_count[severity] = severity_count.get(severity, 0) + 1
+    
+    analysis['severity_distribution'] = severity_count
+    
+    # 2. 识别关键发现
+    progress(40, 100, 'Identifying critical findings...')
+    for vuln in vulnerabilities:
+        if vuln.get('severity', '').lower() in ['critical', 'high']:
+            analysis['critical_findings'].append({
+                'title': vuln.get('info', {}).get('name', 'Unknown'),
+                'severity': vuln.get('severity'),
+                'cve': vuln.get('info', {}).get('cve', []),
+                'description': vuln.get('info', {}).get('description', ''),
+                'matched_at': vuln.get('matched-at', ''),
+                'cvss_score': vuln.get('info', {}).get('cvss-score', 0)
+            })
+    
+    # 3. 生成攻击面分析
+    progress(60, 100, 'Analyzing attack surface...')
+    analysis['attack_surface'] = analyze_attack_surface(scan_results)
+    
+    # 4. 计算风险评分
+    progress(80, 100, 'Calculating risk score...')
+    risk_score = (
+        severity_count['critical'] * 10 +
+        severity_count['high'] * 7 +
+        severity_count['medium'] * 4 +
+        severity_count['low'] * 2 +
+        severity_count['info'] * 0.5
+    )
+    analysis['risk_score'] = min(100, risk_score)
+    analysis['risk_level'] = get_risk_level(analysis['risk_score'])
+    
+    # 5. 生成修复建议
+    progress(90, 100, 'Generating recommendations...')
+    analysis['recommendations'] = generate_recommendations(analysis)
+    
+    return analysis
+
+
+def _no_progress(current, total, message=''):
+    """空进度回调"""
+
+
 def analyze_attack_surface(scan_results: Dict[str, Any]) -> Dict[str, Any]:
     """分析攻击面"""
     attack_surface = {
@@ -426,3 +426,66 @@ def run_xss_scan(self, url: str, options: Dict[str, Any] = None) -> Dict[str, An
     except Exception as e:
         logger.error(f"XSS scan failed: {e}")
         raise self.retry(exc=e)
+
+
+# ============================================================================
+# SMART SCAN TASKS
+# ============================================================================
+
+def init_smart_scan():
+    """
+    为增强智能扫描注入决策引擎、工具执行器和熔断器（已注入时跳过）
+    
+    由worker_process_init在子进程启动时调用；solo/线程池等不触发该信号的
+    worker在首个任务时调用。只构建扫描所需的依赖，不导入Web服务模块。
+    """
+    from api.routes import intelligence_enhanced
+    if intelligence_enhanced.decision_engine is not None:
+        return
+    
+    from agents.decision_engine import IntelligentDecisionEngine
+    from config.performance import PerformanceConfig
+    from core.performance_optimizer import CircuitBreaker, CircuitBreakerConfig
+    from core.tool_factory import build_tool_executors
+    
+    intelligence_enhanced.init_app(
+        IntelligentDecisionEngine(),
+        build_tool_executors(execute_command),
+        CircuitBreaker(CircuitBreakerConfig(**PerformanceConfig.CIRCUIT_BREAKER))
+    )
+    logger.info("✅ Smart scan dependencies initialized in worker")
+
+
+@celery_app.task(
+    base=BaseScanTask,
+    bind=True,
+    name='core.tasks.scan_tasks.run_smart_scan'
+)
+def run_smart_scan(self, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    异步执行增强智能扫描（/api/intelligence/v2/smart-scan-enhanced 的后台版本）
+    
+    Args:
+        options: 已规范化的扫描选项（target、objective、max_tools 等）
+        
+    Returns:
+        与同步接口相同的扫描响应数据
+    """
+    try:
+        self.update_progress(0, 100, 'Starting smart scan...')
+        
+        from api.routes import intelligence_enhanced
+        init_smart_scan()
+        
+        payload, _ = intelligence_enhanced.execute_smart_scan(options)
+        
+        self.update_progress(100, 100, 'Smart scan completed')
+        
+        return {
+            'task_id': self.request.id,
+            **payload
+        }
+        
+    except Exception as e:
+        logger.error(f"Smart scan failed: {e}")
+        raise
@@ -5,9 +5,84 @@ This module provides factory functions for creating tool executors.
 
 Functions:
     - create_tool_executor: Factory function to create tool executor from tool class
+    - build_tool_executors: Build the tool name -> executor mapping used by the intelligence engine
 """
 
-from typing import Dict, Any
+from typing import Callable, Dict, Any
+
+from tools.network.nmap import NmapTool
+from tools.network.httpx import HttpxTool
+from tools.network.masscan import MasscanTool
+from tools.network.dnsenum import DNSEnumTool
+from tools.network.fierce import FierceTool
+from tools.network.dnsx import DNSxTool
+from tools.web.nuclei import NucleiTool
+from tools.web.gobuster import GobusterTool
+from tools.web.sqlmap import SQLMapTool
+from tools.web.nikto import NiktoTool
+from tools.web.feroxbuster import FeroxbusterTool
+from tools.web.ffuf import FfufTool
+from tools.web.katana import KatanaTool
+from tools.web.wpscan import WpscanTool
+from tools.web.arjun import ArjunTool
+from tools.web.dalfox import DalfoxTool
+from tools.web.whatweb import WhatwebTool
+from tools.web.dirsearch import DirsearchTool
+from tools.web.paramspider import ParamSpiderTool
+from tools.web.x8 import X8Tool
+from tools.recon.amass import AmassTool
+from tools.recon.subfinder import SubfinderTool
+from tools.recon.waybackurls import WaybackURLsTool
+from tools.recon.gau import GAUTool
+from tools.recon.hakrawler import HakrawlerTool
+from tools.security.testssl import TestSSLTool
+from tools.security.sslscan import SSLScanTool
+from tools.security.jaeles import JaelesTool
+from tools.security.zap import ZAPTool
+from tools.security.burpsuite import BurpSuiteTool
+
+
+# Tool name -> tool class for the intelligence engine executors
+TOOL_CLASSES = {
+    # Network scanning tools
+    'nmap': NmapTool,
+    'nmap-advanced': NmapTool,  # Alias for advanced scans
+    'httpx': HttpxTool,
+    'masscan': MasscanTool,
+    'dnsenum': DNSEnumTool,
+    'fierce': FierceTool,
+    'dnsx': DNSxTool,
+    
+    # Web scanning tools
+    'nuclei': NucleiTool,
+    'gobuster': GobusterTool,
+    'sqlmap': SQLMapTool,
+    'nikto': NiktoTool,
+    'feroxbuster': FeroxbusterTool,
+    'ffuf': FfufTool,
+    'katana': KatanaTool,
+    'wpscan': WpscanTool,
+    'arjun': ArjunTool,
+    'dalfox': DalfoxTool,
+    'whatweb': WhatwebTool,
+    'dirsearch': DirsearchTool,
+    'paramspider': ParamSpiderTool,
+    'x8': X8Tool,
+    
+    # Reconnaissance tools
+    'amass': AmassTool,
+    'subfinder': SubfinderTool,
+    'waybackurls': WaybackURLsTool,
+    'gau': GAUTool,
+    'hakrawler': HakrawlerTool,
+    
+    # Security testing tools
+    'testssl': TestSSLTool,
+    'sslscan': SSLScanTool,
+    'jaeles': JaelesTool,
+    'zap': ZAPTool,
+    'burpsuite': BurpSuiteTool,
+}
 
 
 def create_tool_executor(tool_class, execute_command_func=None):
@@ -27,3 +102,22 @@ def create_tool_executor(tool_class, execute_command_func=None):
         # This will need to be passed when calling create_tool_executor
         return tool.execute(target, params, execute_command_func)
     return executor
+
+
+def build_tool_executors(execute_command_func) -> Dict[str, Callable[[str, Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Build the tool executors dictionary for the intelligence engine
+
+    Shared by the API server and Celery workers so both run the same tools
+    without the worker importing the web server.
+
+    Args:
+        execute_command_func: The execute_command function passed to every tool
+
+    Returns:
+        Dict mapping tool name to a (target, params) -> result executor
+    """
+    return {
+        name: create_tool_executor(tool_class, execute_command_func)
+        for name, tool_class in TOOL_CLASSES.items()
+    }
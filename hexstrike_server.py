@@ -190,39 +190,7 @@ from core.execution import (
     execute_command,
     execute_command_with_recovery
 )
-from core.tool_factory import create_tool_executor
-
-# Phase 2: Tool Abstraction Layer
-from tools.network.nmap import NmapTool
-from tools.network.httpx import HttpxTool
-from tools.network.masscan import MasscanTool
-from tools.network.dnsenum import DNSEnumTool
-from tools.network.fierce import FierceTool
-from tools.network.dnsx import DNSxTool
-from tools.web.nuclei import NucleiTool
-from tools.web.gobuster import GobusterTool
-from tools.web.sqlmap import SQLMapTool
-from tools.web.nikto import NiktoTool
-from tools.web.feroxbuster import FeroxbusterTool
-from tools.web.ffuf import FfufTool
-from tools.web.katana import KatanaTool
-from tools.web.wpscan import WpscanTool
-from tools.web.arjun import ArjunTool
-from tools.web.dalfox import DalfoxTool
-from tools.web.whatweb import WhatwebTool
-from tools.web.dirsearch import DirsearchTool
-from tools.web.paramspider import ParamSpiderTool
-from tools.web.x8 import X8Tool
-from tools.recon.amass import AmassTool
-from tools.recon.subfinder import SubfinderTool
-from tools.recon.waybackurls import WaybackURLsTool
-from tools.recon.gau import GAUTool
-from tools.recon.hakrawler import HakrawlerTool
-from tools.security.testssl import TestSSLTool
-from tools.security.sslscan import SSLScanTool
-from tools.security.jaeles import JaelesTool
-from tools.security.zap import ZAPTool
-from tools.security.burpsuite import BurpSuiteTool
+from core.tool_factory import build_tool_executors
 
 
 # ============================================================================
@@ -529,47 +497,7 @@ app.register_blueprint(tasks_bp)
 
 # Create tool_executors dictionary for intelligence engine
 # Each executor wraps a tool class and provides a simple (target, params) -> result interface
-
-tool_executors = {
-    # Network scanning tools
-    'nmap': create_tool_executor(NmapTool, execute_command),
-    'nmap-advanced': create_tool_executor(NmapTool, execute_command),  # Alias for advanced scans
-    'httpx': create_tool_executor(HttpxTool, execute_command),
-    'masscan': create_tool_executor(MasscanTool, execute_command),
-    'dnsenum': create_tool_executor(DNSEnumTool, execute_command),
-    'fierce': create_tool_executor(FierceTool, execute_command),
-    'dnsx': create_tool_executor(DNSxTool, execute_command),
-    
-    # Web scanning tools
-    'nuclei': create_tool_executor(NucleiTool, execute_command),
-    'gobuster': create_tool_executor(GobusterTool, execute_command),
-    'sqlmap': create_tool_executor(SQLMapTool, execute_command),
-    'nikto': create_tool_executor(NiktoTool, execute_command),
-    'feroxbuster': create_tool_executor(FeroxbusterTool, execute_command),
-    'ffuf': create_tool_executor(FfufTool, execute_command),
-    'katana': create_tool_executor(KatanaTool, execute_command),
-    'wpscan': create_tool_executor(WpscanTool, execute_command),
-    'arjun': create_tool_executor(ArjunTool, execute_command),
-    'dalfox': create_tool_executor(DalfoxTool, execute_command),
-    'whatweb': create_tool_executor(WhatwebTool, execute_command),
-    'dirsearch': create_tool_executor(DirsearchTool, execute_command),
-    'paramspider': create_tool_executor(ParamSpiderTool, execute_command),
-    'x8': create_tool_executor(X8Tool, execute_command),
-    
-    # Reconnaissance tools
-    'amass': create_tool_executor(AmassTool, execute_command),
-    'subfinder': create_tool_executor(SubfinderTool, execute_command),
-    'waybackurls': create_tool_executor(WaybackURLsTool, execute_command),
-    'gau': create_tool_executor(GAUTool, execute_command),
-    'hakrawler': create_tool_executor(HakrawlerTool, execute_command),
-    
-    # Security testing tools
-    'testssl': create_tool_executor(TestSSLTool, execute_command),
-    'sslscan': create_tool_executor(SSLScanTool, execute_command),
-    'jaeles': create_tool_executor(JaelesTool, execute_command),
-    'zap': create_tool_executor(ZAPTool, execute_command),
-    'burpsuite': create_tool_executor(BurpSuiteTool, execute_command),
-}
+tool_executors = build_tool_executors(execute_command)
 
 # Initialize and register intelligence blueprints
 intelligence_routes.init_app(decision_engine, tool_executors)
@@ -577,7 +505,7 @@ app.register_blueprint(intelligence_bp)
 
 # Register enhanced intelligence blueprint (v2 with caching, parallel execution, error handling)
 from api.routes import intelligence_enhanced
-intelligence_enhanced.init_app(decision_engine, tool_executors)
+intelligence_enhanced.init_app(decision_engine, tool_executors, performance_optimizer.circuit_breaker)
 app.register_blueprint(intelligence_enhanced_bp)
 logger.info("✅ Enhanced intelligence engine v2 registered")
 
@@ -174,7 +174,7 @@ class OptimizedHexStrike:
         
         print("\n  🏁 CTF Solver:")
         solver = CTFSolver()
-        print(f"    Available solvers: {len(solver.solvers)}")
+        print(f"    Available solvers: {len(solver.SOLVERS)}")
         
     def run_benchmark(self):
         """性能基准测试"""
@@ -0,0 +1,91 @@
+"""
+Unit tests for CTFSolver (advanced_features)
+
+Tests cover:
+- Base64 layered decoding
+- Plaintext that is itself valid base64 is not over-decoded
+- Flag detection inside decoded layers
+- Caesar shift search (single-process and process-pool paths)
+"""
+
+import base64
+import codecs
+import os
+import sys
+
+import pytest
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+import advanced_features
+from advanced_features import CTFSolver
+
+
+def _b64(data: bytes, layers: int = 1) -> str:
+    for _ in range(layers):
+        data = base64.b64encode(data)
+    return data.decode()
+
+
+@pytest.fixture
+def solver():
+    return CTFSolver()
+
+
+class TestSolveBase64:
+    """Test CTFSolver._solve_base64"""
+
+    @pytest.mark.parametrize("plaintext", [b"test", b"abcd1234"])
+    def test_plaintext_that_is_valid_base64_is_not_decoded_again(self, solver, plaintext):
+        """Regression: plaintext that happens to be valid base64 stops after one layer"""
+        result = solver._solve_base64({'data': _b64(plaintext)})
+        assert result == {'success': True, 'result': plaintext.decode(), 'iterations': 1}
+
+    def test_multiple_layers_are_unwrapped(self, solver):
+        """Test nested encodings are decoded down to the plaintext"""
+        result = solver._solve_base64({'data': _b64(b"hello world", layers=3)})
+        assert result['result'] == "hello world"
+        assert result['iterations'] == 3
+
+    def test_flag_is_detected(self, solver):
+        """Test a flag inside a decoded layer is returned as flag"""
+        result = solver._solve_base64({'data': _b64(b"flag{b64_layers}", layers=2)})
+        assert result['flag'] == "flag{b64_layers}"
+        assert result['iterations'] == 2
+
+    def test_invalid_input_returns_input(self, solver):
+        """Test non-base64 input is returned unchanged"""
+        result = solver._solve_base64({'data': "not base64!"})
+        assert result['success'] is True
+        assert result['iterations'] == 0
+
+
+class TestSolveCaesar:
+    """Test CTFSolver._solve_caesar"""
+
+    def test_rot13_flag_found(self, solver):
+        """Test a ROT13-encoded flag is recovered"""
+        result = solver._solve_caesar({'data': codecs.encode("flag{caesar_rot}", 'rot13')})
+        assert result['success'] is True
+        assert result['flag'] == "flag{caesar_rot}"
+        assert result['shift'] == 13
+
+    def test_no_flag(self, solver):
+        """Test ciphertext without a flag reports failure"""
+        assert solver._solve_caesar({'data': "nothing to see here"})['success'] is False
+
+    def test_long_ciphertext_uses_process_pool(self, solver, monkeypatch):
+        """Test the multiprocessing path finds the flag and shuts the pool down"""
+        monkeypatch.setattr(CTFSolver, 'CAESAR_PARALLEL_THRESHOLD', 64)
+        ciphertext = "x" * 100 + codecs.encode("flag{long_dump}", 'rot13')
+
+        result = solver._solve_caesar({'data': ciphertext})
+
+        assert result['success'] is True
+        assert result['flag'].endswith("flag{long_dump}")
+        assert result['shift'] == 13
+
+    def test_parallel_scan_without_hit(self):
+        """Test the process-pool scan returns None when no shift yields a flag"""
+        assert advanced_features._caesar_scan_parallel(b"no flag in here" * 10) is None
@@ -0,0 +1,146 @@
+"""
+Unit tests for PentestChain (advanced_features)
+
+Tests cover:
+- DAG construction and dependency wiring
+- Full and quick objectives (early stop after enumeration)
+- Independent sub-steps run concurrently
+- Failures propagate to downstream nodes
+- Report files are written atomically without leftover temp files
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from advanced_features import PentestChain
+
+
+@pytest.fixture(autouse=True)
+def report_dir(tmp_path, monkeypatch):
+    """The reporting phase writes its JSON report into the cwd"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestPentestChainGraph:
+    """Test the task graph"""
+
+    def test_every_phase_is_a_node(self):
+        """Test each phase has a barrier node in the DAG"""
+        chain = PentestChain('example.com')
+        assert set(PentestChain.PHASES) <= set(chain.tasks)
+
+    def test_dependencies_exist(self):
+        """Test every dependency refers to a node in the graph"""
+        chain = PentestChain('example.com')
+        for task in chain.tasks.values():
+            assert set(task.deps) <= set(chain.tasks), task.id
+
+    def test_phase_entry_waits_for_previous_phase(self):
+        """Test scanning starts only after the reconnaissance barrier"""
+        chain = PentestChain('example.com')
+        assert chain.tasks['scan.open_ports'].deps == ('reconnaissance',)
+        assert chain.tasks['enum.directories'].deps == ('scanning',)
+
+
+class TestPentestChainExecution:
+    """Test executing the chain"""
+
+    def test_comprehensive_runs_all_phases(self):
+        """Test a comprehensive chain produces results for every phase"""
+        chain = PentestChain('example.com', 'comprehensive')
+        results = chain.execute()
+
+        assert list(results) == PentestChain.PHASES
+        assert chain.current_phase == len(PentestChain.PHASES)
+        assert results['reconnaissance']['subdomains'][0] == 'www.example.com'
+        assert results['scanning']['web_findings']['cms'] == 'wordpress'
+
+    def test_report_written_to_cwd(self, report_dir):
+        """Test the reporting phase writes into the working directory only"""
+        PentestChain('example.com', 'comprehensive').execute()
+        assert [p.name.startswith('pentest_report_example.com_') for p in report_dir.iterdir()] == [True]
+
+    def test_quick_stops_after_enumeration(self):
+        """Test a quick chain cancels everything after the enumeration phase"""
+        results = PentestChain('example.com', 'quick').execute()
+        assert list(results) == ['reconnaissance', 'scanning', 'enumeration']
+
+    def test_independent_steps_run_concurrently(self, monkeypatch):
+        """Test recon sub-steps overlap instead of running back to back"""
+        chain = PentestChain('example.com', 'quick')
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow(value):
+            def run():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.1)
+                with lock:
+                    active.pop()
+                return value
+            return run
+
+        monkeypatch.setattr(chain, '_run_subfinder', slow([]))
+        monkeypatch.setattr(chain, '_detect_technology', slow([]))
+        monkeypatch.setattr(chain, '_gather_osint', slow({}))
+
+        chain.execute()
+        assert max(peak) > 1
+
+    def test_failure_propagates(self, monkeypatch):
+        """Test an exception in a sub-step is raised and downstream phases do not run"""
+        chain = PentestChain('example.com')
+
+        def broken():
+            raise RuntimeError('port scan failed')
+
+        monkeypatch.setattr(chain, '_run_port_scan', broken)
+
+        with pytest.raises(RuntimeError, match='port scan failed'):
+            chain.execute()
+        assert 'scanning' not in chain.results
+
+
+class TestPentestChainReport:
+    """Test the reporting phase output file"""
+
+    def test_serialization_failure_leaves_no_files(self, report_dir, monkeypatch):
+        """Test a report that fails to serialize leaves neither report nor temp file"""
+        chain = PentestChain('example.com')
+        monkeypatch.setattr(chain, '_generate_summary', lambda: object())
+
+        with pytest.raises(TypeError):
+            chain._phase_reporting({})
+
+        assert list(report_dir.iterdir()) == []
+
+    def test_concurrent_reports_use_distinct_temp_files(self, report_dir, monkeypatch):
+        """Test two chains reporting the same target in the same second do not share a temp path"""
+        import advanced_features
+
+        temp_paths = []
+        replace = os.replace
+
+        def record_replace(src, dst):
+            temp_paths.append(src)
+            replace(src, dst)
+
+        monkeypatch.setattr(advanced_features.os, 'replace', record_replace)
+        monkeypatch.setattr(advanced_features.time, 'time', lambda: 1700000000.0)
+
+        PentestChain('example.com')._phase_reporting({})
+        PentestChain('example.com')._phase_reporting({})
+
+        assert len(set(temp_paths)) == 2
+        assert [p.name for p in report_dir.iterdir()] == ['pentest_report_example.com_1700000000.json']
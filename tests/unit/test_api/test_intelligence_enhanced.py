@@ -0,0 +1,260 @@
+"""
+Unit tests for the enhanced intelligence routes (api.routes.intelligence_enhanced)
+
+Tests cover:
+- Circuit breaker is read, not fed, by smart scans
+- Retry option validation and clamping
+- Smart scan cache prefetch (one batched lookup; hits skip execution)
+- Single-flight coalescing of identical in-flight scans
+- Fallback tool results are not cached under the primary tool
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from api.routes import intelligence_enhanced as ie
+from core.cache.scan_cache import ScanResultCache
+from core.execution.parallel_scanner import ParallelScanner, ScanTask
+from core.performance_optimizer import CircuitBreaker, CircuitBreakerConfig
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=2, recovery_timeout=60))
+    monkeypatch.setattr(ie, 'circuit_breaker', breaker)
+    return breaker
+
+
+class TestBreakerOpen:
+    """Test _breaker_open abort hook"""
+
+    def test_tool_failures_do_not_open_global_breaker(self, breaker):
+        """Regression: failing tools in one scan must not trip the API-level breaker"""
+        scanner = ParallelScanner(max_workers=2)
+        tasks = [ScanTask(tool_name=f'tool{i}', target='host') for i in range(5)]
+        executors = {task.tool_name: (lambda target, params: {'success': False}) for task in tasks}
+
+        results = asyncio.run(scanner.execute_parallel_async(tasks, executors, abort_check=ie._breaker_open))
+
+        assert breaker.get_state() == CircuitBreaker.State.CLOSED
+        assert not any(result.aborted for result in results.values())
+
+    def test_open_breaker_aborts_scan(self, breaker):
+        """Test an already open breaker aborts remaining tools"""
+        for _ in range(2):
+            breaker._on_failure()
+        scanner = ParallelScanner(max_workers=1)
+        tasks = [ScanTask(tool_name='nmap', target='host')]
+
+        results = asyncio.run(scanner.execute_parallel_async(
+            tasks, {'nmap': lambda target, params: {'success': True}}, abort_check=ie._breaker_open
+        ))
+
+        assert results['nmap'].aborted
+
+
+class TestRetryOptions:
+    """Test retry_max/retry_base/retry_jitter parsing"""
+
+    def test_defaults_are_none(self):
+        """Test missing options fall back to executor defaults"""
+        opts = ie._scan_options({'target': 'example.com'})
+        assert (opts['retry_max'], opts['retry_base'], opts['retry_jitter']) == (None, None, None)
+
+    def test_values_are_coerced(self):
+        """Test numeric strings and floats are coerced to the option type"""
+        opts = ie._scan_options({'target': 'example.com', 'retry_max': '3', 'retry_base': 2, 'retry_jitter': '0.25'})
+        assert opts['retry_max'] == 3 and isinstance(opts['retry_max'], int)
+        assert opts['retry_base'] == 2.0 and isinstance(opts['retry_base'], float)
+        assert opts['retry_jitter'] == 0.25
+
+    def test_values_are_clamped(self):
+        """Test out-of-range values are clamped to sane bounds"""
+        opts = ie._scan_options({'target': 'example.com', 'retry_max': 10000, 'retry_base': 600, 'retry_jitter': -1})
+        assert opts['retry_max'] == 5
+        assert opts['retry_base'] == 30.0
+        assert opts['retry_jitter'] == 0.0
+
+    @pytest.mark.parametrize("value", [[1, 2], {'n': 1}, 'abc', True, float('nan'), 'inf'])
+    def test_invalid_values_rejected(self, value):
+        """Test non-numeric values raise ValueError"""
+        with pytest.raises(ValueError):
+            ie._scan_options({'target': 'example.com', 'retry_max': value})
+
+    @pytest.mark.parametrize("path", ['/api/intelligence/v2/smart-scan-enhanced',
+                                      '/api/intelligence/v2/smart-scan-enhanced/stream'])
+    def test_routes_return_400(self, path):
+        """Regression: a list retry option returns 400 instead of a 500"""
+        app = Flask(__name__)
+        app.register_blueprint(ie.intelligence_enhanced_bp)
+
+        response = app.test_client().post(path, json={'target': 'example.com', 'retry_max': [1]})
+
+        assert response.status_code == 400
+        assert 'retry_max' in response.get_json()['error']
+
+
+class _Profile:
+    def to_dict(self):
+        return {'target': 'example.com'}
+
+
+class _DecisionEngine:
+    def analyze_target(self, target):
+        return _Profile()
+
+    def select_optimal_tools(self, profile, objective):
+        return ['nmap', 'httpx']
+
+    def optimize_parameters(self, tool_name, profile):
+        return {'tool': tool_name}
+
+
+class TestCachePrefetch:
+    """Test that smart scans fetch cached tool results in one batch"""
+
+    @pytest.fixture
+    def scan_env(self, monkeypatch):
+        calls = []
+
+        def make_executor(tool_name):
+            def run(target, params):
+                calls.append(tool_name)
+                return {'success': True, 'stdout': f'{tool_name} output'}
+            return run
+
+        cache = ScanResultCache(use_redis=False)
+        monkeypatch.setattr(ie.cache_executor, 'cache', cache)
+        monkeypatch.setattr(ie, '_get_available_set', lambda tools=(): frozenset(tools))
+        ie.init_app(_DecisionEngine(), {tool: make_executor(tool) for tool in ('nmap', 'httpx')})
+        yield cache, calls
+        ie.init_app(None, None)
+
+    def test_cached_tool_is_not_executed(self, scan_env, monkeypatch):
+        """Test a prefetched hit is returned from cache and only misses run"""
+        cache, calls = scan_env
+        cache.set('nmap', 'example.com', {'tool': 'nmap'}, {'success': True, 'stdout': 'cached'})
+        lookups = []
+        get_many = cache.get_many
+        monkeypatch.setattr(cache, 'get_many', lambda items: lookups.append(items) or get_many(items))
+
+        payload, status = ie._execute_scan(ie._scan_options({'target': 'example.com'}))
+
+        assert status == 200
+        assert calls == ['httpx']
+        assert len(lookups) == 1 and len(lookups[0]) == 2
+        by_tool = {tool['tool']: tool for tool in payload['tools_executed']}
+        assert by_tool['nmap']['from_cache'] is True
+        assert by_tool['httpx']['from_cache'] is False
+        assert payload['execution_summary']['total_tools'] == 2
+        assert payload['execution_summary']['cached_results'] == 1
+
+    def test_force_refresh_skips_prefetch(self, scan_env):
+        """Test force_refresh runs every tool even when cached"""
+        cache, calls = scan_env
+        cache.set('nmap', 'example.com', {'tool': 'nmap'}, {'success': True})
+
+        payload, status = ie._execute_scan(ie._scan_options({'target': 'example.com', 'force_refresh': True}))
+
+        assert status == 200
+        assert sorted(calls) == ['httpx', 'nmap']
+
+    def test_stream_emits_cached_results(self, scan_env):
+        """Test the SSE variant emits prefetched hits and counts them in the summary"""
+        cache, calls = scan_env
+        cache.set('nmap', 'example.com', {'tool': 'nmap'}, {'success': True})
+        app = Flask(__name__)
+        app.register_blueprint(ie.intelligence_enhanced_bp)
+
+        response = app.test_client().post('/api/intelligence/v2/smart-scan-enhanced/stream',
+                                          json={'target': 'example.com'})
+        body = response.get_data(as_text=True)
+
+        assert calls == ['httpx']
+        assert body.count('event: tool') == 2
+        assert '"total_tools":2' in body
+        assert '"cached_results":1' in body
+
+
+class TestSingleFlight:
+    """Test _single_flight request coalescing"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test identical concurrent calls run fn once and share its result"""
+        release = threading.Event()
+        calls = []
+
+        def scan():
+            calls.append(1)
+            release.wait(5)
+            return {'ok': True}, 200
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(ie._single_flight, 'same-key', scan) for _ in range(4)]
+            while 'same-key' not in ie._INFLIGHT:
+                time.sleep(0.001)
+            time.sleep(0.1)  # let followers join the in-flight future
+            release.set()
+            results = [future.result(5) for future in futures]
+
+        assert calls == [1]
+        assert results == [({'ok': True}, 200)] * 4
+        assert 'same-key' not in ie._INFLIGHT
+
+    def test_exception_is_shared_and_key_released(self):
+        """Test the leader's exception reaches followers and the key is freed"""
+        with pytest.raises(RuntimeError):
+            ie._single_flight('boom', lambda: (_ for _ in ()).throw(RuntimeError('boom')))
+        assert 'boom' not in ie._INFLIGHT
+        assert ie._single_flight('boom', lambda: 42) == 42
+
+    def test_scan_key_depends_on_all_options(self):
+        """Test different scan options never coalesce"""
+        base = ie._scan_options({'target': 'example.com'})
+        other = ie._scan_options({'target': 'example.com', 'max_tools': 3})
+        assert ie._scan_key(base) == ie._scan_key(dict(base))
+        assert ie._scan_key(base) != ie._scan_key(other)
+
+
+class TestFallbackNotCached:
+    """Test the cache layer around the resilience layer"""
+
+    def test_alternative_tool_output_not_cached_for_primary(self, monkeypatch):
+        """Regression: a fallback result must not be served from cache for the primary tool"""
+        from core.utils.tool_checker import ToolChecker
+
+        cache = ScanResultCache(use_redis=False)
+        monkeypatch.setattr(ie.cache_executor, 'cache', cache)
+        monkeypatch.setattr(ToolChecker, 'is_tool_available', classmethod(lambda cls, tool: True))
+        calls = []
+
+        def nmap(target, params):
+            calls.append('nmap')
+            return {'success': False, 'error': 'nmap: command not found', 'return_code': 127}
+
+        def masscan(target, params):
+            calls.append('masscan')
+            return {'success': True, 'stdout': 'masscan output'}
+
+        ie.init_app(_DecisionEngine(), {'nmap': nmap, 'masscan': masscan})
+        try:
+            run = ie._build_tool_callable('nmap', 'comprehensive', True, True)
+            first = run('example.com', {})
+            second = run('example.com', {})
+        finally:
+            ie.init_app(None, None)
+
+        assert first['alternative_tool'] == 'masscan'
+        assert second['from_cache'] is False
+        assert calls == ['nmap', 'masscan', 'nmap', 'masscan']
+        assert cache.get('nmap', 'example.com', {}) is None
@@ -0,0 +1,152 @@
+"""
+Unit tests for API middleware (api.middleware)
+
+Tests cover:
+- FlaskPerformanceMiddleware per-OS-thread accumulators and batched folding
+- OrjsonJSONProvider output matches Flask's default provider
+"""
+
+import os
+import sys
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from api.middleware import ORJSON_AVAILABLE, FlaskPerformanceMiddleware, OrjsonJSONProvider
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+    return app
+
+
+class TestPerformanceMiddleware:
+    """Test FlaskPerformanceMiddleware statistics"""
+
+    def test_requests_share_thread_accumulator(self, app):
+        """Test requests on one OS thread reuse a single accumulator and fold in batches"""
+        perf = FlaskPerformanceMiddleware(app)
+        client = app.test_client()
+
+        for _ in range(perf.FLUSH_EVERY + 3):
+            assert client.get('/ping').headers['X-Response-Time'].endswith('s')
+
+        assert len(perf._accumulators) == 1
+        assert perf._total_requests == perf.FLUSH_EVERY
+        assert perf.get_stats()['total_requests'] == perf.FLUSH_EVERY + 3
+
+    def test_accumulators_keyed_by_os_thread(self, app, monkeypatch):
+        """Regression: under gevent each request runs in a new greenlet on the same OS thread"""
+        class GreenletLocal:
+            """threading.local as patched by gevent: state never survives to the next request"""
+            def __getattr__(self, name):
+                raise AttributeError(name)
+
+            def __setattr__(self, name, value):
+                pass
+
+        monkeypatch.setattr(threading, 'local', GreenletLocal)
+        monkeypatch.setattr(threading, 'get_ident', iter(range(10 ** 6)).__next__)
+        perf = FlaskPerformanceMiddleware(app)
+        client = app.test_client()
+
+        for _ in range(perf.FLUSH_EVERY + 3):
+            client.get('/ping')
+
+        assert len(perf._accumulators) == 1
+        assert perf._total_requests == perf.FLUSH_EVERY
+        assert perf.get_stats()['total_requests'] == perf.FLUSH_EVERY + 3
+
+    def test_stats_across_threads(self, app):
+        """Test counts from several OS threads are all reported"""
+        perf = FlaskPerformanceMiddleware(app)
+
+        def worker():
+            client = app.test_client()
+            for _ in range(20):
+                client.get('/ping')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = perf.get_stats()
+        assert stats['total_requests'] == 80
+        assert 0 < stats['fastest'] <= stats['avg_time'] <= stats['slowest']
+        assert len(perf._accumulators) <= 4
+
+    def test_empty_stats(self):
+        """Test stats before any request"""
+        stats = FlaskPerformanceMiddleware().get_stats()
+        assert stats['total_requests'] == 0
+        assert stats['avg_time'] == 0.0
+
+
+@dataclass
+class _Point:
+    x: int
+    y: int
+
+
+@pytest.mark.skipif(not ORJSON_AVAILABLE, reason='orjson not installed')
+class TestOrjsonJSONProvider:
+    """Test OrjsonJSONProvider keeps Flask's JSON output"""
+
+    @pytest.fixture
+    def providers(self):
+        app = Flask(__name__)
+        return OrjsonJSONProvider(app), DefaultJSONProvider(app)
+
+    @pytest.mark.parametrize('value', [
+        datetime(2026, 10, 15, 8, 30, tzinfo=timezone.utc),
+        datetime(2026, 10, 15, 8, 30),
+        date(2026, 10, 15),
+        uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        _Point(1, 2),
+        2 ** 64,
+        -(2 ** 70),
+        {'b': 1, 'a': [1.5, None, True]},
+    ])
+    def test_dumps_matches_default_provider(self, providers, value):
+        """Test dates keep Flask's http_date format and wide ints still serialize"""
+        orjson_provider, default_provider = providers
+        assert orjson_provider.loads(orjson_provider.dumps({'v': value})) == \
+            default_provider.loads(default_provider.dumps({'v': value}))
+
+    def test_datetime_is_http_date(self, providers):
+        """Regression: jsonify must not switch datetimes to ISO 8601"""
+        orjson_provider, _ = providers
+        dumped = orjson_provider.dumps(datetime(2026, 10, 15, 8, 30, tzinfo=timezone.utc))
+        assert dumped == '"Thu, 15 Oct 2026 08:30:00 GMT"'
+
+    def test_jsonify_response(self):
+        """Test jsonify through the provider handles dates and 64+ bit ints"""
+        app = Flask(__name__)
+        app.json = OrjsonJSONProvider(app)
+
+        with app.app_context():
+            response = jsonify(when=date(2026, 10, 15), big=2 ** 64)
+
+        assert response.get_json() == {'when': 'Thu, 15 Oct 2026 00:00:00 GMT', 'big': 2 ** 64}
+
+    def test_unserializable_still_raises(self, providers):
+        """Test objects neither serializer supports raise TypeError like Flask's provider"""
+        orjson_provider, _ = providers
+        with pytest.raises(TypeError):
+            orjson_provider.dumps({'v': object()})
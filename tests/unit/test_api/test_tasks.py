@@ -0,0 +1,345 @@
+"""
+Unit tests for task management routes (api.routes.tasks)
+
+Tests cover:
+- Task status snapshot cache (TTL, size bounds, LRU eviction)
+- ETag / 304 Not Modified on status and result polling
+- Bulk scan submission (validation, pre-assigned ids, single publish)
+- Streamed msgpack AI analysis submission (one chord per upload)
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from api.routes import tasks as task_routes
+
+
+class FakeBackend:
+    """Result backend stub returning canned task meta and counting reads"""
+
+    def __init__(self):
+        self.meta = {}
+        self.reads = []
+
+    def get_task_meta(self, task_id):
+        self.reads.append(task_id)
+        return self.meta.get(task_id, {'status': 'PENDING', 'result': None})
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(task_routes.celery_app.backend, 'get_task_meta', backend.get_task_meta)
+    monkeypatch.setattr(task_routes, '_status_cache', task_routes.OrderedDict())
+    monkeypatch.setattr(task_routes, '_status_cache_bytes', 0)
+    monkeypatch.setattr(task_routes, '_status_expiry_heap', [])
+    return backend
+
+
+class FakeGroup:
+    """Records the signatures and publish options of celery.group"""
+
+    published = []
+
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+
+    def apply_async(self, **options):
+        FakeGroup.published.append((self.signatures, options))
+
+
+class FakeProducerPool:
+    """producer_pool stand-in that counts acquisitions"""
+
+    def __init__(self):
+        self.acquired = 0
+
+    @contextmanager
+    def acquire(self, block=True):
+        self.acquired += 1
+        yield 'producer'
+
+
+@pytest.fixture
+def publisher(monkeypatch):
+    pool = FakeProducerPool()
+    FakeGroup.published = []
+    monkeypatch.setattr(task_routes, 'group', FakeGroup)
+    monkeypatch.setattr(type(task_routes.celery_app), 'producer_pool', property(lambda self: pool))
+    return pool
+
+
+class FakeChord:
+    """Records chord headers and callbacks instead of publishing"""
+
+    submitted = []
+
+    def __init__(self, header, body):
+        self.header = list(header)
+        self.body = body
+
+    def apply_async(self):
+        FakeChord.submitted.append(self)
+        return type('Result', (), {'id': 'chord-id'})()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(task_routes, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def client(backend):
+    app = Flask(__name__)
+    app.register_blueprint(task_routes.tasks_bp)
+    return app.test_client()
+
+
+class TestTaskSnapshot:
+    """Test _task_snapshot caching"""
+
+    def test_pending_state_cached_within_ttl(self, backend):
+        """Test repeated polls within the TTL read the backend once"""
+        for _ in range(3):
+            assert task_routes._task_snapshot('t1')['state'] == 'PENDING'
+        assert backend.reads == ['t1']
+
+    def test_small_result_cached_with_info(self, backend):
+        """Test small terminal results are served from the cache"""
+        backend.meta['t1'] = {'status': 'SUCCESS', 'result': {'ok': True}}
+
+        first = task_routes._task_snapshot('t1')
+        second = task_routes._task_snapshot('t1')
+
+        assert first == second == {'state': 'SUCCESS', 'info': {'ok': True}, 'ready': True}
+        assert backend.reads == ['t1']
+
+    def test_large_result_not_held_in_cache(self, backend, monkeypatch):
+        """Test large terminal results keep only state in the cache"""
+        monkeypatch.setattr(task_routes, 'READY_INFO_MAX_BYTES', 100)
+        backend.meta['t1'] = {'status': 'SUCCESS', 'result': 'x' * 1000}
+
+        assert task_routes._task_snapshot('t1')['info'] == 'x' * 1000
+        assert 'info' not in task_routes._status_cache['t1'][1]
+        assert task_routes._status_cache_bytes == 0
+        assert task_routes._task_snapshot('t1')['info'] == 'x' * 1000
+
+    def test_byte_budget_evicts_least_recently_used(self, backend, monkeypatch):
+        """Test the byte budget evicts LRU entries instead of clearing the cache"""
+        monkeypatch.setattr(task_routes, 'STATUS_CACHE_MAX_BYTES', 250)
+        for task_id in ('a', 'b', 'c'):
+            backend.meta[task_id] = {'status': 'SUCCESS', 'result': 'x' * 100}
+
+        task_routes._task_snapshot('a')
+        task_routes._task_snapshot('b')
+        task_routes._task_snapshot('a')  # a becomes most recently used
+        task_routes._task_snapshot('c')
+
+        assert list(task_routes._status_cache) == ['a', 'c']
+        assert task_routes._status_cache_bytes <= 250
+
+    def test_entry_limit_drops_expired_first(self, backend, monkeypatch, clock):
+        """Test expired entries are evicted before live ones when the cache is full"""
+        monkeypatch.setattr(task_routes, 'STATUS_CACHE_MAX', 2)
+        backend.meta['done'] = {'status': 'SUCCESS', 'result': 1}
+        task_routes._task_snapshot('done')
+        task_routes._task_snapshot('running')
+        clock[0] += task_routes.STATUS_CACHE_TTL
+
+        task_routes._task_snapshot('new')
+
+        assert list(task_routes._status_cache) == ['done', 'new']
+
+    def test_refreshed_entry_not_purged_by_stale_heap_item(self, backend, monkeypatch, clock):
+        """Test a heap item from an earlier TTL window does not evict the refreshed entry"""
+        monkeypatch.setattr(task_routes, 'STATUS_CACHE_MAX', 2)
+        task_routes._task_snapshot('running')
+        clock[0] += task_routes.STATUS_CACHE_TTL
+        task_routes._task_snapshot('running')  # refreshed, old heap item is now stale
+        task_routes._task_snapshot('other')
+        clock[0] += task_routes.STATUS_CACHE_TTL / 2
+
+        task_routes._task_snapshot('new')
+
+        assert list(task_routes._status_cache) == ['other', 'new']
+
+    def test_full_live_cache_does_not_scan_entries(self, backend, monkeypatch, clock):
+        """Test puts into a cache full of live entries evict LRU without scanning every entry"""
+        monkeypatch.setattr(task_routes, 'STATUS_CACHE_MAX', 100)
+        for i in range(100):
+            backend.meta[f't{i}'] = {'status': 'SUCCESS', 'result': i}
+            task_routes._task_snapshot(f't{i}')
+
+        class NoScan(task_routes.OrderedDict):
+            def items(self):
+                raise AssertionError('full cache scan')
+
+        monkeypatch.setattr(task_routes, '_status_cache', NoScan(task_routes._status_cache))
+        for i in range(100, 150):
+            task_routes._task_snapshot(f't{i}')
+
+        assert len(task_routes._status_cache) == 100
+        assert next(iter(task_routes._status_cache)) == 't50'
+
+    def test_expiry_heap_stays_bounded(self, backend, clock):
+        """Test stale heap items from repeated refreshes are compacted"""
+        for _ in range(5000):
+            clock[0] += task_routes.STATUS_CACHE_TTL
+            task_routes._task_snapshot('running')
+
+        assert len(task_routes._status_expiry_heap) <= 2 * 1024
+        assert len(task_routes._status_cache) == 1
+
+
+class TestConditionalPolling:
+    """Test ETag / If-None-Match on polling endpoints"""
+
+    def test_status_returns_weak_etag(self, client):
+        """Test the first poll returns 200 with a weak ETag"""
+        response = client.get('/api/tasks/t1/status')
+
+        assert response.status_code == 200
+        etag, weak = response.get_etag()
+        assert etag and weak
+        assert response.get_json()['status'] == 'PENDING'
+
+    def test_unchanged_status_returns_304(self, client):
+        """Test polling with a matching If-None-Match returns an empty 304"""
+        etag = client.get('/api/tasks/t1/status').headers['ETag']
+
+        response = client.get('/api/tasks/t1/status', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_changed_status_returns_new_body(self, client, backend):
+        """Test a state change invalidates the client's ETag"""
+        etag = client.get('/api/tasks/t1/status').headers['ETag']
+        task_routes._status_cache.clear()
+        backend.meta['t1'] = {'status': 'SUCCESS', 'result': {'ok': True}}
+
+        response = client.get('/api/tasks/t1/status', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()['result'] == {'ok': True}
+
+    def test_pending_result_keeps_202_and_supports_304(self, client):
+        """Test the not-ready result endpoint is conditional too"""
+        first = client.get('/api/tasks/t1/result')
+        assert first.status_code == 202
+
+        second = client.get('/api/tasks/t1/result', headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 304
+
+
+class TestBulkScan:
+    """Test POST /scan/<scan_type>/bulk"""
+
+    def test_submits_one_group_with_preassigned_ids(self, client, publisher):
+        """Test all targets go out in one group publish over one producer"""
+        response = client.post('/api/tasks/scan/nmap/bulk',
+                               json={'targets': ['10.0.0.1', 'example.com'], 'options': {'ports': '80'}})
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert publisher.acquired == 1
+        assert len(FakeGroup.published) == 1
+        signatures, options = FakeGroup.published[0]
+        assert options['task_id'] == body['group_id']
+        assert options['producer'] == 'producer'
+        assert [sig.options['task_id'] for sig in signatures] == body['task_ids']
+        assert [sig.args for sig in signatures] == [('10.0.0.1', {'ports': '80'}), ('example.com', {'ports': '80'})]
+        assert len(set(body['task_ids'])) == 2
+
+    def test_unsupported_scan_type(self, client, publisher):
+        """Test an unknown scan type is rejected with the supported list"""
+        response = client.post('/api/tasks/scan/masscan/bulk', json={'targets': ['10.0.0.1']})
+
+        assert response.status_code == 400
+        assert 'nmap' in response.get_json()['supported_types']
+        assert FakeGroup.published == []
+
+    @pytest.mark.parametrize('payload', [{}, {'targets': []}, {'targets': '10.0.0.1'}])
+    def test_targets_list_required(self, client, publisher, payload):
+        """Test a missing or non-list targets field is rejected"""
+        response = client.post('/api/tasks/scan/nmap/bulk', json=payload)
+
+        assert response.status_code == 400
+        assert FakeGroup.published == []
+
+    def test_invalid_target_rejects_whole_batch(self, client, publisher):
+        """Test one malformed target rejects the batch before publishing"""
+        response = client.post('/api/tasks/scan/web/bulk',
+                               json={'targets': ['https://example.com', 'ftp://example.com']})
+
+        assert response.status_code == 400
+        assert 'Invalid url' in response.get_json()['error']
+        assert FakeGroup.published == []
+        assert publisher.acquired == 0
+
+
+class TestMsgpackAnalysis:
+    """Test POST /ai/analyze with an application/msgpack body"""
+
+    @pytest.fixture
+    def msgpack(self, monkeypatch):
+        msgpack = pytest.importorskip('msgpack')
+        monkeypatch.setattr(task_routes, 'msgpack', msgpack, raising=False)
+        monkeypatch.setattr(task_routes, 'MSGPACK_AVAILABLE', True)
+        monkeypatch.setattr(task_routes, 'chord', FakeChord)
+        FakeChord.submitted = []
+        return msgpack
+
+    def _post(self, client, data):
+        return client.post('/api/tasks/ai/analyze', data=data,
+                           content_type=task_routes.MSGPACK_MIMETYPE)
+
+    def test_one_analysis_task_per_item(self, client, msgpack):
+        """Test each array element becomes one signature of a single chord"""
+        items = [{'tool': 'nmap', 'output': 'x' * 100}, {'tool': 'nuclei', 'output': []}]
+
+        response = self._post(client, msgpack.packb(items))
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['task_id'] == 'chord-id' and body['count'] == 2
+        assert len(FakeChord.submitted) == 1
+        submitted = FakeChord.submitted[0]
+        assert [sig.args for sig in submitted.header] == [(item,) for item in items]
+        assert submitted.body.task == task_routes.finalize_analysis.name
+
+    def test_empty_array_rejected(self, client, msgpack):
+        """Test an empty array is rejected without submitting"""
+        response = self._post(client, msgpack.packb([]))
+
+        assert response.status_code == 400
+        assert FakeChord.submitted == []
+
+    @pytest.mark.parametrize('payload', [b'\x92\x01', b'\xc1', b'\x01'])
+    def test_malformed_payload_rejected(self, client, msgpack, payload):
+        """Test truncated, invalid or non-array payloads return 400"""
+        response = self._post(client, payload)
+
+        assert response.status_code == 400
+        assert 'Invalid msgpack payload' in response.get_json()['error']
+        assert FakeChord.submitted == []
+
+    def test_unsupported_without_msgpack(self, client, monkeypatch):
+        """Test the server answers 415 when msgpack is not installed"""
+        monkeypatch.setattr(task_routes, 'MSGPACK_AVAILABLE', False)
+
+        response = self._post(client, b'\x90')
+
+        assert response.status_code == 415
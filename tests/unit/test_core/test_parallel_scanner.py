@@ -0,0 +1,64 @@
+"""
+Unit tests for ParallelScanner (core.execution.parallel_scanner)
+
+Tests cover:
+- iter_parallel per-task timeouts under a bounded worker pool
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from core.execution.parallel_scanner import ParallelScanner, ScanTask
+
+
+def _sleeper(seconds):
+    def run(target, params):
+        time.sleep(seconds)
+        return {'success': True}
+    return run
+
+
+class TestIterParallel:
+    """Test ParallelScanner.iter_parallel"""
+
+    def test_queued_task_timeout_starts_when_it_runs(self):
+        """Regression: a task queued behind a busy worker is not timed out before it starts"""
+        scanner = ParallelScanner(max_workers=1)
+        tasks = [ScanTask(tool_name=name, target='host', timeout=0.5) for name in ('first', 'second')]
+        executors = {task.tool_name: _sleeper(0.3) for task in tasks}
+
+        results = {result.tool_name: result for result in scanner.iter_parallel(tasks, executors)}
+
+        assert not results['first'].timed_out
+        assert not results['second'].timed_out
+        assert results['second'].success
+
+    def test_timed_out_task_frees_its_slot(self):
+        """Test a hung task is reported timed out and the next task still runs"""
+        scanner = ParallelScanner(max_workers=1)
+        tasks = [
+            ScanTask(tool_name='hung', target='host', timeout=0.2, priority=1),
+            ScanTask(tool_name='quick', target='host', timeout=0.5),
+        ]
+        executors = {'hung': _sleeper(1.0), 'quick': _sleeper(0.05)}
+
+        start = time.monotonic()
+        results = {result.tool_name: result for result in scanner.iter_parallel(tasks, executors)}
+
+        assert results['hung'].timed_out
+        assert results['quick'].success
+        assert time.monotonic() - start < 1.0
+
+    def test_missing_executor_yields_error(self):
+        """Test tasks without an executor produce an error result"""
+        scanner = ParallelScanner(max_workers=2)
+        results = list(scanner.iter_parallel([ScanTask(tool_name='ghost', target='host')], {}))
+
+        assert len(results) == 1
+        assert results[0].error == "No executor found for ghost"
@@ -0,0 +1,152 @@
+"""
+Unit tests for ResilientExecutor (core.execution.error_handler)
+
+Tests cover:
+- Exponential backoff delay bounds, cap and jitter
+- Error classification (return codes and message patterns)
+- Non-retryable failures are not retried
+- Per-call retry overrides
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from core.execution import error_handler
+from core.execution.error_handler import ErrorDiagnostics, ErrorType, ResilientExecutor
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(error_handler.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def failing(result, calls):
+    def run(target, params):
+        calls.append(target)
+        return result
+    return run
+
+
+class TestBackoffDelay:
+    """Test backoff_delay"""
+
+    @pytest.mark.parametrize('attempt,expected', [(1, 1), (2, 2), (3, 4), (4, 8), (10, 30)])
+    def test_exponential_and_capped_without_jitter(self, attempt, expected):
+        """Test delay doubles per attempt and is capped at max_delay"""
+        executor = ResilientExecutor(retry_delay=1, max_delay=30, jitter=0)
+        assert executor.backoff_delay(attempt) == expected
+
+    @pytest.mark.parametrize('attempt', [1, 3, 10])
+    def test_jitter_bounds(self, attempt, monkeypatch):
+        """Test jitter scales the delay within [delay, delay * (1 + jitter)]"""
+        executor = ResilientExecutor(retry_delay=1, max_delay=30, jitter=0.5)
+        delay = min(30, 2 ** (attempt - 1))
+
+        monkeypatch.setattr(error_handler.random, 'uniform', lambda a, b: a)
+        assert executor.backoff_delay(attempt) == delay
+        monkeypatch.setattr(error_handler.random, 'uniform', lambda a, b: b)
+        assert executor.backoff_delay(attempt) == delay * 1.5
+
+    def test_overrides_take_precedence(self):
+        """Test per-call base and jitter override instance settings"""
+        executor = ResilientExecutor(retry_delay=1, jitter=0.5)
+        assert executor.backoff_delay(2, base=3, jitter=0) == 6
+
+
+class TestErrorClassification:
+    """Test ErrorDiagnostics.diagnose_error"""
+
+    @pytest.mark.parametrize('message,stderr,returncode,expected', [
+        ('', '', 127, ErrorType.TOOL_NOT_FOUND),
+        ('', '', 126, ErrorType.PERMISSION_DENIED),
+        ('nmap: command not found', '', 1, ErrorType.TOOL_NOT_FOUND),
+        ('', 'Operation not permitted', 1, ErrorType.PERMISSION_DENIED),
+        ('Scan timed out', '', 1, ErrorType.TIMEOUT),
+        ('', 'Connection refused', 1, ErrorType.NETWORK_ERROR),
+        ('something odd', '', 1, ErrorType.UNKNOWN),
+    ])
+    def test_diagnose(self, message, stderr, returncode, expected):
+        """Test return codes win over message patterns, patterns are case-insensitive"""
+        assert ErrorDiagnostics.diagnose_error(message, stderr, returncode) == expected
+
+    def test_returncode_beats_message(self):
+        """Test a shell return code classifies even a misleading message"""
+        assert ErrorDiagnostics.diagnose_error('timeout', '', 127) == ErrorType.TOOL_NOT_FOUND
+
+
+class TestRetryPolicy:
+    """Test execute_with_resilience retry behaviour"""
+
+    @pytest.mark.parametrize('result', [
+        {'success': False, 'error': 'failed', 'return_code': 127},
+        {'success': False, 'error': 'failed', 'return_code': 126},
+        {'success': False, 'error': 'nmap: command not found'},
+        {'success': False, 'error': 'failed', 'stderr': 'Permission denied'},
+    ])
+    def test_non_retryable_runs_once(self, result, sleeps):
+        """Test non-retryable failures are not retried and never sleep"""
+        executor = ResilientExecutor(max_retries=3, enable_fallback=False)
+        calls = []
+
+        outcome = executor.execute_with_resilience('nmap', 'host', {}, failing(result, calls), {})
+
+        assert calls == ['host']
+        assert sleeps == []
+        assert outcome['success'] is False
+
+    def test_retryable_failure_backs_off(self, sleeps):
+        """Test retryable failures retry max_retries times with exponential delays"""
+        executor = ResilientExecutor(max_retries=3, retry_delay=1, jitter=0, enable_fallback=False)
+        calls = []
+
+        executor.execute_with_resilience(
+            'nmap', 'host', {}, failing({'success': False, 'error': 'timed out'}, calls), {})
+
+        assert len(calls) == 4
+        assert sleeps == [1, 2, 4]
+
+    def test_exceptions_are_retried(self, sleeps):
+        """Test raised exceptions are retried with backoff"""
+        executor = ResilientExecutor(max_retries=2, retry_delay=1, jitter=0, enable_fallback=False)
+        calls = []
+
+        def boom(target, params):
+            calls.append(target)
+            raise RuntimeError('boom')
+
+        outcome = executor.execute_with_resilience('nmap', 'host', {}, boom, {})
+
+        assert len(calls) == 3
+        assert sleeps == [1, 2]
+        assert outcome['success'] is False
+
+    def test_success_after_retry(self, sleeps):
+        """Test a later success is returned as-is"""
+        executor = ResilientExecutor(max_retries=2, retry_delay=1, jitter=0, enable_fallback=False)
+        results = iter([{'success': False, 'error': 'timeout'}, {'success': True, 'v': 1}])
+
+        outcome = executor.execute_with_resilience('nmap', 'host', {}, lambda t, p: next(results), {})
+
+        assert outcome == {'success': True, 'v': 1}
+        assert sleeps == [1]
+
+    def test_per_call_overrides(self, sleeps):
+        """Test max_retries / retry_delay / jitter overrides apply to one call"""
+        executor = ResilientExecutor(max_retries=5, retry_delay=10, jitter=0.5, enable_fallback=False)
+        calls = []
+
+        executor.execute_with_resilience(
+            'nmap', 'host', {}, failing({'success': False, 'error': 'timeout'}, calls), {},
+            max_retries=1, retry_delay=0.5, jitter=0
+        )
+
+        assert len(calls) == 2
+        assert sleeps == [0.5]
+        assert executor.max_retries == 5
@@ -0,0 +1,395 @@
+"""
+Unit tests for ScanResultCache / CacheAwareExecutor (core.cache.scan_cache)
+
+Tests cover:
+- Redis and memory backends (Redis via an in-memory fake client)
+- SET NX writes after a cache miss
+- Undecodable Redis entries are dropped instead of pinning a miss
+- Single-flight execution of concurrent cache misses
+- Memory backend LRU eviction bounded by max_entries
+- Min-heap expiry cleanup
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add parent directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from core.cache import scan_cache
+from core.cache.scan_cache import CacheAwareExecutor, ScanResultCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py commands the cache uses"""
+
+    def __init__(self):
+        self.store = {}
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    unlink = delete
+
+    def scan_iter(self, match=None, count=None):
+        prefix = match[:-1] if match else b""
+        return iter([key for key in list(self.store) if key.startswith(prefix)])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and replays them on execute()"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def redis_cache():
+    return ScanResultCache(use_redis=True, redis_client=FakeRedis())
+
+
+@pytest.fixture
+def memory_cache():
+    return ScanResultCache(use_redis=False)
+
+
+@pytest.fixture(params=['redis', 'memory'])
+def cache(request, redis_cache, memory_cache):
+    return redis_cache if request.param == 'redis' else memory_cache
+
+
+class TestSetIfNotExists:
+    """Test set(..., if_not_exists=True)"""
+
+    def test_does_not_overwrite_existing_entry(self, cache):
+        """Test an existing entry is kept and the write reports False"""
+        assert cache.set('nmap', 'host', {}, {'success': True, 'v': 1}, if_not_exists=True)
+        assert not cache.set('nmap', 'host', {}, {'success': True, 'v': 2}, if_not_exists=True)
+        assert cache.get('nmap', 'host', {})['result']['v'] == 1
+
+    def test_executor_keeps_entry_written_by_another_writer(self, cache):
+        """Test a slow scan does not clobber a result stored while it ran"""
+        executor = CacheAwareExecutor(cache)
+
+        def slow_scan(target, params):
+            cache.set('nmap', target, params, {'success': True, 'v': 'fresh'})
+            return {'success': True, 'v': 'stale'}
+
+        executor.execute_with_cache('nmap', 'host', {}, slow_scan)
+        assert cache.get('nmap', 'host', {})['result']['v'] == 'fresh'
+
+    def test_fallback_result_not_cached(self, cache):
+        """Test a result produced by an alternative tool is not cached under the primary key"""
+        executor = CacheAwareExecutor(cache)
+        fallback = {'success': True, 'used_alternative': True,
+                    'original_tool': 'nmap', 'alternative_tool': 'masscan'}
+
+        result = executor.execute_with_cache('nmap', 'host', {}, lambda target, params: dict(fallback))
+
+        assert result['alternative_tool'] == 'masscan'
+        assert cache.get('nmap', 'host', {}) is None
+
+    def test_force_refresh_overwrites(self, cache):
+        """Test force_refresh replaces the cached result"""
+        executor = CacheAwareExecutor(cache)
+        cache.set('nmap', 'host', {}, {'success': True, 'v': 'old'})
+
+        result = executor.execute_with_cache(
+            'nmap', 'host', {}, lambda target, params: {'success': True, 'v': 'new'},
+            force_refresh=True
+        )
+        assert result['v'] == 'new'
+        assert cache.get('nmap', 'host', {})['result']['v'] == 'new'
+
+
+class TestUndecodableEntries:
+    """Test handling of Redis values that cannot be decoded"""
+
+    @pytest.mark.parametrize("raw", [b'{"legacy": json', b'\x78\x9c\x00truncated', b'\xff\xfe'])
+    def test_get_drops_undecodable_entry(self, redis_cache, raw):
+        """Test get() unlinks a corrupt entry and reports a miss"""
+        key = redis_cache.make_key('nmap', 'host', {})
+        redis_cache.redis_client.store[key] = raw
+
+        assert redis_cache.get('nmap', 'host', {}) is None
+        assert key not in redis_cache.redis_client.store
+
+    def test_get_many_drops_undecodable_entry(self, redis_cache):
+        """Test get_many() unlinks corrupt entries and keeps good ones"""
+        redis_cache.set('nmap', 'good', {}, {'success': True})
+        bad_key = redis_cache.make_key('nmap', 'bad', {})
+        redis_cache.redis_client.store[bad_key] = b'garbage'
+
+        good, bad = redis_cache.get_many([('nmap', 'good', {}), ('nmap', 'bad', {})])
+        assert good['result'] == {'success': True}
+        assert bad is None
+        assert bad_key not in redis_cache.redis_client.store
+
+    def test_corrupt_entry_is_replaced_after_one_scan(self, redis_cache):
+        """Regression: a corrupt entry must not force a rescan on every call"""
+        executor = CacheAwareExecutor(redis_cache)
+        redis_cache.redis_client.store[redis_cache.make_key('nmap', 'host', {})] = b'garbage'
+        calls = []
+
+        def scan(target, params):
+            calls.append(target)
+            return {'success': True}
+
+        first = executor.execute_with_cache('nmap', 'host', {}, scan)
+        second = executor.execute_with_cache('nmap', 'host', {}, scan)
+        assert first['from_cache'] is False
+        assert second['from_cache'] is True
+        assert calls == ['host']
+
+
+class TestGetStats:
+    """Test get_stats() per-tool counts"""
+
+    def test_redis_counts_by_tool(self, redis_cache):
+        """Test Redis stats count keys per tool in one pass"""
+        for target in ('a', 'b'):
+            redis_cache.set('nmap', target, {}, {'success': True})
+        redis_cache.set('nuclei', 'a', {}, {'success': True})
+
+        stats = redis_cache.get_stats()
+        assert stats['total_entries'] == 3
+        assert stats['by_tool'] == {'nmap': 2, 'nuclei': 1}
+
+    def test_redis_stats_consume_scan_lazily(self, redis_cache):
+        """Test stats accept a generator from scan_iter (no list materialization needed)"""
+        keys = [b'hexstrike:scan:nmap:1', b'hexstrike:scan:nmap:2']
+        redis_cache.redis_client.scan_iter = lambda match=None, count=None: (key for key in keys)
+
+        assert redis_cache.get_stats()['by_tool'] == {'nmap': 2}
+
+    def test_redis_stats_accept_str_keys(self, redis_cache):
+        """Test clients with decode_responses=True (str keys) are handled"""
+        keys = ['hexstrike:scan:httpx:1', 'hexstrike:scan:nmap:2']
+        redis_cache.redis_client.scan_iter = lambda match=None, count=None: iter(keys)
+
+        stats = redis_cache.get_stats()
+        assert stats['total_entries'] == 2
+        assert stats['by_tool'] == {'httpx': 1, 'nmap': 1}
+
+    def test_memory_counts_valid_entries(self, memory_cache):
+        """Test memory stats count unexpired entries per tool"""
+        memory_cache.set('nmap', 'a', {}, {'success': True})
+        memory_cache.set('nmap', 'b', {}, {'success': True}, ttl=-1)
+
+        stats = memory_cache.get_stats()
+        assert stats['total_entries'] == 2
+        assert stats['valid_entries'] == 1
+        assert stats['by_tool'] == {'nmap': 1}
+
+
+class TestGetMany:
+    """Test batched lookups"""
+
+    def test_redis_uses_single_pipeline(self, redis_cache, monkeypatch):
+        """Test get_many issues one pipeline for all keys and keeps order"""
+        redis_cache.set('nmap', 'b', {}, {'success': True, 'v': 'b'})
+        pipelines = []
+        pipeline = redis_cache.redis_client.pipeline
+        monkeypatch.setattr(redis_cache.redis_client, 'pipeline',
+                            lambda transaction=True: pipelines.append(transaction) or pipeline(transaction))
+
+        results = redis_cache.get_many([('nmap', 'a', {}), ('nmap', 'b', {}), ('nuclei', 'b', {})])
+
+        assert pipelines == [False]
+        assert [r and r['result']['v'] for r in results] == [None, 'b', None]
+
+    def test_memory_backend(self, memory_cache):
+        """Test get_many on the memory backend"""
+        memory_cache.set('nmap', 'a', None, {'success': True})
+        assert [bool(r) for r in memory_cache.get_many([('nmap', 'a', None), ('nmap', 'z', None)])] == [True, False]
+
+
+class TestSingleFlight:
+    """Test CacheAwareExecutor coalesces concurrent misses for the same key"""
+
+    @staticmethod
+    def _run_concurrently(executor, scan, n=4):
+        release = threading.Event()
+
+        def blocking_scan(target, params):
+            release.wait(5)
+            return scan(target, params)
+
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            futures = [
+                pool.submit(executor.execute_with_cache, 'nmap', 'host', {}, blocking_scan)
+                for _ in range(n)
+            ]
+            while not executor._inflight:
+                time.sleep(0.001)
+            time.sleep(0.1)  # let followers join the in-flight future
+            release.set()
+            return futures
+
+    def test_concurrent_misses_execute_once(self, cache):
+        """Test concurrent misses run the scan once and all get its result"""
+        executor = CacheAwareExecutor(cache)
+        calls = []
+
+        def scan(target, params):
+            calls.append(target)
+            return {'success': True, 'v': 1}
+
+        results = [f.result(5) for f in self._run_concurrently(executor, scan)]
+
+        assert calls == ['host']
+        assert all(r['v'] == 1 and r['from_cache'] is False for r in results)
+        assert executor._inflight == {}
+
+    def test_leader_exception_reaches_followers(self, cache):
+        """Test a failing scan raises in every waiter and frees the key"""
+        executor = CacheAwareExecutor(cache)
+        calls = []
+
+        def scan(target, params):
+            calls.append(target)
+            raise RuntimeError('scan failed')
+
+        futures = self._run_concurrently(executor, scan)
+        for future in futures:
+            with pytest.raises(RuntimeError, match='scan failed'):
+                future.result(5)
+
+        assert calls == ['host']
+        assert executor._inflight == {}
+        assert cache.get('nmap', 'host', {}) is None
+
+    def test_unsuccessful_result_is_shared_but_not_cached(self, cache):
+        """Test a failed (success=False) result is shared but never cached"""
+        executor = CacheAwareExecutor(cache)
+        results = [f.result(5) for f in self._run_concurrently(
+            executor, lambda target, params: {'success': False})]
+
+        assert all(r['success'] is False for r in results)
+        assert cache.get('nmap', 'host', {}) is None
+
+
+class TestMemoryLRU:
+    """Test the memory backend's bounded LRU"""
+
+    def test_evicts_least_recently_set(self):
+        """Test the cache never exceeds max_entries and drops the oldest entry"""
+        cache = ScanResultCache(use_redis=False, max_entries=3)
+        for target in 'abcd':
+            cache.set('nmap', target, {}, {'success': True})
+
+        assert len(cache.memory_cache) == 3
+        assert cache.get('nmap', 'a', {}) is None
+        assert all(cache.get('nmap', t, {}) for t in 'bcd')
+
+    def test_get_refreshes_recency(self):
+        """Test a hit moves the entry to the most-recently-used end"""
+        cache = ScanResultCache(use_redis=False, max_entries=3)
+        for target in 'abc':
+            cache.set('nmap', target, {}, {'success': True})
+
+        assert cache.get('nmap', 'a', {})
+        cache.set('nmap', 'd', {}, {'success': True})
+
+        assert cache.get('nmap', 'a', {})
+        assert cache.get('nmap', 'b', {}) is None
+
+    def test_overwrite_does_not_grow(self):
+        """Test re-setting a key replaces it in place"""
+        cache = ScanResultCache(use_redis=False, max_entries=2)
+        for v in range(5):
+            cache.set('nmap', 'a', {}, {'success': True, 'v': v})
+
+        assert len(cache.memory_cache) == 1
+        assert cache.get('nmap', 'a', {})['result']['v'] == 4
+
+
+class TestExpiryHeap:
+    """Test cleanup_expired driven by the expiry min-heap"""
+
+    SECOND = 1_000_000_000
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [0]
+        monkeypatch.setattr(scan_cache.time, 'monotonic_ns', lambda: now[0])
+        return now
+
+    def test_pops_only_due_entries(self, memory_cache, clock):
+        """Test only entries past their expiry are removed"""
+        memory_cache.set('nmap', 'short', {}, {'success': True}, ttl=10)
+        memory_cache.set('nmap', 'long', {}, {'success': True}, ttl=100)
+
+        clock[0] = 50 * self.SECOND
+        assert memory_cache.cleanup_expired() == 1
+        assert memory_cache.get('nmap', 'long', {})
+        assert len(memory_cache._expiry_heap) == 1
+
+        clock[0] = 100 * self.SECOND
+        assert memory_cache.cleanup_expired() == 1
+        assert memory_cache.memory_cache == {}
+
+    def test_skips_overwritten_keys(self, memory_cache, clock):
+        """Test a stale heap item does not remove an entry re-set with a later expiry"""
+        memory_cache.set('nmap', 'host', {}, {'success': True, 'v': 1}, ttl=10)
+        memory_cache.set('nmap', 'host', {}, {'success': True, 'v': 2}, ttl=100)
+
+        clock[0] = 50 * self.SECOND
+        assert memory_cache.cleanup_expired() == 0
+        assert memory_cache.get('nmap', 'host', {})['result']['v'] == 2
+
+    def test_skips_evicted_keys(self, clock):
+        """Test heap items for LRU-evicted keys are discarded without error"""
+        cache = ScanResultCache(use_redis=False, max_entries=1)
+        cache.set('nmap', 'a', {}, {'success': True}, ttl=10)
+        cache.set('nmap', 'b', {}, {'success': True}, ttl=10)
+
+        clock[0] = 10 * self.SECOND
+        assert cache.cleanup_expired() == 1
+        assert cache._expiry_heap == []
+
+    def test_heap_rebuilt_when_stale_items_pile_up(self, memory_cache, clock):
+        """Test overwrites cannot grow the heap without bound"""
+        for _ in range(5000):
+            memory_cache.set('nmap', 'host', {}, {'success': True}, ttl=10)
+
+        assert len(memory_cache._expiry_heap) <= 2 * 1024
+        assert len(memory_cache.memory_cache) == 1
+
+    def test_redis_backend_is_noop(self, redis_cache):
+        """Test Redis handles expiry itself"""
+        assert redis_cache.cleanup_expired() == 0
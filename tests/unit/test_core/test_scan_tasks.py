@@ -0,0 +1,56 @@
+"""
+Unit tests for Celery scan tasks (core.tasks.scan_tasks)
+
+Tests cover:
+- Smart scan dependencies are wired in workers without importing the web server
+"""
+
+import os
+import subprocess
+import sys
+
+# Add parent directories to path
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, ROOT)
+
+from api.routes import intelligence_enhanced
+from core.tasks.scan_tasks import init_smart_scan
+from core.tool_factory import TOOL_CLASSES
+
+
+class TestInitSmartScan:
+    """Test init_smart_scan worker wiring"""
+
+    def test_wires_engine_executors_and_breaker(self, monkeypatch):
+        """Test all smart scan dependencies are injected"""
+        monkeypatch.setattr(intelligence_enhanced, 'decision_engine', None)
+        monkeypatch.setattr(intelligence_enhanced, 'tool_executors', None)
+        monkeypatch.setattr(intelligence_enhanced, 'circuit_breaker', None)
+
+        init_smart_scan()
+
+        assert intelligence_enhanced.decision_engine is not None
+        assert set(intelligence_enhanced.tool_executors) == set(TOOL_CLASSES)
+        assert not intelligence_enhanced._breaker_open()
+
+    def test_existing_wiring_is_kept(self, monkeypatch):
+        """Test an already initialized process (e.g. the API server) is left alone"""
+        engine = object()
+        monkeypatch.setattr(intelligence_enhanced, 'decision_engine', engine)
+
+        init_smart_scan()
+
+        assert intelligence_enhanced.decision_engine is engine
+
+    def test_does_not_import_web_server(self):
+        """Regression: the worker must not import hexstrike_server to run smart scans"""
+        code = (
+            "import sys\n"
+            "from core.tasks.scan_tasks import init_smart_scan\n"
+            "init_smart_scan()\n"
+            "from api.routes import intelligence_enhanced\n"
+            "assert intelligence_enhanced.decision_engine is not None\n"
+            "assert 'hexstrike_server' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr